@@ -0,0 +1,111 @@
+import asyncio
+import inspect
+from concurrent.futures import Executor, Future
+from functools import partial
+from typing import Any, Callable
+
+from pytrade.events.event import Event
+from pytrade.events.typed_event import TypedEvent
+
+_BLOCKING = "__pytrade_blocking__"
+
+
+def blocking(callback: Callable) -> Callable:
+    """
+    Mark a sync callback as blocking so async events run it in an executor
+    instead of on the event loop.
+    """
+    setattr(callback, _BLOCKING, True)
+    return callback
+
+
+class CallbackError(RuntimeError):
+    """
+    A failure raised by one callback during an async dispatch.
+    """
+
+    def __init__(self, callback: Callable, error: BaseException):
+        super().__init__(
+            f"{getattr(callback, '__qualname__', callback)!r} failed: {error!r}"
+        )
+        self.callback = callback
+        self.error = error
+
+
+class AsyncEvent(Event):
+    """
+    Event whose dispatch is awaited. Coroutine callbacks run concurrently,
+    blocking sync callbacks run in `executor` (the loop's default when None)
+    and other sync callbacks run inline on the loop.
+
+    Subscriptions behave as they do for `Event`, including weak bound
+    methods. A failing callback does not stop the others; every failure is returned
+    from the dispatch as a `CallbackError` and fired on `on_error`.
+    """
+
+    def __init__(self, executor: Executor | None = None):
+        super().__init__()
+        self._executor = executor
+        self.on_error = TypedEvent[CallbackError]()
+
+    def subscribe(
+        self,
+        callback: Callable[..., Any],
+        weak: bool = False,
+        blocking: bool | None = None,
+    ):
+        if blocking is None:
+            blocking = getattr(callback, _BLOCKING, False)
+        self._subscribe(callback, weak, blocking)
+        return self
+
+    async def __call__(self, *args, **kwargs) -> list[CallbackError]:
+        callbacks = []
+        for callback, ref, is_blocking in self._callbacks:
+            if ref is not None:
+                owner = ref()
+                if owner is None:
+                    continue
+                callback = callback.__get__(owner)
+            callbacks.append((callback, is_blocking))
+        if not callbacks:
+            return []
+
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                self._invoke(loop, callback, is_blocking, args, kwargs)
+                for callback, is_blocking in callbacks
+            ),
+            return_exceptions=True,
+        )
+
+        errors = [
+            CallbackError(callback, result)
+            for (callback, _), result in zip(callbacks, results)
+            if isinstance(result, BaseException)
+        ]
+        for error in errors:
+            self.on_error(error)
+        return errors
+
+    async def _invoke(self, loop, callback, is_blocking, args, kwargs):
+        if is_blocking:
+            return await loop.run_in_executor(
+                self._executor, partial(callback, *args, **kwargs)
+            )
+        result = callback(*args, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    def threadsafe(self, loop: asyncio.AbstractEventLoop) -> Callable[..., Future]:
+        """
+        Sync callable that schedules a dispatch on `loop` and returns at once,
+        so a broker feed thread can publish without waiting on subscribers.
+        """
+
+        def dispatch(*args, **kwargs) -> Future:
+            return asyncio.run_coroutine_threadsafe(self(*args, **kwargs), loop)
+
+        return dispatch
@@ -0,0 +1,19 @@
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from pytrade.events.async_event import AsyncEvent, CallbackError
+
+T = TypeVar("T")
+
+
+class AsyncTypedEvent(AsyncEvent, Generic[T]):
+
+    def subscribe(
+        self,
+        callback: Callable[[T], None | Awaitable[None]],
+        weak: bool = False,
+        blocking: bool | None = None,
+    ):
+        return super().subscribe(callback, weak, blocking)
+
+    async def __call__(self, value: T) -> list[CallbackError]:
+        return await super().__call__(value)
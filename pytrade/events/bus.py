@@ -0,0 +1,333 @@
+import threading
+from collections import deque
+from contextlib import nullcontext
+from enum import Enum
+from typing import Callable, ContextManager, Iterable, Optional
+
+from pytrade.events.async_event import CallbackError
+from pytrade.events.typed_event import TypedEvent
+from pytrade.interfaces.broker import IBroker
+from pytrade.models.instruments import Candlestick, CandleSubscription
+
+
+class OverflowPolicy(Enum):
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+
+
+class Consumer:
+    """
+    A bus subscriber's queue of pending candles.
+
+    Each topic has its own queue of at most `max_size` candles, and
+    `get` takes one candle from each topic with pending candles in turn,
+    so a burst on one instrument neither evicts nor delays the others.
+
+    When a topic's queue is full, the `policy` decides what `put` does:
+    `BLOCK` waits for the consumer, up to `timeout` seconds, `DROP_OLDEST`
+    discards the oldest queued candle and `COALESCE` discards every queued
+    candle so only the latest bar is delivered. With `COALESCE` a revision
+    of the latest queued bar also replaces it in place.
+
+    Candles which are already pending when delivery starts are delivered
+    together inside `scope`, e.g. `CandleData.batch`, so a burst notifies
+    each affected series once. A delivery which raises is reported on
+    `on_error` and the consumer moves on to the next candle.
+    """
+
+    def __init__(
+        self,
+        topics: Iterable[CandleSubscription],
+        callback: Optional[Callable[[Candlestick], None]] = None,
+        max_size: int = 1000,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        timeout: Optional[float] = None,
+        name: Optional[str] = None,
+        scope: Optional[Callable[[], ContextManager]] = None,
+    ):
+        if max_size < 1:
+            raise RuntimeError(f"Invalid queue size {max_size}")
+        self._topics = tuple(dict.fromkeys(topics))
+        self._callback = callback
+        self._max_size = max_size
+        self._policy = policy
+        self._timeout = timeout
+        self._scope = scope or nullcontext
+        self.name = (
+            name or getattr(callback, "__qualname__", None) or f"consumer-{id(self):x}"
+        )
+        self._queues: dict[CandleSubscription, deque[Candlestick]] = {
+            topic: deque() for topic in self._topics
+        }
+        self._ready: deque[CandleSubscription] = deque()
+        self._depth = 0
+        self._max_depth = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._errors = 0
+        self.on_error = TypedEvent[CallbackError]()
+
+    @property
+    def topics(self) -> tuple[CandleSubscription, ...]:
+        return self._topics
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        return self._policy
+
+    @property
+    def depth(self) -> int:
+        """
+        Number of candles waiting to be consumed.
+        """
+        return self._depth
+
+    @property
+    def depths(self) -> dict[CandleSubscription, int]:
+        """
+        Number of candles waiting to be consumed, per topic.
+        """
+        with self._lock:
+            return {topic: len(queue) for topic, queue in self._queues.items()}
+
+    @property
+    def max_depth(self) -> int:
+        """
+        Largest number of candles which were waiting at once.
+        """
+        return self._max_depth
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of candles discarded by `DROP_OLDEST`, or by the bus when
+        `BLOCK` timed out.
+        """
+        return self._dropped
+
+    @property
+    def coalesced(self) -> int:
+        """
+        Number of candles replaced by a later one under `COALESCE`.
+        """
+        return self._coalesced
+
+    @property
+    def errors(self) -> int:
+        """
+        Number of failed deliveries, each also fired on `on_error`.
+        """
+        return self._errors
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, topic: CandleSubscription, candle: Candlestick):
+        with self._lock:
+            if self._closed:
+                return
+            queue = self._queues[topic]
+            if self._policy is OverflowPolicy.COALESCE:
+                if queue and queue[-1].timestamp == candle.timestamp:
+                    queue[-1] = candle
+                    self._coalesced += 1
+                    return
+                if len(queue) >= self._max_size:
+                    self._coalesced += len(queue)
+                    self._depth -= len(queue)
+                    queue.clear()
+            elif len(queue) >= self._max_size:
+                if self._policy is OverflowPolicy.DROP_OLDEST:
+                    queue.popleft()
+                    self._depth -= 1
+                    self._dropped += 1
+                elif not self._not_full.wait_for(
+                    lambda: self._closed or len(queue) < self._max_size,
+                    self._timeout,
+                ):
+                    raise RuntimeError(
+                        f"Timed out waiting for {self.name} to consume {topic.instrument}"
+                    )
+                elif self._closed:
+                    return
+            if not queue:
+                self._ready.append(topic)
+            queue.append(candle)
+            self._depth += 1
+            self._max_depth = max(self._max_depth, self._depth)
+            self._not_empty.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Candlestick]:
+        """
+        Next pending candle, taking topics in turn, or None when none
+        arrived within `timeout` or the consumer was closed.
+        """
+        with self._lock:
+            if (
+                not self._not_empty.wait_for(
+                    lambda: self._closed or self._ready, timeout
+                )
+                or not self._ready
+            ):
+                return None
+            topic = self._ready.popleft()
+            queue = self._queues[topic]
+            candle = queue.popleft()
+            if queue:
+                self._ready.append(topic)
+            self._depth -= 1
+            self._not_full.notify_all()
+            return candle
+
+    def drain(self) -> int:
+        """
+        Deliver every pending candle to the callback on this thread.
+        """
+        candle = self.get(timeout=0)
+        return self._deliver_burst(candle) if candle is not None else 0
+
+    def _deliver_burst(self, candle: Candlestick) -> int:
+        # Only what is pending now, so a busy feed cannot hold the scope open
+        pending = self._depth
+        delivered = 0
+        try:
+            with self._scope():
+                while candle is not None:
+                    try:
+                        self._deliver(candle)
+                    except Exception as error:
+                        self._report(error)
+                    delivered += 1
+                    candle = self.get(timeout=0) if delivered <= pending else None
+        except Exception as error:
+            # Raised by the scope, e.g. a subscriber notified when it closes
+            self._report(error)
+        return delivered
+
+    def _report(self, error: Exception):
+        self._errors += 1
+        self.on_error(CallbackError(self._callback, error))
+
+    def _drop(self, error: Exception):
+        with self._lock:
+            self._dropped += 1
+        self._report(error)
+
+    def _deliver(self, candle: Candlestick):
+        if self._callback is None:
+            raise RuntimeError(f"{self.name} has no callback to deliver to")
+        self._callback(candle)
+
+    def start(self) -> "Consumer":
+        """
+        Deliver candles to the callback from a dedicated thread until closed.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while (candle := self.get()) is not None:
+            self._deliver_burst(candle)
+
+    def close(self, timeout: Optional[float] = None):
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+class EventBus:
+    """
+    Routes candles published by the broker feeds to the consumers
+    subscribed to their `CandleSubscription`.
+
+    Publishing only enqueues, so a slow consumer never holds up the feed
+    thread or the other consumers, unless it uses `OverflowPolicy.BLOCK`
+    and its queue is full. A consumer which times out misses the candle,
+    reported on its `on_error`, and the others still receive it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._consumers: list[Consumer] = []
+        self._routes: dict[CandleSubscription, tuple[Consumer, ...]] = {}
+        self._connected: set[CandleSubscription] = set()
+
+    @property
+    def consumers(self) -> tuple[Consumer, ...]:
+        return tuple(self._consumers)
+
+    def subscribe(
+        self,
+        topics: Iterable[CandleSubscription],
+        callback: Optional[Callable[[Candlestick], None]] = None,
+        max_size: int = 1000,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        timeout: Optional[float] = None,
+        name: Optional[str] = None,
+        scope: Optional[Callable[[], ContextManager]] = None,
+    ) -> Consumer:
+        consumer = Consumer(topics, callback, max_size, policy, timeout, name, scope)
+        with self._lock:
+            self._consumers.append(consumer)
+            self._reroute()
+        return consumer
+
+    def unsubscribe(self, consumer: Consumer):
+        with self._lock:
+            self._consumers.remove(consumer)
+            self._reroute()
+        consumer.close()
+
+    def _reroute(self):
+        routes: dict[CandleSubscription, list[Consumer]] = {}
+        for consumer in self._consumers:
+            for topic in consumer.topics:
+                routes.setdefault(topic, []).append(consumer)
+        self._routes = {topic: tuple(consumers) for topic, consumers in routes.items()}
+
+    def publish(self, candle: Candlestick):
+        topic = CandleSubscription(candle.instrument, candle.granularity)
+        for consumer in self._routes.get(topic, ()):
+            try:
+                consumer.put(topic, candle)
+            except RuntimeError as error:
+                consumer._drop(error)
+
+    def connect(self, broker: IBroker, topics: Iterable[CandleSubscription]):
+        """
+        Subscribe the bus to the broker feed of each topic, once per topic.
+        """
+        for topic in topics:
+            with self._lock:
+                if topic in self._connected:
+                    continue
+                self._connected.add(topic)
+            broker.subscribe(topic.instrument, topic.granularity, self.publish)
+
+    def depths(self) -> dict[str, int]:
+        """
+        Number of candles waiting to be consumed, per consumer name.
+        """
+        return {consumer.name: consumer.depth for consumer in self._consumers}
+
+    def close(self):
+        with self._lock:
+            consumers, self._consumers = self._consumers, []
+            self._reroute()
+        for consumer in consumers:
+            consumer.close()
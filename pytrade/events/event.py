@@ -1,23 +1,75 @@
-from typing import Callable
+import weakref
+from inspect import ismethod
+from typing import Callable, Hashable
 
 
 class Event:
+    """
+    Callbacks called in subscription order whenever the event fires.
+
+    Subscribing a callback again has no effect. Subscribers live in a
+    dict, so unsubscribing is O(1), and the tuple
+    iterated when firing is only rebuilt when they change. A bound method
+    subscribed with `weak=True` does not keep its object alive, and is
+    unsubscribed once the object is garbage collected.
+    """
 
     def __init__(self):
-        self.__callbacks: list[Callable[[], None]] = []
+        self.__subscribers: dict[Hashable, tuple] = {}
+        self._callbacks: tuple[tuple, ...] = ()
 
-    @property
-    def _callbacks(self):
-        return self.__callbacks
+    @staticmethod
+    def _key(callback: Callable) -> Hashable:
+        if ismethod(callback):
+            return id(callback.__self__), callback.__func__
+        return callback
 
-    def __iadd__(self, callback: Callable[[], None]):
-        self.__callbacks.append(callback)
+    def subscribe(self, callback: Callable, weak: bool = False):
+        self._subscribe(callback, weak)
         return self
 
-    def __isub__(self, callback: Callable[[], None]):
-        self.__callbacks.remove(callback)
+    def _subscribe(self, callback: Callable, weak: bool, *options):
+        key = self._key(callback)
+        if weak and ismethod(callback):
+            this = weakref.ref(self)
+
+            def discard(_, key=key):
+                event = this()
+                if event is not None:
+                    event._discard(key)
+
+            entry = (
+                callback.__func__,
+                weakref.ref(callback.__self__, discard),
+                *options,
+            )
+        else:
+            entry = (callback, None, *options)
+        self.__subscribers[key] = entry
+        self._callbacks = tuple(self.__subscribers.values())
+
+    def unsubscribe(self, callback: Callable):
+        if not self._discard(self._key(callback)):
+            raise ValueError(f"{callback!r} is not subscribed")
         return self
 
+    def _discard(self, key: Hashable) -> bool:
+        if self.__subscribers.pop(key, None) is None:
+            return False
+        self._callbacks = tuple(self.__subscribers.values())
+        return True
+
+    def __iadd__(self, callback: Callable[[], None]):
+        return self.subscribe(callback)
+
+    def __isub__(self, callback: Callable[[], None]):
+        return self.unsubscribe(callback)
+
     def __call__(self, *args, **kwargs):
-        for callback in self._callbacks:
-            callback(*args, **kwargs)
+        for callback, ref in self._callbacks:
+            if ref is None:
+                callback(*args, **kwargs)
+            else:
+                owner = ref()
+                if owner is not None:
+                    callback(owner, *args, **kwargs)
@@ -1,25 +1,17 @@
 from typing import Callable, Generic, TypeVar
 
-T = TypeVar("T")
+from pytrade.events.event import Event
 
+T = TypeVar("T")
 
-class TypedEvent(Generic[T]):
 
-    def __init__(self):
-        self.__callbacks: list[Callable[[T], None]] = []
+class TypedEvent(Event, Generic[T]):
 
-    @property
-    def _callbacks(self):
-        return self.__callbacks
+    def subscribe(self, callback: Callable[[T], None], weak: bool = False):
+        return super().subscribe(callback, weak)
 
     def __iadd__(self, callback: Callable[[T], None]):
-        self.__callbacks.append(callback)
-        return self
+        return self.subscribe(callback)
 
     def __isub__(self, callback: Callable[[T], None]):
-        self.__callbacks.remove(callback)
-        return self
-
-    def __call__(self, *args, **kwargs):
-        for callback in self._callbacks:
-            callback(*args, **kwargs)
+        return self.unsubscribe(callback)
@@ -0,0 +1,29 @@
+from pytrade.indicators.indicators import (
+    ADX,
+    ATR,
+    EMA,
+    MACD,
+    RSI,
+    SMA,
+    BollingerBands,
+    Donchian,
+    Stochastic,
+)
+from pytrade.indicators.signals import BarsSince, Crossover, Crossunder, Falling, Rising
+
+__all__ = [
+    "ADX",
+    "ATR",
+    "BarsSince",
+    "BollingerBands",
+    "Crossover",
+    "Crossunder",
+    "Donchian",
+    "EMA",
+    "Falling",
+    "MACD",
+    "Rising",
+    "RSI",
+    "SMA",
+    "Stochastic",
+]
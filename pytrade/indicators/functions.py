@@ -0,0 +1,237 @@
+"""
+Vectorized batch implementations of common indicators.
+
+Every function works along axis 0, so inputs may be a single series or
+a 2-D array with one column per series. Leading NaNs are skipped before
+warmup, which lets indicators be chained (e.g. an EMA of a MACD line).
+Smoothed averages are seeded with the simple mean of their first
+`period` values, matching the streaming states in
+`pytrade.indicators.streaming` bar for bar.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_float(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+def first_valid(x: np.ndarray) -> int:
+    """
+    Index of the first row which is not entirely NaN.
+    """
+    if not len(x):
+        return 0
+    missing = np.isnan(x).reshape(len(x), -1).all(axis=1)
+    return len(x) if missing.all() else int(np.argmin(missing))
+
+
+def ratio(numerator, denominator, default: float):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0, default, numerator / denominator)
+
+
+def rolling_sum(x, period: int) -> np.ndarray:
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    start = first_valid(x)
+    valid = x[start:]
+    if len(valid) >= period:
+        totals = np.cumsum(valid, axis=0)
+        ready = start + period - 1
+        sums = totals[slice(period - 1, None)].copy()
+        sums[1:] -= totals[:-period]
+        out[ready:] = sums
+    return out
+
+
+def sma(x, period: int) -> np.ndarray:
+    return rolling_sum(x, period) / period
+
+
+def ema(x, period: int, alpha: float | None = None) -> np.ndarray:
+    """
+    Exponential moving average with smoothing `alpha`, `2 / (period + 1)`
+    by default. Use `alpha=1 / period` for Wilder's smoothing.
+    """
+    x = _as_float(x)
+    alpha = 2 / (period + 1) if alpha is None else alpha
+    out = np.full(x.shape, np.nan)
+    start = first_valid(x)
+    seeded = start + period - 1
+    if len(x) > seeded:
+        rest = x[seeded:].copy()
+        rest[0] = x[slice(start, seeded + 1)].mean(axis=0)
+        smoothed = (
+            pd.DataFrame(rest.reshape(len(rest), -1))
+            .ewm(alpha=alpha, adjust=False)
+            .mean()
+            .to_numpy()
+        )
+        out[seeded:] = smoothed.reshape(rest.shape)
+    return out
+
+
+def wilder(x, period: int) -> np.ndarray:
+    return ema(x, period, alpha=1 / period)
+
+
+def _window(x: np.ndarray, period: int) -> tuple[int, np.ndarray]:
+    """
+    Index of the first full window and a view of every trailing window.
+    """
+    start = first_valid(x)
+    ready = start + period - 1
+    if len(x) <= ready:
+        return ready, np.empty((0, *x.shape[1:], period))
+    return ready, sliding_window_view(x[start:], period, axis=0)
+
+
+def rolling_max(x, period: int) -> np.ndarray:
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    ready, windows = _window(x, period)
+    out[ready:] = windows.max(axis=-1)
+    return out
+
+
+def rolling_min(x, period: int) -> np.ndarray:
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    ready, windows = _window(x, period)
+    out[ready:] = windows.min(axis=-1)
+    return out
+
+
+def rolling_var(x, period: int) -> np.ndarray:
+    """
+    Population variance over a trailing window.
+    """
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    ready, windows = _window(x, period)
+    out[ready:] = windows.var(axis=-1)
+    return out
+
+
+def rolling_std(x, period: int) -> np.ndarray:
+    return np.sqrt(rolling_var(x, period))
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    tr = high - low
+    previous = close[:-1]
+    tr[1:] = np.maximum.reduce(
+        [tr[1:], np.abs(high[1:] - previous), np.abs(low[1:] - previous)]
+    )
+    return tr
+
+
+def strength(gain, loss):
+    """
+    RSI from average gain and loss; 50 when the price has not moved.
+    """
+    return ratio(100 * gain, gain + loss, 50.0)
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    close = _as_float(close)
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = np.diff(close, axis=0)
+    return strength(
+        wilder(np.clip(delta, 0, None), period),
+        wilder(np.clip(-delta, 0, None), period),
+    )
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    return wilder(true_range(high, low, close), period)
+
+
+def bollinger_bands(
+    x, period: int = 20, k: float = 2.0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the middle, upper and lower bands.
+    """
+    middle = sma(x, period)
+    width = k * rolling_std(x, period)
+    return middle, middle + width, middle - width
+
+
+def macd(
+    x, fast: int = 12, slow: int = 26, signal: int = 9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the MACD line, signal line and histogram.
+    """
+    line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def stochastic_k(close, highest, lowest):
+    return ratio(100 * (close - lowest), highest - lowest, 50.0)
+
+
+def stochastic(
+    high, low, close, k: int = 14, d: int = 3
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns %K and %D. %K is 50 when the window has no range.
+    """
+    percent_k = stochastic_k(
+        _as_float(close), rolling_max(high, k), rolling_min(low, k)
+    )
+    return percent_k, sma(percent_k, d)
+
+
+def donchian(high, low, period: int = 20) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the upper, middle and lower channel.
+    """
+    upper, lower = rolling_max(high, period), rolling_min(low, period)
+    return upper, (upper + lower) / 2, lower
+
+
+def directional_movement(high, low) -> tuple[np.ndarray, np.ndarray]:
+    """
+    +DM and -DM; undefined for the first bar.
+    """
+    high, low = _as_float(high), _as_float(low)
+    up = np.full(high.shape, np.nan)
+    down = np.full(low.shape, np.nan)
+    up[1:] = high[1:] - high[:-1]
+    down[1:] = low[:-1] - low[1:]
+    plus = np.where((up > down) & (up > 0), up, 0.0)
+    minus = np.where((down > up) & (down > 0), down, 0.0)
+    plus[:1] = minus[:1] = np.nan
+    return plus, minus
+
+
+def directional_index(tr, plus_dm, minus_dm):
+    """
+    +DI, -DI and DX from smoothed true range and directional movement.
+    """
+    plus_di = ratio(100 * plus_dm, tr, 0.0)
+    minus_di = ratio(100 * minus_dm, tr, 0.0)
+    dx = ratio(100 * np.abs(plus_di - minus_di), plus_di + minus_di, 0.0)
+    return plus_di, minus_di, dx
+
+
+def adx(
+    high, low, close, period: int = 14
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns ADX, +DI and -DI.
+    """
+    tr = true_range(high, low, close)
+    tr[:1] = np.nan
+    plus_dm, minus_dm = directional_movement(high, low)
+    plus_di, minus_di, dx = directional_index(
+        wilder(tr, period), wilder(plus_dm, period), wilder(minus_dm, period)
+    )
+    return wilder(dx, period), plus_di, minus_di
@@ -0,0 +1,242 @@
+import numpy as np
+
+from pytrade.indicators.streaming import (
+    AdxStream,
+    AtrStream,
+    BollingerStream,
+    DonchianStream,
+    EmaStream,
+    MacdStream,
+    RsiStream,
+    SmaStream,
+    StochasticStream,
+)
+from pytrade.models.indicator import Indicator
+from pytrade.models.instruments import Candlestick
+
+
+class _PriceIndicator(Indicator):
+    """
+    Indicator of a single price column, `Close` by default, or of the
+    values of another indicator.
+    """
+
+    _column = "Close"
+
+    def _prices(self) -> np.ndarray:
+        if isinstance(self._data, Indicator):
+            return self._data.to_array
+        return getattr(self._data, self._column)
+
+    def _price(self, bar: Candlestick) -> float:
+        if isinstance(self._data, Indicator):
+            return bar  # type: ignore[return-value]
+        return getattr(bar, self._column.lower())
+
+
+class _RangeIndicator(Indicator):
+    """
+    Indicator of the high, low and close columns.
+    """
+
+    def _prices(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._data.High, self._data.Low, self._data.Close
+
+    @staticmethod
+    def _price(bar: Candlestick) -> tuple[float, float, float]:
+        return bar.high, bar.low, bar.close
+
+
+class _Lines:
+    """
+    Named lines of a multi-line indicator, stacked on the last axis so
+    that panels keep one column per instrument; `value` is the last row.
+    """
+
+    _values: np.ndarray
+
+    @staticmethod
+    def _stack(lines) -> np.ndarray:
+        return np.stack(lines, axis=-1)
+
+    def _line(self, index: int) -> np.ndarray:
+        return self._values[..., index]
+
+
+class SMA(_PriceIndicator):
+
+    def _run(self, period: int = 20, column: str = "Close"):
+        self._column = column
+        self._stream = SmaStream(period)
+        return self._stream.resume(self._prices())
+
+    def _step(self, new_bar: Candlestick):
+        return self._stream.update(self._price(new_bar))
+
+
+class EMA(_PriceIndicator):
+
+    def _run(self, period: int = 20, column: str = "Close"):
+        self._column = column
+        self._stream = EmaStream(period)
+        return self._stream.resume(self._prices())
+
+    def _step(self, new_bar: Candlestick):
+        return self._stream.update(self._price(new_bar))
+
+
+class RSI(_PriceIndicator):
+
+    def _run(self, period: int = 14, column: str = "Close"):
+        self._column = column
+        self._stream = RsiStream(period)
+        return self._stream.resume(self._prices())
+
+    def _step(self, new_bar: Candlestick):
+        return self._stream.update(self._price(new_bar))
+
+
+class ATR(_RangeIndicator):
+
+    def _run(self, period: int = 14):
+        self._stream = AtrStream(period)
+        return self._stream.resume(*self._prices())
+
+    def _step(self, new_bar: Candlestick):
+        return self._stream.update(*self._price(new_bar))
+
+
+class BollingerBands(_Lines, _PriceIndicator):
+    """
+    Rows of (middle, upper, lower).
+    """
+
+    lines = ("middle", "upper", "lower")
+
+    def _run(self, period: int = 20, k: float = 2.0, column: str = "Close"):
+        self._column = column
+        self._stream = BollingerStream(period, k)
+        return self._stack(self._stream.resume(self._prices()))
+
+    def _step(self, new_bar: Candlestick):
+        return self._stack(self._stream.update(self._price(new_bar)))
+
+    @property
+    def middle(self) -> np.ndarray:
+        return self._line(0)
+
+    @property
+    def upper(self) -> np.ndarray:
+        return self._line(1)
+
+    @property
+    def lower(self) -> np.ndarray:
+        return self._line(2)
+
+
+class MACD(_Lines, _PriceIndicator):
+    """
+    Rows of (macd, signal, histogram).
+    """
+
+    lines = ("macd", "signal", "histogram")
+
+    def _run(
+        self, fast: int = 12, slow: int = 26, signal: int = 9, column: str = "Close"
+    ):
+        self._column = column
+        self._stream = MacdStream(fast, slow, signal)
+        return self._stack(self._stream.resume(self._prices()))
+
+    def _step(self, new_bar: Candlestick):
+        return self._stack(self._stream.update(self._price(new_bar)))
+
+    @property
+    def macd(self) -> np.ndarray:
+        return self._line(0)
+
+    @property
+    def signal(self) -> np.ndarray:
+        return self._line(1)
+
+    @property
+    def histogram(self) -> np.ndarray:
+        return self._line(2)
+
+
+class Stochastic(_Lines, _RangeIndicator):
+    """
+    Rows of (%K, %D).
+    """
+
+    lines = ("k", "d")
+
+    def _run(self, k: int = 14, d: int = 3):
+        self._stream = StochasticStream(k, d)
+        return self._stack(self._stream.resume(*self._prices()))
+
+    def _step(self, new_bar: Candlestick):
+        return self._stack(self._stream.update(*self._price(new_bar)))
+
+    @property
+    def k(self) -> np.ndarray:
+        return self._line(0)
+
+    @property
+    def d(self) -> np.ndarray:
+        return self._line(1)
+
+
+class Donchian(_Lines, _RangeIndicator):
+    """
+    Rows of (upper, middle, lower).
+    """
+
+    lines = ("upper", "middle", "lower")
+
+    def _run(self, period: int = 20):
+        self._stream = DonchianStream(period)
+        high, low, _ = self._prices()
+        return self._stack(self._stream.resume(high, low))
+
+    def _step(self, new_bar: Candlestick):
+        return self._stack(self._stream.update(new_bar.high, new_bar.low))
+
+    @property
+    def upper(self) -> np.ndarray:
+        return self._line(0)
+
+    @property
+    def middle(self) -> np.ndarray:
+        return self._line(1)
+
+    @property
+    def lower(self) -> np.ndarray:
+        return self._line(2)
+
+
+class ADX(_Lines, _RangeIndicator):
+    """
+    Rows of (ADX, +DI, -DI).
+    """
+
+    lines = ("adx", "plus_di", "minus_di")
+
+    def _run(self, period: int = 14):
+        self._stream = AdxStream(period)
+        return self._stack(self._stream.resume(*self._prices()))
+
+    def _step(self, new_bar: Candlestick):
+        return self._stack(self._stream.update(*self._price(new_bar)))
+
+    @property
+    def adx(self) -> np.ndarray:
+        return self._line(0)
+
+    @property
+    def plus_di(self) -> np.ndarray:
+        return self._line(1)
+
+    @property
+    def minus_di(self) -> np.ndarray:
+        return self._line(2)
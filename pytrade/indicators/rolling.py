@@ -0,0 +1,174 @@
+"""
+O(1) amortized rolling-window primitives for composing streaming
+indicators. Each keeps the state of a trailing window of `period`
+values: `update` adds the next value and returns the statistic for the
+window, NaN until it is full, and `resume` computes the statistic for a
+whole series vectorized and leaves the state positioned after its last
+value. Leading NaNs are skipped, so primitives can consume the output
+of other indicators, and values may be scalars or 1-D arrays with one
+value per series.
+"""
+
+import operator
+from collections import deque
+
+import numpy as np
+
+from pytrade.indicators import functions
+
+
+def _isnan(x) -> bool:
+    return bool(np.all(np.isnan(x)))
+
+
+def _nan(x):
+    return x * np.nan
+
+
+def _tail(x: np.ndarray, period: int) -> np.ndarray:
+    """
+    The last `period` rows after any leading NaNs.
+    """
+    start = max(functions.first_valid(x), len(x) - period)
+    return x[start:]
+
+
+class RollingSum:
+
+    def __init__(self, period: int):
+        self.period = period
+        self._window: deque = deque()
+        self._sum = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+
+    def update(self, x):
+        if not self._window and _isnan(x):
+            return _nan(x)
+        self._window.append(x)
+        self._sum = self._sum + x
+        if len(self._window) > self.period:
+            self._sum = self._sum - self._window.popleft()
+        return self._sum if self.ready else _nan(x)
+
+    def resume(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        tail = _tail(x, self.period)
+        self._window = deque(tail)
+        self._sum = tail.sum(axis=0) if len(tail) else 0.0
+        return functions.rolling_sum(x, self.period)
+
+
+class RollingMoments:
+    """
+    Mean and population variance of the window by Welford's algorithm,
+    updated in place as values enter and leave it.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self._window: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+
+    def update(self, x):
+        if not self._window and _isnan(x):
+            return _nan(x), _nan(x)
+        self._window.append(x)
+        mean = self._mean
+        if len(self._window) > self.period:
+            old = self._window.popleft()
+            self._mean = mean + (x - old) / self.period
+            self._m2 = self._m2 + (x - old) * (x - self._mean + old - mean)
+        else:
+            self._mean = mean + (x - mean) / len(self._window)
+            self._m2 = self._m2 + (x - mean) * (x - self._mean)
+        if not self.ready:
+            return _nan(x), _nan(x)
+        return self._mean, np.maximum(self._m2 / self.period, 0.0)
+
+    def resume(self, x) -> tuple[np.ndarray, np.ndarray]:
+        x = np.asarray(x, dtype=np.float64)
+        tail = _tail(x, self.period)
+        self._window = deque(tail)
+        self._mean = tail.mean(axis=0) if len(tail) else 0.0
+        self._m2 = ((tail - self._mean) ** 2).sum(axis=0) if len(tail) else 0.0
+        return functions.sma(x, self.period), functions.rolling_var(x, self.period)
+
+
+class _MonotonicWindow:
+    """
+    Extremum of the window from a deque of (position, value) candidates
+    kept in monotonic order: a new value evicts every candidate it
+    dominates, so each value is pushed and popped at most once. Arrays
+    keep one deque per series.
+    """
+
+    _keep = staticmethod(operator.gt)
+    _batch = staticmethod(functions.rolling_max)
+
+    def __init__(self, period: int):
+        self.period = period
+        self._seen = 0
+        self._windows: list[deque] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._seen >= self.period
+
+    def _push(self, window: deque, position: int, x):
+        keep = self._keep
+        while window and not keep(window[-1][1], x):
+            window.pop()
+        window.append((position, x))
+        if window[0][0] <= position - self.period:
+            window.popleft()
+        return window[0][1]
+
+    def update(self, x):
+        if not self._seen and _isnan(x):
+            return _nan(x)
+        position = self._seen
+        self._seen += 1
+        if np.ndim(x):
+            if not self._windows:
+                self._windows = [deque() for _ in range(len(x))]
+            extremum = np.array(
+                [self._push(window, position, v) for window, v in zip(self._windows, x)]
+            )
+        else:
+            if not self._windows:
+                self._windows = [deque()]
+            extremum = self._push(self._windows[0], position, x)
+        return extremum if self.ready else _nan(x)
+
+    def resume(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        tail = _tail(x, self.period)
+        self._seen = 0
+        self._windows = []
+        for value in tail:
+            self.update(value)
+        self._seen = len(x) - functions.first_valid(x)
+        if self._windows:
+            offset = self._seen - len(tail)
+            self._windows = [
+                deque((p + offset, v) for p, v in window) for window in self._windows
+            ]
+        return self._batch(x, self.period)
+
+
+class RollingMax(_MonotonicWindow):
+    pass
+
+
+class RollingMin(_MonotonicWindow):
+
+    _keep = staticmethod(operator.lt)
+    _batch = staticmethod(functions.rolling_min)
@@ -0,0 +1,124 @@
+"""
+Crossover and trend signals, vectorized over a whole history for
+backtests and as indicator nodes which step in O(1) from the latest
+values in live trading. The comparisons made for a single bar are also
+available directly as `Indicator.crossover`, `crossunder`, `rising` and
+`falling`.
+"""
+
+import numpy as np
+
+from pytrade.indicators import functions
+from pytrade.models.indicator import Indicator
+
+
+def _values(x):
+    return x.to_array if isinstance(x, Indicator) else x
+
+
+def crossover(a, b) -> np.ndarray:
+    """
+    True on bars where `a` moved above `b`, a series or a constant.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.broadcast_to(np.asarray(b, dtype=np.float64), a.shape)
+    out = np.zeros(a.shape, dtype=bool)
+    out[1:] = (a[1:] > b[1:]) & (a[:-1] <= b[:-1])
+    return out
+
+
+def crossunder(a, b) -> np.ndarray:
+    """
+    True on bars where `a` moved below `b`, a series or a constant.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.broadcast_to(np.asarray(b, dtype=np.float64), a.shape)
+    out = np.zeros(a.shape, dtype=bool)
+    out[1:] = (a[1:] < b[1:]) & (a[:-1] >= b[:-1])
+    return out
+
+
+def bars_since(condition) -> np.ndarray:
+    """
+    Bars since `condition` was last true, 0 on the bar itself and NaN
+    before it first holds.
+    """
+    condition = np.asarray(condition, dtype=bool)
+    positions = np.arange(len(condition)).reshape(-1, *([1] * (condition.ndim - 1)))
+    last = np.maximum.accumulate(np.where(condition, positions, -1), axis=0)
+    return np.where(last >= 0, positions - last, np.nan)
+
+
+def rising(x, n: int = 1) -> np.ndarray:
+    """
+    True on bars where `x` rose on each of the last `n` bars.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.zeros(x.shape, dtype=bool)
+    out[1:] = functions.rolling_sum(x[1:] > x[:-1], n) == n
+    return out
+
+
+def falling(x, n: int = 1) -> np.ndarray:
+    """
+    True on bars where `x` fell on each of the last `n` bars.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.zeros(x.shape, dtype=bool)
+    out[1:] = functions.rolling_sum(x[1:] < x[:-1], n) == n
+    return out
+
+
+class Crossover(Indicator):
+    """
+    `crossover` of an indicator and `other`, an indicator or a constant.
+    """
+
+    def _run(self, other):
+        return crossover(self._data.to_array, _values(other))
+
+    def _step(self, value):
+        return self._data.crossover(self._args[0])
+
+
+class Crossunder(Indicator):
+    """
+    `crossunder` of an indicator and `other`, an indicator or a constant.
+    """
+
+    def _run(self, other):
+        return crossunder(self._data.to_array, _values(other))
+
+    def _step(self, value):
+        return self._data.crossunder(self._args[0])
+
+
+class Rising(Indicator):
+
+    def _run(self, n: int = 1):
+        return rising(self._data.to_array, n)
+
+    def _step(self, value):
+        return self._data.rising(*self._args, **self._kwargs)
+
+
+class Falling(Indicator):
+
+    def _run(self, n: int = 1):
+        return falling(self._data.to_array, n)
+
+    def _step(self, value):
+        return self._data.falling(*self._args, **self._kwargs)
+
+
+class BarsSince(Indicator):
+    """
+    `bars_since` of a boolean indicator such as `Crossover`.
+    """
+
+    def _run(self):
+        return bars_since(self._data.to_array)
+
+    def _step(self, value):
+        previous = self._values[-1] if len(self._values) else np.nan
+        return np.where(value, 0.0, previous + 1)
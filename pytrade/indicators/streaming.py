@@ -0,0 +1,260 @@
+"""
+O(1) streaming counterparts of `pytrade.indicators.functions`.
+
+Each state advances one bar at a time with `update` and produces exactly
+what the batch function would for that bar. `resume` computes the batch
+result for a whole history and leaves the state positioned after its
+last bar, so a stream can be warmed up vectorized and then stepped.
+Inputs may be scalars or, for panels, 1-D arrays with one value per
+series.
+"""
+
+import numpy as np
+
+from pytrade.indicators import functions
+from pytrade.indicators.rolling import (
+    RollingMax,
+    RollingMin,
+    RollingMoments,
+    RollingSum,
+)
+
+
+def _isnan(x) -> bool:
+    return bool(np.all(np.isnan(x)))
+
+
+def _nan(x):
+    return x * np.nan
+
+
+class SmaStream:
+
+    def __init__(self, period: int):
+        self.period = period
+        self._sum = RollingSum(period)
+
+    @property
+    def ready(self) -> bool:
+        return self._sum.ready
+
+    def update(self, x):
+        return self._sum.update(x) / self.period
+
+    def resume(self, x) -> np.ndarray:
+        return self._sum.resume(x) / self.period
+
+
+class EmaStream:
+    """
+    Seeded with the SMA of the first `period` values, then smoothed with
+    `alpha`, `2 / (period + 1)` by default.
+    """
+
+    def __init__(self, period: int, alpha: float | None = None):
+        self.period = period
+        self.alpha = 2 / (period + 1) if alpha is None else alpha
+        self._seed = SmaStream(period)
+        self._value = None
+
+    def update(self, x):
+        if self._value is None:
+            seed = self._seed.update(x)
+            if self._seed.ready:
+                self._value = seed
+            return seed
+        self._value = self._value + self.alpha * (x - self._value)
+        return self._value
+
+    def resume(self, x) -> np.ndarray:
+        values = functions.ema(x, self.period, self.alpha)
+        self._seed = SmaStream(self.period)
+        if len(values) and not _isnan(values[-1]):
+            self._value = values[-1]
+        else:
+            self._value = None
+            self._seed.resume(x)
+        return values
+
+
+class WilderStream(EmaStream):
+
+    def __init__(self, period: int):
+        super().__init__(period, alpha=1 / period)
+
+
+class RsiStream:
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._previous = None
+        self._gain = WilderStream(period)
+        self._loss = WilderStream(period)
+
+    def update(self, close):
+        delta = _nan(close) if self._previous is None else close - self._previous
+        self._previous = close
+        return functions.strength(
+            self._gain.update(np.clip(delta, 0, None)),
+            self._loss.update(np.clip(-delta, 0, None)),
+        )
+
+    def resume(self, close) -> np.ndarray:
+        close = np.asarray(close, dtype=np.float64)
+        delta = np.full(close.shape, np.nan)
+        delta[1:] = np.diff(close, axis=0)
+        self._previous = close[-1] if len(close) else None
+        return functions.strength(
+            self._gain.resume(np.clip(delta, 0, None)),
+            self._loss.resume(np.clip(-delta, 0, None)),
+        )
+
+
+class _TrueRange:
+
+    def __init__(self):
+        self.previous = None
+
+    def update(self, high, low, close):
+        tr = high - low
+        if self.previous is not None:
+            tr = np.maximum(
+                tr,
+                np.maximum(np.abs(high - self.previous), np.abs(low - self.previous)),
+            )
+        self.previous = close
+        return tr
+
+    def resume(self, high, low, close) -> np.ndarray:
+        self.previous = close[-1] if len(close) else None
+        return functions.true_range(high, low, close)
+
+
+class AtrStream:
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._tr = _TrueRange()
+        self._average = WilderStream(period)
+
+    def update(self, high, low, close):
+        return self._average.update(self._tr.update(high, low, close))
+
+    def resume(self, high, low, close) -> np.ndarray:
+        return self._average.resume(self._tr.resume(high, low, close))
+
+
+class BollingerStream:
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.period = period
+        self.k = k
+        self._moments = RollingMoments(period)
+
+    def update(self, x):
+        middle, variance = self._moments.update(x)
+        width = self.k * np.sqrt(variance)
+        return middle, middle + width, middle - width
+
+    def resume(self, x) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        middle, variance = self._moments.resume(x)
+        width = self.k * np.sqrt(variance)
+        return middle, middle + width, middle - width
+
+
+class MacdStream:
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EmaStream(fast)
+        self._slow = EmaStream(slow)
+        self._signal = EmaStream(signal)
+
+    def update(self, x):
+        line = self._fast.update(x) - self._slow.update(x)
+        signal = self._signal.update(line)
+        return line, signal, line - signal
+
+    def resume(self, x) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        line = self._fast.resume(x) - self._slow.resume(x)
+        signal = self._signal.resume(line)
+        return line, signal, line - signal
+
+
+class StochasticStream:
+
+    def __init__(self, k: int = 14, d: int = 3):
+        self.k = k
+        self._highest = RollingMax(k)
+        self._lowest = RollingMin(k)
+        self._d = SmaStream(d)
+
+    def update(self, high, low, close):
+        percent_k = functions.stochastic_k(
+            close, self._highest.update(high), self._lowest.update(low)
+        )
+        return percent_k, self._d.update(percent_k)
+
+    def resume(self, high, low, close) -> tuple[np.ndarray, np.ndarray]:
+        percent_k = functions.stochastic_k(
+            np.asarray(close, dtype=np.float64),
+            self._highest.resume(high),
+            self._lowest.resume(low),
+        )
+        return percent_k, self._d.resume(percent_k)
+
+
+class DonchianStream:
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._highest = RollingMax(period)
+        self._lowest = RollingMin(period)
+
+    def update(self, high, low):
+        upper, lower = self._highest.update(high), self._lowest.update(low)
+        return upper, (upper + lower) / 2, lower
+
+    def resume(self, high, low) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        upper, lower = self._highest.resume(high), self._lowest.resume(low)
+        return upper, (upper + lower) / 2, lower
+
+
+class AdxStream:
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._previous = None
+        self._tr = WilderStream(period)
+        self._plus = WilderStream(period)
+        self._minus = WilderStream(period)
+        self._adx = WilderStream(period)
+
+    def update(self, high, low, close):
+        if self._previous is None:
+            tr = plus = minus = _nan(close)
+        else:
+            previous_high, previous_low, previous_close = self._previous
+            tr = np.maximum(
+                high - low,
+                np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)),
+            )
+            up, down = high - previous_high, previous_low - low
+            plus = np.where((up > down) & (up > 0), up, 0.0)
+            minus = np.where((down > up) & (down > 0), down, 0.0)
+        self._previous = (high, low, close)
+        plus_di, minus_di, dx = functions.directional_index(
+            self._tr.update(tr), self._plus.update(plus), self._minus.update(minus)
+        )
+        return self._adx.update(dx), plus_di, minus_di
+
+    def resume(self, high, low, close) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self._previous = (high[-1], low[-1], close[-1]) if len(close) else None
+        tr = functions.true_range(high, low, close)
+        tr[:1] = np.nan
+        plus_dm, minus_dm = functions.directional_movement(high, low)
+        plus_di, minus_di, dx = functions.directional_index(
+            self._tr.resume(tr),
+            self._plus.resume(plus_dm),
+            self._minus.resume(minus_dm),
+        )
+        return self._adx.resume(dx), plus_di, minus_di
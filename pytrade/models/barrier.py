@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+from pandas import Timestamp
+
+from pytrade.models.instruments import (
+    MINUTES_MAP,
+    NANOS_PER_MINUTE,
+    Candlestick,
+    CandleSubscription,
+)
+
+
+class BarBarrier:
+    """
+    Releases a strategy once every subscription has delivered its bars
+    for a period, the bar of its longest granularity.
+
+    Arrivals are counted per period, keyed by the bar timestamp rounded
+    down to the period, with one integer per subscription. Feeds running
+    ahead into the next period therefore count towards that period
+    rather than the current one, and a revision of a bar which already
+    arrived is not counted twice.
+
+    Periods are released in order. A period still waiting when a later
+    one completes, or `timeout` seconds after its end, is released as
+    incomplete and `missing` records which subscriptions fell short.
+    Candles arriving for a period which was already released are ignored.
+
+    Period ends are in bar time, epoch nanoseconds with naive timestamps
+    taken as UTC, and are compared with `clock`, the wall clock unless
+    given, e.g. to replay history.
+    """
+
+    def __init__(
+        self,
+        subscriptions: Iterable[CandleSubscription],
+        timeout: Optional[float] = None,
+        clock: Callable[[], int] = time.time_ns,
+    ):
+        subscriptions = list(dict.fromkeys(subscriptions))
+        if not subscriptions:
+            raise RuntimeError("A barrier requires at least one subscription.")
+        minutes = max(MINUTES_MAP[s.granularity] for s in subscriptions)
+        self._period = minutes * NANOS_PER_MINUTE
+        self._timeout = None if timeout is None else int(timeout * 1e9)
+        self._clock = clock
+        self._keys = [(s.instrument, s.granularity) for s in subscriptions]
+        self._slots = {key: i for i, key in enumerate(self._keys)}
+        self._expected = [minutes // MINUTES_MAP[s.granularity] for s in subscriptions]
+        self._total = sum(self._expected)
+        self._last = [-1] * len(self._keys)
+        # period -> [outstanding bars, remaining per subscription]
+        self._open: dict[int, list] = {}
+        self._released = -1
+        self._ready: deque[int] = deque()
+        self._missing: dict[int, dict[CandleSubscription, int]] = {}
+        self._lock = threading.Lock()
+        self._waiter: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = None
+
+    @property
+    def period(self) -> int:
+        """
+        Length of a period in nanoseconds.
+        """
+        return self._period
+
+    @property
+    def outstanding(self) -> dict[int, int]:
+        """
+        Bars still expected, per open period start in epoch nanoseconds.
+        """
+        with self._lock:
+            return {period: state[0] for period, state in self._open.items()}
+
+    @property
+    def missing(self) -> dict[int, dict[CandleSubscription, int]]:
+        """
+        Bars which never arrived, per period released as incomplete.
+        """
+        return self._missing
+
+    def arrive(self, candle: Candlestick) -> Optional[int]:
+        """
+        Count `candle`, returning the start of the period it released.
+        """
+        slot = self._slots.get((candle.instrument, candle.granularity))
+        if slot is None:
+            return None
+        timestamp = Timestamp(candle.timestamp).value
+        period = timestamp - timestamp % self._period
+        with self._lock:
+            if timestamp <= self._last[slot] or period <= self._released:
+                return None
+            self._last[slot] = timestamp
+            state = self._open.get(period)
+            if state is None:
+                state = self._open[period] = [self._total, *self._expected]
+                # A waiter sleeping until an older deadline, or none, reschedules
+                self._wake()
+            if not state[slot + 1]:
+                return None
+            state[slot + 1] -= 1
+            state[0] -= 1
+            if state[0]:
+                return None
+            del self._open[period]
+            self._release(period)
+        return period
+
+    def _release(self, period: int):
+        for stale in [p for p in self._open if p < period]:
+            self._record_missing(stale)
+        self._released = period
+        self._ready.append(period)
+        self._wake()
+
+    def _wake(self):
+        if self._waiter is not None:
+            loop, future = self._waiter
+            self._waiter = None
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def _record_missing(self, period: int):
+        state = self._open.pop(period)
+        self._missing[period] = {
+            CandleSubscription(*key): remaining
+            for key, remaining in zip(self._keys, state[1:])
+            if remaining
+        }
+
+    def expire(self) -> Optional[int]:
+        """
+        Release the oldest open period as incomplete.
+        """
+        with self._lock:
+            if not self._open:
+                return None
+            period = min(self._open)
+            self._record_missing(period)
+            self._release(period)
+        return period
+
+    def _due(self) -> Optional[float]:
+        """
+        Seconds until the oldest open period times out, or None.
+        """
+        if self._timeout is None or not self._open:
+            return None
+        deadline = min(self._open) + self._period + self._timeout
+        return (deadline - self._clock()) / 1e9
+
+    async def wait(self) -> int:
+        """
+        Wait for the next period to be released and return its start.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                due = self._due()
+                if not self._ready and due is not None and due <= 0:
+                    period = min(self._open)
+                    self._record_missing(period)
+                    self._release(period)
+                if self._ready:
+                    return self._ready.popleft()
+                future = loop.create_future()
+                self._waiter = (loop, future)
+            try:
+                await asyncio.wait_for(future, due)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self._waiter = None
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,573 @@
+import json
+import os
+import sys
+from datetime import timezone, tzinfo
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("timestamp", "open", "high", "low", "close")
+
+_COUNT = 0
+_HEADER_SIZE = 1
+
+_SEQUENCE = 1
+_MAX_SIZE = 2
+_ITEMSIZE = 3
+_UTC = 4
+_SHARED_HEADER_SIZE = 8
+
+
+class CandleBuffer:
+    """
+    Columnar, fixed-capacity storage for a single candle series.
+
+    Prices are kept in float arrays and timestamps as int64 epoch
+    nanoseconds. When `max_size` is set the buffer is a ring: every
+    value is written twice, at `pos` and `pos + max_size`, so the most
+    recent `max_size` rows are always a contiguous slice and can be
+    handed out as ordered views without copying. Appends are O(1) and
+    never reallocate.
+
+    Without `max_size` the buffer grows by doubling.
+    """
+
+    _initial_capacity = 1024
+
+    def __init__(self, max_size: Optional[int] = None, dtype=np.float64):
+        if max_size is not None and max_size < 1:
+            raise RuntimeError(f"Invalid max size {max_size} for candle buffer.")
+        self._max_size = max_size
+        self._dtype = np.dtype(dtype)
+        self._tz: Optional[tzinfo] = None
+        self._header = self._create_header()
+        self._allocate(self._capacity_hint())
+
+    def _capacity_hint(self) -> int:
+        return self._max_size or self._initial_capacity
+
+    def _create_header(self) -> np.ndarray:
+        return np.zeros(_HEADER_SIZE, dtype=np.int64)
+
+    def _create_column(self, field: str, dtype: np.dtype, rows: int) -> np.ndarray:
+        return np.zeros(rows, dtype=dtype)
+
+    def _allocate(self, capacity: int):
+        rows = 2 * capacity if self._max_size else capacity
+        self._capacity = capacity
+        self._columns = [
+            self._create_column(
+                field,
+                np.dtype(np.int64) if field == "timestamp" else self._dtype,
+                rows,
+            )
+            for field in FIELDS
+        ]
+        self._timestamps, self._open, self._high, self._low, self._close = self._columns
+
+    def _grow(self, required: int):
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+        size = len(self)
+        columns = self._columns
+        self._allocate(capacity)
+        for column, previous in zip(self._columns, columns):
+            column[:size] = previous[:size]
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self._header.nbytes + sum(column.nbytes for column in self._columns)
+
+    @property
+    def tz(self) -> Optional[tzinfo]:
+        """
+        Timezone the stored epoch timestamps are presented in.
+        """
+        return self._tz
+
+    @tz.setter
+    def tz(self, value: Optional[tzinfo]):
+        self._tz = value
+
+    @property
+    def _count(self) -> int:
+        return int(self._header[_COUNT])
+
+    @_count.setter
+    def _count(self, value: int):
+        self._header[_COUNT] = value
+
+    @property
+    def count(self) -> int:
+        """
+        Total number of rows ever appended, including those which have
+        since been evicted from the ring.
+        """
+        return self._count
+
+    def __len__(self) -> int:
+        return min(self._count, self._max_size) if self._max_size else self._count
+
+    def _window(self) -> slice:
+        size = len(self)
+        if self._max_size:
+            end = self._count % self._capacity + self._capacity
+            return slice(end - size, end)
+        return slice(0, size)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[self._window()]
+
+    @property
+    def prices(self) -> np.ndarray:
+        """
+        Copy of shape (4, len) holding Open, High, Low and Close rows.
+        """
+        window = self._window()
+        return np.vstack([column[window] for column in self._columns[1:]])
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._open[self._window()]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._high[self._window()]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._low[self._window()]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._close[self._window()]
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        count = self._count
+        if not count:
+            return None
+        return int(self._timestamps[self._position(count - 1)])
+
+    def _position(self, row: int) -> int:
+        return row % self._capacity if self._max_size else row
+
+    def _write(
+        self,
+        pos: int,
+        timestamp: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+    ):
+        self._timestamps[pos] = timestamp
+        self._open[pos] = open
+        self._high[pos] = high
+        self._low[pos] = low
+        self._close[pos] = close
+
+    def append(
+        self, timestamp: int, open: float, high: float, low: float, close: float
+    ):
+        count = self._count
+        if self._max_size:
+            pos = count % self._capacity
+            self._write(pos, timestamp, open, high, low, close)
+            self._write(pos + self._capacity, timestamp, open, high, low, close)
+        else:
+            if count == self._capacity:
+                self._grow(count + 1)
+            self._write(count, timestamp, open, high, low, close)
+        self._count = count + 1
+
+    def replace_last(
+        self, timestamp: int, open: float, high: float, low: float, close: float
+    ):
+        count = self._count
+        if not count:
+            raise RuntimeError("Unable to replace the last row of an empty buffer.")
+        pos = self._position(count - 1)
+        self._write(pos, timestamp, open, high, low, close)
+        if self._max_size:
+            self._write(pos + self._capacity, timestamp, open, high, low, close)
+
+    def revise(self, rows: np.ndarray, prices: np.ndarray):
+        """
+        Overwrite the prices of `rows`, positions within the stored
+        window. `prices` has shape (4, len(rows)).
+        """
+        positions = np.asarray(rows) + self._window().start
+        for column, value in zip(self._columns[1:], prices):
+            column[positions] = value
+            if self._max_size:
+                column[(positions + self._capacity) % (2 * self._capacity)] = value
+
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray):
+        """
+        Append `n` rows at once. `prices` has shape (4, n) in
+        Open, High, Low, Close order.
+        """
+        n = len(timestamps)
+        if not n:
+            return
+        count = self._count
+        values = [timestamps, *prices]
+        if self._max_size:
+            kept = slice(max(0, n - self._capacity), n)
+            positions = np.arange(count + kept.start, count + n) % self._capacity
+            for column, value in zip(self._columns, values):
+                column[positions] = value[kept]
+                column[positions + self._capacity] = value[kept]
+        else:
+            if count + n > self._capacity:
+                self._grow(count + n)
+            rows = slice(count, count + n)
+            for column, value in zip(self._columns, values):
+                column[rows] = value
+        self._count = count + n
+
+
+class RingBuffer:
+    """
+    One-dimensional counterpart of `CandleBuffer` for derived series such
+    as indicator values. Items may themselves be arrays of `shape`.
+    """
+
+    _initial_capacity = 1024
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        dtype=np.float64,
+        shape: tuple[int, ...] = (),
+    ):
+        if max_size is not None and max_size < 1:
+            raise RuntimeError(f"Invalid max size {max_size} for ring buffer.")
+        self._max_size = max_size
+        self._dtype = np.dtype(dtype)
+        self._shape = shape
+        self._count = 0
+        self._allocate(max_size or self._initial_capacity)
+
+    def _allocate(self, capacity: int):
+        rows = 2 * capacity if self._max_size else capacity
+        self._capacity = capacity
+        self._data = np.zeros((rows, *self._shape), dtype=self._dtype)
+
+    def _grow(self, required: int):
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+        previous = self._data
+        self._allocate(capacity)
+        rows = slice(0, self._count)
+        self._data[rows] = previous[rows]
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._shape
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def __len__(self) -> int:
+        return min(self._count, self._max_size) if self._max_size else self._count
+
+    @property
+    def values(self) -> np.ndarray:
+        size = len(self)
+        if self._max_size:
+            end = self._count % self._capacity + self._capacity
+            return self._data[slice(end - size, end)]
+        return self._data[:size]
+
+    def append(self, value):
+        count = self._count
+        if self._max_size:
+            pos = count % self._capacity
+            self._data[pos] = value
+            self._data[pos + self._capacity] = value
+        else:
+            if count == self._capacity:
+                self._grow(count + 1)
+            self._data[count] = value
+        self._count = count + 1
+
+    def replace_last(self, value):
+        count = self._count
+        if not count:
+            raise RuntimeError("Unable to replace the last item of an empty buffer.")
+        if self._max_size:
+            pos = (count - 1) % self._capacity
+            self._data[pos] = value
+            self._data[pos + self._capacity] = value
+        else:
+            self._data[count - 1] = value
+
+    def extend(self, values: np.ndarray):
+        n = len(values)
+        if not n:
+            return
+        count = self._count
+        if self._max_size:
+            kept = slice(max(0, n - self._capacity), n)
+            positions = np.arange(count + kept.start, count + n) % self._capacity
+            self._data[positions] = values[kept]
+            self._data[positions + self._capacity] = values[kept]
+        else:
+            if count + n > self._capacity:
+                self._grow(count + n)
+            self._data[slice(count, count + n)] = values
+        self._count = count + n
+
+    def clear(self):
+        self._count = 0
+
+
+class MemmapCandleBuffer(CandleBuffer):
+    """
+    `CandleBuffer` persisted as one memory-mapped file per column in the
+    `path` directory. Reopening a series maps the stored candles without
+    copying them, and unbounded series grow their files in place.
+    """
+
+    def __init__(self, path: str, max_size: Optional[int] = None, dtype=np.float64):
+        self._path = path
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "meta.json")
+        meta = {"max_size": max_size, "dtype": np.dtype(dtype).name, "tz": None}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                stored = json.load(f)
+            for key in ("max_size", "dtype"):
+                if stored[key] != meta[key]:
+                    raise RuntimeError(
+                        f"Candle store at {path} has {key}={stored[key]}, requested {meta[key]}"
+                    )
+            meta = stored
+        else:
+            self._write_meta(meta)
+        self._meta = meta
+        super().__init__(max_size=max_size, dtype=dtype)
+        if meta["tz"] is not None:
+            self._tz = pd.Timestamp(0, tz=meta["tz"]).tzinfo
+
+    def _write_meta(self, meta: dict):
+        with open(self._meta_path, "w") as f:
+            json.dump(meta, f)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self._path, f"{name}.bin")
+
+    def _capacity_hint(self) -> int:
+        filename = self._file("timestamp")
+        if self._max_size or not os.path.exists(filename):
+            return super()._capacity_hint()
+        rows = os.path.getsize(filename) // np.dtype(np.int64).itemsize
+        return max(rows, self._initial_capacity)
+
+    def _map(self, name: str, dtype: np.dtype, rows: int) -> np.ndarray:
+        filename = self._file(name)
+        size = rows * dtype.itemsize
+        with open(filename, "ab") as f:
+            if os.path.getsize(filename) < size:
+                f.truncate(size)
+        return np.memmap(filename, dtype=dtype, mode="r+", shape=(rows,))
+
+    def _create_header(self) -> np.ndarray:
+        return self._map("header", np.dtype(np.int64), _HEADER_SIZE)
+
+    def _create_column(self, field: str, dtype: np.dtype, rows: int) -> np.ndarray:
+        return self._map(field, dtype, rows)
+
+    def _grow(self, required: int):
+        # Rows are laid out linearly when unbounded, so extending the files
+        # keeps existing candles where they are.
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+        self._allocate(capacity)
+
+    @CandleBuffer.tz.setter  # type: ignore[attr-defined]
+    def tz(self, value: Optional[tzinfo]):
+        self._tz = value
+        self._meta["tz"] = str(value) if value is not None else None
+        self._write_meta(self._meta)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def flush(self):
+        self._header.flush()  # type: ignore[attr-defined]
+        for column in self._columns:
+            column.flush()  # type: ignore[attr-defined]
+
+
+class SharedCandleBuffer(CandleBuffer):
+    """
+    Bounded `CandleBuffer` living in a `multiprocessing.shared_memory`
+    block named `name`. One process creates and writes it; any number
+    of processes attach with `create=False` and read the same memory
+    without copying.
+
+    Every write is bracketed by incrementing a sequence number, which is
+    odd while a write is in progress. Readers use it both to detect new
+    candles and, through `snapshot`, to take a consistent copy.
+    Timestamps are shared as naive or UTC.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: Optional[int] = None,
+        dtype=np.float64,
+        create: bool = True,
+    ):
+        header_size = _SHARED_HEADER_SIZE * np.dtype(np.int64).itemsize
+        if create:
+            if not max_size:
+                raise RuntimeError("Shared candle buffers require a max size.")
+            row_size = np.dtype(np.int64).itemsize + 4 * np.dtype(dtype).itemsize
+            self._shm = SharedMemory(
+                name=name, create=True, size=header_size + 2 * max_size * row_size
+            )
+            _created.add(self._shm.name)
+        else:
+            self._shm = _attach(name)
+            header = np.ndarray(_SHARED_HEADER_SIZE, np.int64, buffer=self._shm.buf)
+            max_size = int(header[_MAX_SIZE])
+            dtype = np.float32 if header[_ITEMSIZE] == 4 else np.float64
+        self._owner = create
+        self._offset = header_size
+        super().__init__(max_size=max_size, dtype=dtype)
+        if create:
+            self._header[_MAX_SIZE] = max_size
+            self._header[_ITEMSIZE] = self._dtype.itemsize
+
+    def _create_header(self) -> np.ndarray:
+        return np.ndarray(_SHARED_HEADER_SIZE, np.int64, buffer=self._shm.buf)
+
+    def _create_column(self, field: str, dtype: np.dtype, rows: int) -> np.ndarray:
+        column = np.ndarray(rows, dtype, buffer=self._shm.buf, offset=self._offset)
+        self._offset += column.nbytes
+        return column
+
+    def _grow(self, required: int):
+        raise RuntimeError("Shared candle buffers cannot grow.")
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def sequence(self) -> int:
+        return int(self._header[_SEQUENCE])
+
+    @property
+    def tz(self) -> Optional[tzinfo]:
+        # Read from the block, the writer may set it after readers attached
+        return timezone.utc if self._header[_UTC] else None
+
+    @tz.setter
+    def tz(self, value: Optional[tzinfo]):
+        self._check_owner()
+        if value is not None and value is not timezone.utc and str(value) != "UTC":
+            raise RuntimeError(
+                f"Shared candle buffers only hold naive or UTC timestamps, not {value}"
+            )
+        self._header[_UTC] = value is not None
+
+    def _check_owner(self):
+        if not self._owner:
+            raise RuntimeError(f"Shared candle buffer {self.name} is read only.")
+
+    def append(
+        self, timestamp: int, open: float, high: float, low: float, close: float
+    ):
+        self._check_owner()
+        self._header[_SEQUENCE] += 1
+        super().append(timestamp, open, high, low, close)
+        self._header[_SEQUENCE] += 1
+
+    def replace_last(
+        self, timestamp: int, open: float, high: float, low: float, close: float
+    ):
+        self._check_owner()
+        self._header[_SEQUENCE] += 1
+        super().replace_last(timestamp, open, high, low, close)
+        self._header[_SEQUENCE] += 1
+
+    def revise(self, rows: np.ndarray, prices: np.ndarray):
+        self._check_owner()
+        self._header[_SEQUENCE] += 1
+        super().revise(rows, prices)
+        self._header[_SEQUENCE] += 1
+
+    def extend(self, timestamps: np.ndarray, prices: np.ndarray):
+        self._check_owner()
+        self._header[_SEQUENCE] += 1
+        super().extend(timestamps, prices)
+        self._header[_SEQUENCE] += 1
+
+    def snapshot(self) -> tuple[int, np.ndarray, np.ndarray]:
+        """
+        Consistent copy of the buffer as `(sequence, timestamps, prices)`,
+        retried while the writer is mid-update.
+        """
+        while True:
+            sequence = self.sequence
+            if sequence % 2:
+                continue
+            timestamps, prices = self.timestamps.copy(), self.prices
+            if self.sequence == sequence:
+                return sequence, timestamps, prices
+
+    def release(self):
+        """
+        Unmap the block. Views handed out by this buffer must have been
+        released first. The creating process also removes the block.
+        """
+        self._header = self._columns = None  # type: ignore[assignment]
+        self._timestamps = self._open = self._high = self._low = self._close = None  # type: ignore
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+            _created.discard(self._shm.name)
+
+
+# Blocks created by this process, which stay registered with the resource tracker
+_created: set[str] = set()
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    shm = SharedMemory(name=name)
+    # Readers must not unlink the writer's block when they exit
+    if shm.name not in _created:
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
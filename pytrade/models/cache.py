@@ -0,0 +1,114 @@
+import hashlib
+import os
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class IndicatorCache:
+    """
+    On-disk cache of indicator values, for reuse across backtest runs and
+    parameter sweeps over the same history. Entries are `.npy` files
+    named by a content hash and served memory-mapped. Once the directory
+    holds more than `max_bytes`, the least recently used entries are
+    evicted. Several processes may share a directory.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30):
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        # Estimated from this process' writes, rescanned once over the limit
+        self._size = sum(size for _, size, _ in self._entries())
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @staticmethod
+    def key(description: str, arrays: Iterable[np.ndarray]) -> str:
+        """
+        Hash of `description` and the contents, dtypes and shapes of
+        `arrays`.
+        """
+        digest = hashlib.blake2b(description.encode(), digest_size=20)
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(f"|{array.dtype.str}{array.shape}|".encode())
+            digest.update(memoryview(array).cast("B"))
+        return digest.hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self._path, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        file = self._file(key)
+        try:
+            values = np.load(file, mmap_mode="r")
+            os.utime(file)
+        except (FileNotFoundError, ValueError):
+            self._misses += 1
+            return None
+        self._hits += 1
+        return values
+
+    def put(self, key: str, values: np.ndarray):
+        values = np.asarray(values)
+        if not values.size or values.dtype.hasobject:
+            return
+        file = self._file(key)
+        # Written aside and renamed so readers never map a partial file
+        temporary = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            np.save(f, values)
+        os.replace(temporary, file)
+        with self._lock:
+            self._size += os.path.getsize(file)
+            if self._size > self._max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[int, int, str]]:
+        entries = []
+        for entry in os.scandir(self._path):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for entry in os.scandir(self._path):
+            if entry.name.endswith(".npy"):
+                os.remove(entry.path)
+        self._size = 0
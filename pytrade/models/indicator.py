@@ -1,27 +1,50 @@
+import weakref
 from abc import abstractmethod
+from typing import Optional
 
 import numpy as np
+import pandas as pd
 
+from pytrade.events.event import Event
 from pytrade.interfaces.data import IInstrumentData
+from pytrade.models.buffer import RingBuffer
+from pytrade.models.cache import IndicatorCache
+from pytrade.models.instruments import INDEX, PRICE_COLUMNS, Candlestick
 
 
 class _Array(np.ndarray):
     """
     ndarray extended to supply .name and other arbitrary properties
-    in ._opts dict.
+    in ._opts dict. `index` holds the epoch nanosecond timestamps of the
+    rows and `tz` their timezone; slicing rows slices the index too.
     """
 
     def __new__(cls, array=[], *, name=None, **kwargs):
         obj = np.asarray(array).view(cls)
-        # obj.name = name or array.name
-        # obj._opts = kwargs
+        obj.name = name or getattr(array, "name", "")
+        obj._opts = kwargs
         return obj
 
     def __array_finalize__(self, obj):
-        pass
-        # if obj is not None:
-        # self.name = getattr(obj, "name", "")
-        # self._opts = getattr(obj, "_opts", {})
+        if obj is not None:
+            self.name = getattr(obj, "name", "")
+            self._opts = getattr(obj, "_opts", {})
+
+    def __getitem__(self, key):
+        result = super().__getitem__(key)
+        index = self._opts.get("index")
+        if isinstance(result, _Array) and index is not None:
+            rows = key[0] if isinstance(key, tuple) and key else key
+            if rows is Ellipsis:
+                return result
+            if isinstance(rows, slice):
+                index = index[rows]
+            elif isinstance(rows, (list, np.ndarray)) and np.ndim(rows) == 1:
+                index = index[np.asarray(rows)]
+            else:
+                index = None
+            result._opts = {**self._opts, "index": index}
+        return result
 
     # Make sure properties name and _opts are carried over
     # when (un-)pickling.
@@ -45,40 +68,417 @@ class _Array(np.ndarray):
         except IndexError:
             return super().__float__()
 
-    # def to_series(self):
-    #     warnings.warn(
-    #         "`.to_series()` is deprecated. For pd.Series conversion, use accessor `.s`"
-    #     )
-    #     return self.s
+    def _index(self) -> Optional[pd.DatetimeIndex]:
+        index = self._opts.get("index")
+        if index is None or len(index) != len(self):
+            return None
+        result = pd.DatetimeIndex(np.asarray(index).view("M8[ns]"), name=INDEX)
+        tz = self._opts.get("tz")
+        if tz is not None:
+            result = result.tz_localize("UTC").tz_convert(tz)
+        return result
+
+    @property
+    def s(self) -> pd.Series:
+        """
+        Series sharing memory with the array, valid for as long as it is.
+        """
+        if self.ndim != 1:
+            raise RuntimeError(
+                f"Unable to convert {self.ndim}-D values to a Series, use .df"
+            )
+        return pd.Series(
+            np.asarray(self), index=self._index(), name=self.name, copy=False
+        )
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        DataFrame sharing memory with the array, one column per line,
+        valid for as long as the array is.
+        """
+        values = np.asarray(self)
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        if values.ndim != 2:
+            raise RuntimeError(
+                f"Unable to convert {values.ndim}-D values to a DataFrame"
+            )
+        columns = self._opts.get("columns")
+        if columns is None:
+            width = values.shape[1]
+            columns = (
+                [self.name]
+                if width == 1
+                else [f"{self.name}[{i}]" for i in range(width)]
+            )
+        return pd.DataFrame(
+            values, index=self._index(), columns=list(columns), copy=False
+        )
 
-    # @property
-    # def s(self) -> pd.Series:
-    #     values = np.atleast_2d(self)
-    #     index = self._opts["index"][: values.shape[1]]
-    #     return pd.Series(values[0], index=index, name=self.name)
 
-    # @property
-    # def df(self) -> pd.DataFrame:
-    #     values = np.atleast_2d(np.asarray(self))
-    #     index = self._opts["index"][: values.shape[1]]
-    #     df = pd.DataFrame(values.T, index=index, columns=[self.name] * len(values))
-    #     return df
+def _key(value):
+    if isinstance(value, Indicator):
+        return Indicator, id(value)
+    hash(value)
+    return value
 
 
-class Indicator:
+class IndicatorGraph:
+    """
+    The indicators computed from one `IInstrumentData`, refreshed once per
+    update in dependency order.
 
-    def __init__(self, data: IInstrumentData, *args, **kwargs):
+    Identical nodes, the same class over the same inputs and arguments,
+    are shared, so a sub-expression such as an EMA used by two signals is
+    only computed once. A node whose inputs did not change since its last
+    refresh is skipped, and so are its dependents if its own output did
+    not change either.
+
+    Nodes are held weakly: an indicator nobody references any more stops
+    being refreshed and is garbage collected. Dependents keep their inputs
+    alive.
+    """
+
+    def __init__(self, data: IInstrumentData):
         self._data = data
+        self._nodes: dict[int, weakref.ref] = {}
+        self._order: tuple[weakref.ref, ...] = ()
+        self._index: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
         data.on_update += self._update
+
+    @classmethod
+    def of(cls, data: IInstrumentData) -> "IndicatorGraph":
+        graph = vars(data).get("_indicator_graph")
+        if graph is None:
+            graph = cls(data)
+            data._indicator_graph = graph  # type: ignore[attr-defined]
+        return graph
+
+    @property
+    def nodes(self) -> tuple["Indicator", ...]:
+        return tuple(
+            node for node in (ref() for ref in self._order) if node is not None
+        )
+
+    def find(self, key: tuple) -> Optional["Indicator"]:
+        return self._index.get(key)
+
+    def add(self, node: "Indicator", key: Optional[tuple] = None):
+        this = weakref.ref(self)
+
+        def discard(_, node_id=id(node)):
+            graph = this()
+            if graph is not None:
+                graph._nodes.pop(node_id, None)
+                graph._order = tuple(graph._nodes.values())
+
+        self._nodes[id(node)] = weakref.ref(node, discard)
+        self._order = tuple(self._nodes.values())
+        if key is not None:
+            self._index[key] = node
+
+    def _update(self):
+        for ref in self._order:
+            node = ref()
+            if node is not None:
+                node._refresh()
+
+
+class _IndicatorType(type):
+    """
+    Shares indicators: constructing one which already exists in the
+    graph of its inputs returns the existing instance without running
+    `__init__` again.
+    """
+
+    def __call__(cls, data, *args, **kwargs):
+        graph = IndicatorGraph.of(Indicator._root_of(data))
+        try:
+            key: Optional[tuple] = (
+                cls,
+                _key(data),
+                tuple(_key(arg) for arg in args),
+                tuple(
+                    sorted(
+                        (name, _key(arg))
+                        for name, arg in kwargs.items()
+                        if name not in ("lazy", "lookback", "cache")
+                    )
+                ),
+                kwargs.get("lookback") or cls.lookback,
+            )
+        except TypeError:
+            key = None
+        node = graph.find(key) if key is not None else None
+        if node is not None:
+            node._lazy = node._lazy and kwargs.get("lazy", False)
+            return node
+        node = cls.__new__(cls)
+        node._key = key
+        node.__init__(data, *args, **kwargs)
+        return node
+
+
+class Indicator(metaclass=_IndicatorType):
+    """
+    Values derived from an `IInstrumentData` history, or from other
+    indicators, refreshed whenever the history updates.
+    """
+
+    __hash__ = object.__hash__
+
+    # Bars `_run` needs: it then sees the latest `2 * lookback - 1` on a
+    # full refresh, or `lookback` for one appended bar, and only the latest
+    # `lookback` values are kept. Also a keyword argument.
+    lookback: Optional[int] = None
+
+    # Serves the computation made when the indicator is created, keyed by
+    # the class, its arguments and the contents of its inputs. After a hit
+    # the next refresh runs in full. Also a keyword argument.
+    cache: Optional[IndicatorCache] = None
+
+    def __init__(
+        self,
+        data,
+        *args,
+        lazy: bool = False,
+        lookback: Optional[int] = None,
+        cache: Optional[IndicatorCache] = None,
+        **kwargs,
+    ):
+        self._lookback = lookback or type(self).lookback
+        self._cache = cache or type(self).cache
+        self._stepping = False
+        if self._lookback and not hasattr(data, "tail"):
+            raise RuntimeError(
+                f"{type(data).__name__} does not support a lookback window"
+            )
+        self._data = data
+        self._lazy = lazy
+        self._dirty = False
+        self._computed = 0
+        self._skipped = 0
         self._args = args
         self._kwargs = kwargs
-        self._values = self._run(self._args, self._kwargs)
+        self._inputs = [
+            data,
+            *(arg for arg in (*args, *kwargs.values()) if isinstance(arg, Indicator)),
+        ]
+        self._incremental = type(self)._step is not Indicator._step
+        self._output: Optional[RingBuffer] = None
+        self._version = 0
+        self._count = 0
+        self._snapshot: Optional[np.ndarray] = None
+        self.on_update = Event()
+        self._recompute(cached=True)
+        roots = dict.fromkeys(Indicator._root_of(source) for source in self._inputs)
+        graphs = [IndicatorGraph.of(root) for root in roots]
+        self._graph = graphs[0]
+        self._graph.add(self, self._key)
+        for graph in graphs[1:]:
+            graph.add(self)
 
-    def _update(self):
-        self._values = self._run(self._args, self._kwargs)
+    @staticmethod
+    def _root_of(data):
+        return data._graph._data if isinstance(data, Indicator) else data
+
+    @property
+    def lazy(self) -> bool:
+        """
+        Whether updates only mark the values dirty, computing them on the
+        next access.
+        """
+        return self._lazy
+
+    @property
+    def computed(self) -> int:
+        """
+        Number of times the values were computed, by `_run` or `_step`.
+        """
+        return self._computed
+
+    @property
+    def skipped(self) -> int:
+        """
+        Number of input updates which did not need a computation.
+        """
+        return self._skipped
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented whenever the values change.
+        """
+        self._resolve()
+        return self._version
+
+    @property
+    def count(self) -> int:
+        """
+        Number of values ever produced, see `InstrumentCandles.count`.
+        """
+        self._resolve()
+        return self._count
+
+    @property
+    def _values(self) -> np.ndarray:
+        self._resolve()
+        return self.__values
+
+    @_values.setter
+    def _values(self, values: np.ndarray):
+        self.__values = values
+
+    @property
+    def max_size(self) -> Optional[int]:
+        """
+        Number of values kept: the lookback if declared, otherwise the
+        data's `max_size`.
+        """
+        return self._lookback or getattr(self._data, "max_size", None)
+
+    @property
+    def last(self):
+        return self.value
+
+    def _input_state(self) -> tuple:
+        return tuple(
+            (getattr(source, "version", None), getattr(source, "count", None))
+            for source in self._inputs
+        )
+
+    def _recompute(self, cached: bool = False):
+        self._state = self._input_state()
+        previous = self._snapshot
+        lookback = self._lookback
+        window = 2 * lookback - 1 if lookback else None
+        key = self._cache_key(window) if cached and self._cache is not None else None
+        values = self._cache.get(key) if key is not None else None  # type: ignore[union-attr]
+        self._stepping = values is None
+        if values is None:
+            self._computed += 1
+            if lookback:
+                values = self._run_window(window)[-lookback:]  # type: ignore[arg-type]
+            else:
+                values = self._run(*self._args, **self._kwargs)
+            if key is not None:
+                self._cache.put(key, values)  # type: ignore[union-attr]
+        if self._incremental or self._lookback:
+            values = np.asarray(values)
+            output = self._output
+            if (
+                output is None
+                or output.dtype != values.dtype
+                or output.shape != values.shape[1:]
+            ):
+                output = RingBuffer(
+                    max_size=self.max_size,
+                    dtype=values.dtype,
+                    shape=values.shape[1:],
+                )
+                self._output = output
+            output.clear()
+            output.extend(values)
+            values = output.values
+        self._snapshot = np.array(values)
+        if previous is None or not np.array_equal(
+            previous, self._snapshot, equal_nan=True
+        ):
+            self._version += 1
+            self._count = len(values)
+        self._values = values
+
+    def _cache_key(self, window: Optional[int]) -> str:
+        def describe(arg):
+            return arg.name if isinstance(arg, Indicator) else arg
+
+        arguments = [
+            *map(describe, self._args),
+            *((name, describe(arg)) for name, arg in sorted(self._kwargs.items())),
+        ]
+        cls = type(self)
+        arrays = []
+        for source in self._inputs:
+            if isinstance(source, Indicator):
+                arrays.append(source._values)
+                continue
+            if window is not None and source is self._data:
+                source = source.tail(window)
+            arrays.extend(getattr(source, column) for column in (INDEX, *PRICE_COLUMNS))
+        return IndicatorCache.key(
+            f"{cls.__module__}.{cls.__qualname__}{arguments!r}{self._lookback}", arrays
+        )
+
+    def _run_window(self, size: int) -> np.ndarray:
+        data = self._data
+        self._data = data.tail(size)
+        try:
+            return np.asarray(self._run(*self._args, **self._kwargs))
+        finally:
+            self._data = data
+
+    def _refresh(self):
+        """
+        Bring the values up to date with the inputs, returns whether they
+        changed. Lazy indicators only mark themselves dirty.
+        """
+        if self._lazy:
+            if self._dirty:
+                self._skipped += 1
+            self._dirty = True
+            return False
+        return self._evaluate()
+
+    def _resolve(self):
+        if self._dirty:
+            self._dirty = False
+            self._evaluate()
+
+    def _evaluate(self) -> bool:
+        state = self._input_state()
+        if state == self._state:
+            self._skipped += 1
+            return False
+        version = self._version
+        if (
+            self._output is not None
+            and (self._stepping or not self._incremental)
+            and all(
+                old[0] is not None and new == (old[0] + 1, old[1] + 1)
+                for old, new in zip(self._state, state)
+            )
+        ):
+            self._state = state
+            self._computed += 1
+            if self._incremental:
+                self._output.append(self._step(self._data.last))  # type: ignore[attr-defined]
+            else:
+                self._output.append(self._run_window(self._lookback)[-1])  # type: ignore[arg-type]
+            self._values = self._output.values
+            self._snapshot = None
+            self._version += 1
+            self._count += 1
+        else:
+            self._recompute()
+        changed = self._version != version
+        if changed:
+            self.on_update()
+        return changed
 
     @abstractmethod
     def _run(self, *args, **kwargs) -> np.ndarray:
+        """
+        Values for the whole history, or the `lookback` window.
+        """
+        raise NotImplementedError()
+
+    def _step(self, new_bar: Candlestick):
+        """
+        Optional O(1) update advancing the state `_run` left behind by
+        `new_bar`, or the input indicator's latest value. Only used when
+        exactly one bar was appended and nothing was revised.
+        """
         raise NotImplementedError()
 
     @property
@@ -86,8 +486,106 @@ class Indicator:
         return self._values[-1] if len(self._values) > 0 else None
 
     @property
-    def to_array(self):
-        return self._values
+    def name(self) -> str:
+        arguments = [
+            getattr(arg, "name", arg) for arg in (*self._args, *self._kwargs.values())
+        ]
+        return f"{type(self).__name__}({','.join(map(str, arguments))})"
+
+    @property
+    def to_array(self) -> _Array:
+        """
+        The values, without copying, carrying their name and the
+        timestamps of the bars they were computed for.
+
+        Both share memory with ring buffers which later bars overwrite,
+        so the array, and `.s` or `.df` built from it, are only valid until
+        the data next updates. Use `snapshot` to keep them.
+        """
+        values = self._values
+        root = Indicator._root_of(self._data)
+        timestamps = getattr(root, "Timestamp", None)
+        index = None
+        if timestamps is not None and len(values) <= len(timestamps):
+            index = timestamps[slice(len(timestamps) - len(values), None)]
+        columns = getattr(self, "lines", None)
+        if columns is None and np.ndim(values) == 2:
+            columns = [
+                getattr(i, "name", i) for i in getattr(root, "instruments", ())
+            ] or None
+        return _Array(
+            values,
+            name=self.name,
+            index=index,
+            tz=getattr(root, "tz", None),
+            columns=columns,
+        )
+
+    def snapshot(self) -> _Array:
+        """
+        A copy of `to_array`, values and index, unaffected by later bars.
+        """
+        array = self.to_array
+        index = array._opts.get("index")
+        return _Array(
+            np.array(array),
+            name=array.name,
+            **{**array._opts, "index": None if index is None else np.array(index)},
+        )
+
+    def _latest(self, other, count: int):
+        """
+        The last `count` values of this indicator and of `other`, an
+        indicator or a constant, or None while there are fewer.
+        """
+        values = self._values
+        others = other._values if isinstance(other, Indicator) else [other] * count
+        if len(values) < count or len(others) < count:
+            return None
+        return (
+            values[slice(len(values) - count, None)],
+            others[slice(len(others) - count, None)],
+        )
+
+    def crossover(self, other):
+        """
+        Whether the latest bar moved above `other`, from the last two
+        values.
+        """
+        latest = self._latest(other, 2)
+        if latest is None:
+            return False
+        (previous, current), (other_previous, other_current) = latest
+        return (current > other_current) & (previous <= other_previous)
+
+    def crossunder(self, other):
+        """
+        Whether the latest bar moved below `other`, from the last two
+        values.
+        """
+        latest = self._latest(other, 2)
+        if latest is None:
+            return False
+        (previous, current), (other_previous, other_current) = latest
+        return (current < other_current) & (previous >= other_previous)
+
+    def rising(self, n: int = 1):
+        """
+        Whether the values rose on each of the last `n` bars.
+        """
+        latest = self._latest(None, n + 1)
+        if latest is None:
+            return False
+        return np.all(np.diff(latest[0], axis=0) > 0, axis=0)
+
+    def falling(self, n: int = 1):
+        """
+        Whether the values fell on each of the last `n` bars.
+        """
+        latest = self._latest(None, n + 1)
+        if latest is None:
+            return False
+        return np.all(np.diff(latest[0], axis=0) < 0, axis=0)
 
     def __eq__(self, other):
         result = False
@@ -1,13 +1,18 @@
-from datetime import datetime, timedelta
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, tzinfo
 from enum import Enum
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence, Union
 
+import numpy as np
 import pandas as pd
 import pytz
 from pandas import Timestamp
 
 from pytrade.events.event import Event
 from pytrade.interfaces.data import IInstrumentData
+from pytrade.models.buffer import CandleBuffer, MemmapCandleBuffer
 
 
 class Granularity(Enum):
@@ -123,6 +128,83 @@ class Candlestick:
         }
 
 
+class CandleBatch:
+    """
+    Columnar batch of candles for a single instrument and granularity.
+    """
+
+    def __init__(
+        self,
+        instrument: Instrument,
+        granularity: Granularity,
+        timestamps: Union[pd.DatetimeIndex, np.ndarray, Sequence[Timestamp]],
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+    ):
+        self.instrument = instrument
+        self.granularity = granularity
+        self.timestamps = pd.DatetimeIndex(timestamps)
+        self.prices = np.vstack([open, high, low, close])
+        if self.prices.shape[1] != len(self.timestamps):
+            raise RuntimeError(
+                f"Received {self.prices.shape[1]} prices for {len(self.timestamps)} timestamps"
+            )
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Candlestick]) -> "CandleBatch":
+        if not candles:
+            raise RuntimeError("Unable to build a batch from no candles")
+        instrument = candles[0].instrument
+        granularity = candles[0].granularity
+        for candle in candles:
+            if candle.instrument != instrument or candle.granularity != granularity:
+                raise RuntimeError(
+                    f"Received {candle.instrument} {candle.granularity} for batch[{instrument} {granularity}]"
+                )
+        prices = np.array(
+            [(c.open, c.high, c.low, c.close) for c in candles], dtype=np.float64
+        ).T
+        return cls(
+            instrument,
+            granularity,
+            [c.timestamp for c in candles],
+            *prices,
+        )
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.prices[0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.prices[1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.prices[2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.prices[3]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[Candlestick]:
+        for timestamp, open, high, low, close in zip(self.timestamps, *self.prices):
+            yield Candlestick(
+                self.instrument,
+                self.granularity,
+                float(open),
+                float(high),
+                float(low),
+                float(close),
+                timestamp,
+            )
+
+
 class TickData:
 
     instrument: Instrument
@@ -140,34 +222,228 @@ class TickData:
         self.ask = float(ask)
 
 
-COLUMNS = ["Timestamp", "Instrument", "Open", "High", "Low", "Close"]
+COLUMNS = ["Timestamp", "Open", "High", "Low", "Close"]
 
 INDEX = COLUMNS[0]
 
+PRICE_COLUMNS = COLUMNS[1:]
+
+
+def _from_epoch(value: int, tz: Optional[tzinfo]) -> Timestamp:
+    if tz is None:
+        return Timestamp(value)
+    return Timestamp(value, tz="UTC").tz_convert(tz)
+
+
+def _readonly(view: np.ndarray) -> np.ndarray:
+    view.flags.writeable = False
+    return view
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_updates():
+    """
+    Apply updates made on this thread without notifying, then fire
+    `on_update` once per series written inside the scope, in the order
+    they were first written. Scopes nest, and only the outermost one
+    notifies. Updates made on other threads, such as another strategy
+    sharing the series, notify as usual.
+    """
+    if getattr(_deferred, "pending", None) is not None:
+        yield
+        return
+    pending: dict[InstrumentCandles, None] = {}
+    _deferred.pending = pending
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+        for series in pending:
+            series._fire()
+
 
 class InstrumentCandles(IInstrumentData):
 
     def __init__(
-        self, data: Optional[pd.DataFrame] = None, max_size: Optional[int] = None
+        self,
+        data: Optional[pd.DataFrame] = None,
+        max_size: Optional[int] = None,
+        buffer: Optional[CandleBuffer] = None,
+        instrument: Optional[Instrument] = None,
+        granularity: Optional[Granularity] = None,
+        dtype=np.float64,
     ):
-        self._data: pd.DataFrame = (
-            data if data is not None else pd.DataFrame(columns=COLUMNS)
+        """
+        The instrument and granularity are held once for the series rather
+        than per row. Pass `dtype=np.float32` for compact price storage.
+        """
+        self._buffer = (
+            buffer
+            if buffer is not None
+            else CandleBuffer(max_size=max_size, dtype=dtype)
         )
-        if not isinstance(self._data.index, pd.DatetimeIndex):
-            if INDEX in self._data.columns:
-                self._data.set_index([INDEX], inplace=True)
+        self._max_size: Optional[int] = self._buffer.max_size
+        self.__instrument: Optional[Instrument] = instrument
+        self.__granularity: Optional[Granularity] = granularity
+        self.__update_event = Event()
+        self._lock = threading.RLock()
+        self._version = 0
+        self._df: Optional[pd.DataFrame] = None
+        self._df_version = -1
+        if data is not None:
+            self._load(data)
+
+    def _load(self, data: pd.DataFrame):
+        if not isinstance(data.index, pd.DatetimeIndex):
+            if INDEX in data.columns:
+                data = data.set_index([INDEX])
             else:
                 raise RuntimeError(
                     "Dataframe does not have a datetime index and does not have a 'Timestamp' column"
                 )
-        self._max_size: Optional[int] = max_size
-        self.__instrument: Optional[Instrument] = None
-        self.__granularity: Optional[Granularity] = None
-        self.__update_event = Event()
+        index = pd.DatetimeIndex(data.index)
+        if not self._buffer.count:
+            self._buffer.tz = index.tz
+        if "Instrument" in data.columns and len(data):
+            self.__instrument = data["Instrument"].iloc[0]
+        self._buffer.extend(
+            index.asi8,
+            data[PRICE_COLUMNS].to_numpy(dtype=self._buffer.dtype).T,
+        )
+        self._version += 1
+
+    def _to_epoch(self, timestamp: Timestamp) -> int:
+        if not self._buffer.count:
+            self._buffer.tz = getattr(timestamp, "tzinfo", None)
+        return Timestamp(timestamp).value
+
+    def _index(self, timestamps: Optional[np.ndarray] = None) -> pd.DatetimeIndex:
+        if timestamps is None:
+            timestamps = self._buffer.timestamps
+        index = pd.DatetimeIndex(timestamps.view("M8[ns]"), name=INDEX)
+        if self._buffer.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self._buffer.tz)
+        return index
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        Held while the series is written. Readers needing a consistent
+        snapshot across several accessors can hold it too.
+        """
+        return self._lock
+
+    def batch(self):
+        """
+        See `deferred_updates`.
+        """
+        return deferred_updates()
+
+    def _notify(self):
+        pending = getattr(_deferred, "pending", None)
+        if pending is not None:
+            pending[self] = None
+            return
+        self.__update_event()
+
+    def _fire(self):
+        self.__update_event()
+
+    @property
+    def instrument(self) -> Optional[Instrument]:
+        return self.__instrument
+
+    @property
+    def granularity(self) -> Optional[Granularity]:
+        return self.__granularity
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @property
+    def tz(self) -> Optional[tzinfo]:
+        return self._buffer.tz
+
+    @property
+    def count(self) -> int:
+        """
+        Number of bars ever appended, including any evicted by `max_size`.
+        Revisions of stored bars do not change it.
+        """
+        return self._buffer.count
+
+    @property
+    def last(self) -> Optional[Candlestick]:
+        if not len(self._buffer):
+            return None
+        return Candlestick(
+            self.__instrument,  # type: ignore[arg-type]
+            self.__granularity,  # type: ignore[arg-type]
+            float(self._buffer.open[-1]),
+            float(self._buffer.high[-1]),
+            float(self._buffer.low[-1]),
+            float(self._buffer.close[-1]),
+            _from_epoch(self._buffer.last_timestamp, self._buffer.tz),  # type: ignore[arg-type]
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes allocated for the stored candles.
+        """
+        return self._buffer.nbytes
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented on every write to the stored candles, once per revised
+        bar and once per append, so `version` and `count` both advancing
+        by one means a single bar was appended and nothing was rewritten.
+        """
+        return self._version
 
     @property
     def df(self):
-        return self._data
+        # Materialized on the first read after an update and shared until the next one
+        if self._df_version != self._version:
+            self._df = pd.DataFrame(
+                {
+                    "Open": self._buffer.open,
+                    "High": self._buffer.high,
+                    "Low": self._buffer.low,
+                    "Close": self._buffer.close,
+                },
+                index=self._index(),
+            )
+            self._df_version = self._version
+        return self._df
+
+    @property
+    def Open(self):
+        return _readonly(self._buffer.open)
+
+    @property
+    def High(self):
+        return _readonly(self._buffer.high)
+
+    @property
+    def Low(self):
+        return _readonly(self._buffer.low)
+
+    @property
+    def Close(self):
+        return _readonly(self._buffer.close)
+
+    @property
+    def Timestamp(self):
+        """
+        Bar timestamps as int64 epoch nanoseconds.
+        """
+        return _readonly(self._buffer.timestamps)
 
     @property
     def on_update(self):
@@ -177,67 +453,411 @@ class InstrumentCandles(IInstrumentData):
     def on_update(self, value: Event):
         self.__update_event = value
 
-    def update(self, candlestick: Candlestick):
+    def __len__(self):
+        return len(self._buffer)
+
+    def tail(self, size: int) -> "CandleWindow":
+        """
+        The latest `size` bars, without copying.
+        """
+        return CandleWindow(self, size)
+
+    def _validate(self, instrument: Instrument, granularity: Granularity):
         if not self.__instrument:
-            self.__instrument = candlestick.instrument
-            self.__granularity = candlestick.granularity
+            self.__instrument = instrument
+        if not self.__granularity:
+            self.__granularity = granularity
 
-        if candlestick.instrument != self.__instrument:
+        if instrument != self.__instrument:
             raise RuntimeError(
-                f"Received {candlestick.instrument} for history[{self.__instrument}]"
+                f"Received {instrument} for history[{self.__instrument}]"
             )
 
-        if candlestick.granularity != self.__granularity:
+        if granularity != self.__granularity:
             raise RuntimeError(
-                f"Received {candlestick.granularity} for history[{self.__granularity}]"
+                f"Received {granularity} for history[{self.__granularity}]"
             )
 
-        if self._max_size and len(self._data) >= self._max_size:
-            _delta = self._data.index[-1] - self._data.index[-2]
-            if not isinstance(_delta, timedelta):
-                raise RuntimeError(
-                    "Expected dataframe to have DatetimeInex. Unable to caluclate timedelta from index."
-                )
-            self._data.index = self._data.index.shift(  # type: ignore
-                int(_delta.seconds / 60), freq="min"
+    def _revise(self, timestamps: np.ndarray, prices: np.ndarray) -> bool:
+        """
+        Overwrite the stored bars with the same timestamps, dropping
+        candles for bars which are not stored. Returns whether any were.
+        """
+        stored = self._buffer.timestamps
+        rows = np.searchsorted(stored, timestamps)
+        found = rows < len(stored)
+        found[found] = stored[rows[found]] == timestamps[found]
+        if not found.any():
+            return False
+        self._buffer.revise(rows[found], prices[:, found])
+        self._version += 1
+        return True
+
+    def update(self, candlestick: Candlestick):
+        with self._lock:
+            self._validate(candlestick.instrument, candlestick.granularity)
+
+            timestamp = self._to_epoch(candlestick.timestamp)
+            row = (
+                timestamp,
+                candlestick.open,
+                candlestick.high,
+                candlestick.low,
+                candlestick.close,
             )
-            self._data = self._data.shift(-1)
-
-        self._data.loc[candlestick.timestamp] = [  # type: ignore
-            candlestick.instrument,
-            candlestick.open,
-            candlestick.high,
-            candlestick.low,
-            candlestick.close,
-        ]
-        self.__update_event()
+            last = self._buffer.last_timestamp
+            if last is None or timestamp > last:
+                self._buffer.append(*row)
+                self._version += 1
+            elif timestamp == last:
+                self._buffer.replace_last(*row)
+                self._version += 1
+            # An earlier candle revises its stored bar, or is dropped
+            elif not self._revise(
+                np.array([timestamp]),
+                np.array(row[1:], dtype=self._buffer.dtype)[:, np.newaxis],
+            ):
+                return
+        self._notify()
+
+    def extend(self, candles: Union[CandleBatch, Sequence[Candlestick]]):
+        """
+        Append many candles in a single vectorized write. The batch is
+        validated once and `on_update` fires once at the end.
+
+        Candles must be in timestamp order. Those overlapping the stored
+        bars, e.g. history reloaded after a reconnect, revise the bars
+        with the same timestamps, and any older than the stored window
+        are dropped.
+        """
+        batch = (
+            candles
+            if isinstance(candles, CandleBatch)
+            else CandleBatch.from_candles(candles)
+        )
+        if not len(batch):
+            return
+        timestamps = batch.timestamps.asi8
+        if np.any(np.diff(timestamps) <= 0):
+            raise RuntimeError(
+                f"Received unsorted or duplicate timestamps for history[{batch.instrument}]"
+            )
+        prices = batch.prices.astype(self._buffer.dtype, copy=False)
+        with self._lock:
+            self._validate(batch.instrument, batch.granularity)
+
+            if not self._buffer.count:
+                self._buffer.tz = batch.timestamps.tz
+            last = self._buffer.last_timestamp
+            if last is not None and timestamps[0] <= last:
+                overlap = int(np.searchsorted(timestamps, last, side="right"))
+                self._revise(timestamps[:overlap], prices[:, :overlap])
+                timestamps, prices = timestamps[overlap:], prices[:, overlap:]
+            if len(timestamps):
+                self._buffer.extend(timestamps, prices)
+                self._version += 1
+        self._notify()
+
+
+NANOS_PER_MINUTE = 60 * 10**9
+
+
+class CandleWindow(IInstrumentData):
+    """
+    Read-only view of the latest bars of an `InstrumentCandles`. The
+    columns share memory with the series, so a window is only valid
+    until the series is next written.
+    """
+
+    def __init__(self, source: InstrumentCandles, size: int):
+        self._source = source
+        self._window = slice(max(len(source) - size, 0), len(source))
+
+    @property
+    def instrument(self) -> Optional[Instrument]:
+        return self._source.instrument
+
+    @property
+    def granularity(self) -> Optional[Granularity]:
+        return self._source.granularity
+
+    @property
+    def tz(self) -> Optional[tzinfo]:
+        return self._source.tz
+
+    @property
+    def count(self) -> int:
+        return self._source.count
+
+    @property
+    def version(self) -> int:
+        return self._source.version
+
+    @property
+    def last(self) -> Optional[Candlestick]:
+        return self._source.last
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "Open": self.Open,
+                "High": self.High,
+                "Low": self.Low,
+                "Close": self.Close,
+            },
+            index=self._source._index(self.Timestamp),
+        )
+
+    @property
+    def Open(self):
+        return self._source.Open[self._window]
+
+    @property
+    def High(self):
+        return self._source.High[self._window]
+
+    @property
+    def Low(self):
+        return self._source.Low[self._window]
+
+    @property
+    def Close(self):
+        return self._source.Close[self._window]
+
+    @property
+    def Timestamp(self):
+        return self._source.Timestamp[self._window]
+
+    @property
+    def on_update(self):
+        return self._source.on_update
+
+    @on_update.setter
+    def on_update(self, value: Event):
+        raise RuntimeError("Subscribe to the series rather than a window of it")
+
+    def __len__(self):
+        return self._window.stop - self._window.start
+
+
+class CandleAggregator:
+    """
+    Incrementally builds `granularity` candles for one instrument from a
+    finer feed, e.g. M5 from M1.
+
+    The source bars of the current bucket are kept, and a completed
+    candle is emitted as soon as the last source candle of the bucket
+    arrives. A candle from a later bucket also flushes an incomplete one,
+    so gaps in the feed do not hold bars back. Buckets are aligned to the
+    epoch in UTC.
+
+    The bucket is kept after it is emitted, until a later one starts, so
+    a revision of one of its source bars is folded in and the bucket is
+    emitted again with the same timestamp, which revises the derived bar.
+    Candles for earlier buckets are ignored.
+    """
+
+    def __init__(self, instrument: Instrument, granularity: Granularity):
+        self.instrument = instrument
+        self.granularity = granularity
+        self._period = MINUTES_MAP[granularity] * NANOS_PER_MINUTE
+        self._bucket: Optional[int] = None
+        self._emitted = False
+        self._tz: Optional[tzinfo] = None
+        self._bars: dict[int, tuple[float, float, float, float]] = {}
+
+    def _emit(self) -> Candlestick:
+        bars = [self._bars[timestamp] for timestamp in sorted(self._bars)]
+        self._emitted = True
+        return Candlestick(
+            self.instrument,
+            self.granularity,
+            bars[0][0],
+            max(bar[1] for bar in bars),
+            min(bar[2] for bar in bars),
+            bars[-1][3],
+            _from_epoch(self._bucket, self._tz),  # type: ignore[arg-type]
+        )
+
+    def update(self, candle: Candlestick) -> list[Candlestick]:
+        """
+        Add a source candle, returning any candles it completed or revised.
+        """
+        if candle.instrument != self.instrument:
+            raise RuntimeError(
+                f"Received {candle.instrument} for aggregator[{self.instrument}]"
+            )
+        step = MINUTES_MAP[candle.granularity] * NANOS_PER_MINUTE
+        if step >= self._period or self._period % step:
+            raise RuntimeError(
+                f"Unable to build {self.granularity} candles from {candle.granularity}"
+            )
+
+        timestamp = Timestamp(candle.timestamp).value
+        bucket = timestamp - timestamp % self._period
+        if self._bucket is not None and bucket < self._bucket:
+            return []
+
+        completed = []
+        if bucket != self._bucket:
+            if self._bucket is not None and not self._emitted:
+                completed.append(self._emit())
+            self._bucket = bucket
+            self._emitted = False
+            self._tz = getattr(candle.timestamp, "tzinfo", None)
+            self._bars = {}
+        self._bars[timestamp] = (candle.open, candle.high, candle.low, candle.close)
+
+        if self._emitted or (timestamp + step) % self._period == 0:
+            completed.append(self._emit())
+        return completed
+
+    def extend(self, candles: Iterable[Candlestick]) -> list[Candlestick]:
+        completed = []
+        for candle in candles:
+            completed += self.update(candle)
+        return completed
 
 
 class CandleData:
+    """
+    Candle histories keyed by `(Instrument, Granularity)`.
+
+    Each series carries its own lock, so updates from broker callback
+    threads for independent series run in parallel. The shared lock is
+    only taken to create a series the first time it is seen.
+    """
 
-    def __init__(self, max_size=1000):
+    def __init__(
+        self,
+        max_size=1000,
+        path: Optional[str] = None,
+        dtype=np.float64,
+        derive: Iterable[Granularity] = (),
+        source: Granularity = Granularity.M1,
+    ):
+        """
+        When `path` is given every series is kept in a memory-mapped
+        store under `path/<instrument>/<granularity>` and is reopened
+        from disk rather than starting empty.
+
+        Granularities in `derive` are built from the `source` feed rather
+        than streamed separately, see `CandleAggregator`.
+        """
         self._data: dict[tuple[Instrument, Granularity], InstrumentCandles] = {}
         self._max_size = max_size
-
-    def __new__(cls, *args, **kwargs):
-        if not hasattr(cls, "instance"):
-            cls.instance = super().__new__(cls)
-        # Need to handle case where instantiatied and different max size is provided
-        return cls.instance
+        self._path = path
+        self._dtype = dtype
+        self._lock = threading.Lock()
+        self._source = source
+        self._derive = tuple(g for g in derive if g != source)
+        for granularity in self._derive:
+            if MINUTES_MAP[granularity] % MINUTES_MAP[source]:
+                raise RuntimeError(
+                    f"Unable to derive {granularity} candles from {source}"
+                )
+        self._aggregators: dict[Instrument, list[CandleAggregator]] = {}
+
+    def feed_for(self, subscription: CandleSubscription) -> CandleSubscription:
+        """
+        The broker stream which supplies candles for `subscription`.
+        """
+        if subscription.granularity in self._derive:
+            return CandleSubscription(subscription.instrument, self._source)
+        return subscription
+
+    def _get_aggregators(self, instrument: Instrument) -> list[CandleAggregator]:
+        aggregators = self._aggregators.get(instrument)
+        if aggregators is None:
+            with self._lock:
+                aggregators = self._aggregators.setdefault(
+                    instrument,
+                    [CandleAggregator(instrument, g) for g in self._derive],
+                )
+        return aggregators
+
+    def _aggregate(
+        self, instrument: Instrument, candles: Iterable[Candlestick]
+    ) -> list[Candlestick]:
+        candles = list(candles)
+        derived = []
+        for aggregator in self._get_aggregators(instrument):
+            completed = aggregator.extend(candles)
+            if completed:
+                self.get(instrument, aggregator.granularity).extend(completed)
+                derived += completed
+        return derived
+
+    def _create(
+        self, instrument: Instrument, granularity: Granularity
+    ) -> InstrumentCandles:
+        if self._path is None:
+            buffer = CandleBuffer(max_size=self._max_size, dtype=self._dtype)
+        else:
+            buffer = MemmapCandleBuffer(
+                os.path.join(self._path, instrument.name, granularity.value),
+                max_size=self._max_size,
+                dtype=self._dtype,
+            )
+        return InstrumentCandles(
+            buffer=buffer, instrument=instrument, granularity=granularity
+        )
 
     def get(self, instrument: Instrument, granularity: Granularity):
         key = (instrument, granularity)
-        instrument_candles: InstrumentCandles = self._data.get(
-            (instrument, granularity), InstrumentCandles(max_size=self._max_size)
-        )
-        self._data[key] = instrument_candles
+        instrument_candles = self._data.get(key)
+        if instrument_candles is None:
+            with self._lock:
+                instrument_candles = self._data.get(key)
+                if instrument_candles is None:
+                    instrument_candles = self._create(instrument, granularity)
+                    self._data[key] = instrument_candles
         return instrument_candles
 
-    def update(self, candle: Candlestick):
-        key = (candle.instrument, candle.granularity)
-        instrument_candles: InstrumentCandles = self._data.get(
-            key,
-            InstrumentCandles(max_size=self._max_size),
-        )
-        self._data[key] = instrument_candles
-        instrument_candles.update(candle)
+    def batch(self):
+        """
+        See `deferred_updates`.
+        """
+        return deferred_updates()
+
+    def update(self, candle: Candlestick) -> list[Candlestick]:
+        """
+        Store `candle`, returning any derived candles it completed.
+        """
+        series = self.get(candle.instrument, candle.granularity)
+        if candle.granularity != self._source or not self._derive:
+            series.update(candle)
+            return []
+
+        with series.lock:
+            series.update(candle)
+            return self._aggregate(candle.instrument, [candle])
+
+    def update_many(
+        self, candles: Union[CandleBatch, Iterable[Candlestick]]
+    ) -> list[Candlestick]:
+        """
+        Bulk load candles, e.g. history from `IClient.get_candles`. Each
+        affected series is written once and notifies its subscribers once.
+        Returns any derived candles which were completed.
+        """
+        if isinstance(candles, CandleBatch):
+            batches = [candles]
+        else:
+            grouped: dict[tuple[Instrument, Granularity], list[Candlestick]] = {}
+            for candle in candles:
+                key = (candle.instrument, candle.granularity)
+                grouped.setdefault(key, []).append(candle)
+            batches = [CandleBatch.from_candles(series) for series in grouped.values()]
+
+        derived = []
+        for batch in batches:
+            series = self.get(batch.instrument, batch.granularity)
+            if batch.granularity != self._source or not self._derive:
+                series.extend(batch)
+                continue
+            with series.lock:
+                series.extend(batch)
+                derived += self._aggregate(batch.instrument, batch)
+        return derived
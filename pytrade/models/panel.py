@@ -0,0 +1,243 @@
+from datetime import tzinfo
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pytrade.events.event import Event
+from pytrade.interfaces.data import IInstrumentData
+from pytrade.models.buffer import RingBuffer
+from pytrade.models.indicator import Indicator
+from pytrade.models.instruments import (
+    PRICE_COLUMNS,
+    CandleData,
+    Granularity,
+    Instrument,
+    InstrumentCandles,
+    _readonly,
+)
+
+
+class PanelBar:
+    """
+    Latest bar of a `CandlePanel`, with one price per instrument.
+    """
+
+    def __init__(
+        self,
+        timestamp: int,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+    ):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+
+
+class CandlePanel(IInstrumentData):
+    """
+    Aligned candles of several instruments of one granularity, stacked
+    into 2-D arrays with a column per instrument. Indicators computed on
+    a panel evaluate every instrument in a single vectorized call, and
+    `PanelColumn` gives each instrument a view of its own values.
+
+    A row is added once every member has a bar for the same timestamp, so
+    timestamps missing from any member are left out. Anything other than
+    every member appending one bar, such as bulk writes, revisions and
+    gaps, rebuilds the panel from the members' histories.
+    """
+
+    def __init__(
+        self, members: Sequence[InstrumentCandles], max_size: Optional[int] = None
+    ):
+        if not members:
+            raise RuntimeError("A panel requires at least one instrument.")
+        granularities = {member.granularity for member in members}
+        if len(granularities) > 1:
+            raise RuntimeError(f"Unable to align granularities {granularities}")
+        self._members = list(members)
+        self._max_size = max_size
+        self._timestamps = RingBuffer(max_size, dtype=np.int64)
+        self._prices = [
+            RingBuffer(max_size, shape=(len(members),)) for _ in PRICE_COLUMNS
+        ]
+        self._synced = [(member.count, member.version) for member in members]
+        self._version = 0
+        self.__update_event = Event()
+        self._load()
+        for member in self._members:
+            member.on_update.subscribe(self._on_member_update, weak=True)
+
+    @classmethod
+    def from_data(
+        cls,
+        data: CandleData,
+        instruments: Sequence[Instrument],
+        granularity: Granularity,
+        max_size: Optional[int] = None,
+    ) -> "CandlePanel":
+        return cls(
+            [data.get(instrument, granularity) for instrument in instruments],
+            max_size=max_size,
+        )
+
+    def _load(self):
+        timestamps = [np.asarray(member.Timestamp) for member in self._members]
+        common = timestamps[0]
+        for other in timestamps[1:]:
+            common = np.intersect1d(common, other)
+        common = np.unique(common)
+        keep = self._max_size
+        if keep:
+            common = common[-keep:]
+        rows = []
+        for stamps in timestamps:
+            order = np.argsort(stamps, kind="stable")
+            rows.append(order[np.searchsorted(stamps, common, sorter=order)])
+        self._timestamps.clear()
+        self._timestamps.extend(common)
+        for prices, column in zip(self._prices, PRICE_COLUMNS):
+            prices.clear()
+            prices.extend(
+                np.column_stack(
+                    [
+                        getattr(member, column)[positions]
+                        for member, positions in zip(self._members, rows)
+                    ]
+                ).reshape(len(common), len(self._members))
+            )
+        self._synced = [(member.count, member.version) for member in self._members]
+
+    def _on_member_update(self):
+        latest = {
+            int(member.Timestamp[-1]) if len(member) else None
+            for member in self._members
+        }
+        if len(latest) > 1 or None in latest:
+            return
+        timestamp = latest.pop()
+        # A single appended bar advances both; a revision only the version
+        changes = {
+            (member.count - count, member.version - version)
+            for member, (count, version) in zip(self._members, self._synced)
+        }
+        if changes == {(0, 0)}:
+            return
+        if changes == {(1, 1)} and (
+            not len(self._timestamps) or timestamp > self._timestamps.values[-1]
+        ):
+            self._timestamps.append(timestamp)
+            for prices, column in zip(self._prices, PRICE_COLUMNS):
+                prices.append([getattr(m, column)[-1] for m in self._members])
+            self._synced = [(member.count, member.version) for member in self._members]
+        else:
+            self._load()
+        self._version += 1
+        self.__update_event()
+
+    @property
+    def members(self) -> tuple[InstrumentCandles, ...]:
+        return tuple(self._members)
+
+    @property
+    def instruments(self) -> list[Optional[Instrument]]:
+        return [member.instrument for member in self._members]
+
+    @property
+    def granularity(self) -> Optional[Granularity]:
+        return self._members[0].granularity
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @property
+    def tz(self) -> Optional[tzinfo]:
+        return self._members[0].tz
+
+    @property
+    def count(self) -> int:
+        """
+        Number of aligned rows ever added, see `InstrumentCandles.count`.
+        """
+        return self._timestamps.count
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def last(self) -> Optional[PanelBar]:
+        if not len(self._timestamps):
+            return None
+        return PanelBar(
+            int(self._timestamps.values[-1]),
+            *(prices.values[-1] for prices in self._prices),
+        )
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """
+        Prices with (field, instrument) columns.
+        """
+        index = self._members[0]._index(self.Timestamp)
+        names = [getattr(i, "name", i) for i in self.instruments]
+        return pd.concat(
+            {
+                column: pd.DataFrame(prices.values, index=index, columns=names)
+                for column, prices in zip(PRICE_COLUMNS, self._prices)
+            },
+            axis=1,
+        )
+
+    @property
+    def Open(self):
+        return _readonly(self._prices[0].values)
+
+    @property
+    def High(self):
+        return _readonly(self._prices[1].values)
+
+    @property
+    def Low(self):
+        return _readonly(self._prices[2].values)
+
+    @property
+    def Close(self):
+        return _readonly(self._prices[3].values)
+
+    @property
+    def Timestamp(self):
+        return _readonly(self._timestamps.values)
+
+    @property
+    def on_update(self):
+        return self.__update_event
+
+    @on_update.setter
+    def on_update(self, value: Event):
+        self.__update_event = value
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def column(self, instrument: Instrument) -> int:
+        return self.instruments.index(instrument)
+
+
+class PanelColumn(Indicator):
+    """
+    The values of an indicator computed on a `CandlePanel` for one of its
+    instruments, usable wherever an `Indicator` is.
+    """
+
+    def _run(self, instrument: Instrument):
+        self._position = Indicator._root_of(self._data).column(instrument)
+        return self._data.to_array[:, self._position]
+
+    def _step(self, new_bar: np.ndarray):
+        return new_bar[self._position]
@@ -0,0 +1,120 @@
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from pytrade.models.buffer import SharedCandleBuffer
+from pytrade.models.instruments import (
+    CandleData,
+    Granularity,
+    Instrument,
+    InstrumentCandles,
+)
+
+
+class SharedInstrumentCandles(InstrumentCandles):
+    """
+    `InstrumentCandles` over a `SharedCandleBuffer`. In reader processes
+    the series is read only and `poll` replaces the in-process
+    `on_update` call made by the writer: it compares the buffer's
+    sequence number with the last one seen and fires `on_update` when
+    the writer has published new candles.
+
+    The reader's `version` advances once per write, as the writer's does.
+    Handlers read the shared memory while the writer may be updating it,
+    so those needing a consistent copy take `SharedCandleBuffer.snapshot`.
+    """
+
+    def __init__(
+        self,
+        buffer: SharedCandleBuffer,
+        instrument: Instrument,
+        granularity: Granularity,
+    ):
+        super().__init__(buffer=buffer, instrument=instrument, granularity=granularity)
+        self._shared = buffer
+        self._sequence = buffer.sequence
+
+    def poll(self) -> bool:
+        sequence = self._shared.sequence
+        if sequence == self._sequence or sequence % 2:
+            return False
+        with self.lock:
+            self._version += (sequence - self._sequence) // 2
+        self._sequence = sequence
+        self.on_update()
+        return True
+
+
+class SharedCandleData(CandleData):
+    """
+    `CandleData` whose series live in shared memory blocks named
+    `<name>_<instrument>_<granularity>`, for running strategies in
+    several processes over one copy of the candles.
+
+    The writer process (`writer=True`) ingests candles as usual. Reader
+    processes attach to a series on `get`, once the writer has created
+    it, and call `poll` or `wait` to pick up new candles.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size=1000,
+        dtype=np.float64,
+        writer: bool = True,
+        derive: Iterable[Granularity] = (),
+        source: Granularity = Granularity.M1,
+    ):
+        super().__init__(
+            max_size=max_size,
+            dtype=dtype,
+            derive=derive if writer else (),
+            source=source,
+        )
+        self._name = name
+        self._writer = writer
+
+    def _create(
+        self, instrument: Instrument, granularity: Granularity
+    ) -> InstrumentCandles:
+        name = f"{self._name}_{instrument.name}_{granularity.value}"
+        try:
+            buffer = SharedCandleBuffer(
+                name, max_size=self._max_size, dtype=self._dtype, create=self._writer
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError(
+                f"No shared candles published for {instrument} {granularity}"
+            ) from e
+        return SharedInstrumentCandles(buffer, instrument, granularity)
+
+    def poll(self) -> list[InstrumentCandles]:
+        """
+        Notify every attached series the writer has updated since the last
+        poll, returning them.
+        """
+        return [
+            series
+            for series in list(self._data.values())
+            if isinstance(series, SharedInstrumentCandles) and series.poll()
+        ]
+
+    def wait(
+        self, timeout: Optional[float] = None, interval: float = 0.001
+    ) -> list[InstrumentCandles]:
+        """
+        Poll until at least one series has been updated or `timeout`
+        seconds have passed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            updated = self.poll()
+            if updated or (deadline is not None and time.monotonic() >= deadline):
+                return updated
+            time.sleep(interval)
+
+    def close(self):
+        for series in self._data.values():
+            series._buffer.release()  # type: ignore[attr-defined]
+        self._data.clear()
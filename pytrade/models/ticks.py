@@ -0,0 +1,304 @@
+from enum import Enum
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from pytrade.models.instruments import (
+    MINUTES_MAP,
+    NANOS_PER_MINUTE,
+    CandleBatch,
+    CandleData,
+    Candlestick,
+    Granularity,
+    Instrument,
+    TickData,
+    instrument_lookup,
+)
+
+TICK_COLUMNS = ["Instrument", "Timestamp", "Bid", "Ask"]
+
+TICK_TIMESTAMP_FORMAT = "%Y%m%d %H:%M:%S.%f"
+
+INSTRUMENTS = list(Instrument)
+
+INSTRUMENT_CODES = {instrument: code for code, instrument in enumerate(INSTRUMENTS)}
+
+
+class TickChunk:
+    """
+    Columnar block of ticks. Timestamps are UTC epoch nanoseconds and
+    instruments are stored as codes indexing `INSTRUMENTS`.
+    """
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        bid: np.ndarray,
+        ask: np.ndarray,
+        instruments: np.ndarray,
+    ):
+        self.timestamps = timestamps
+        self.bid = bid
+        self.ask = ask
+        self.instruments = instruments
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def select(self, instrument: Instrument) -> "TickChunk":
+        mask = self.instruments == INSTRUMENT_CODES[instrument]
+        return TickChunk(
+            self.timestamps[mask],
+            self.bid[mask],
+            self.ask[mask],
+            self.instruments[mask],
+        )
+
+
+def _instrument_codes(values: pd.Series) -> np.ndarray:
+    # Only the distinct symbols are looked up, then broadcast through the category codes
+    categories = values.astype("category").cat
+    try:
+        lookup = np.array(
+            [INSTRUMENT_CODES[instrument_lookup[c]] for c in categories.categories],
+            dtype=np.int8,
+        )
+    except KeyError as e:
+        raise RuntimeError(f"Received unknown instrument {e} in tick data") from e
+    return lookup[categories.codes]
+
+
+def read_ticks(
+    path: str,
+    chunk_size: int = 1_000_000,
+    header: bool = False,
+    instrument: Optional[Instrument] = None,
+) -> Iterator[TickChunk]:
+    """
+    Stream a `instrument,timestamp,bid,ask` tick CSV, as parsed row by row
+    by `TickData`, in chunks of at most `chunk_size` ticks. Parsing is
+    vectorized and only one chunk is held in memory at a time, so large
+    files never need to be fully materialized. Timestamps are read as UTC.
+    """
+    reader = pd.read_csv(
+        path,
+        header=0 if header else None,
+        names=TICK_COLUMNS,
+        dtype={
+            "Instrument": str,
+            "Timestamp": str,
+            "Bid": np.float64,
+            "Ask": np.float64,
+        },
+        chunksize=chunk_size,
+        engine="c",
+    )
+    with reader:
+        for frame in reader:
+            timestamps = pd.to_datetime(
+                frame["Timestamp"], format=TICK_TIMESTAMP_FORMAT
+            )
+            chunk = TickChunk(
+                timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64),
+                frame["Bid"].to_numpy(),
+                frame["Ask"].to_numpy(),
+                _instrument_codes(frame["Instrument"]),
+            )
+            if instrument is not None:
+                chunk = chunk.select(instrument)
+            yield chunk
+
+
+class TickPrice(Enum):
+
+    BID = "bid"
+    ASK = "ask"
+    MID = "mid"
+
+
+class TickAggregator:
+    """
+    Builds `granularity` candles for one instrument from ticks.
+
+    `update` is the live path: O(1) per tick, emitting the previous bar
+    when the first tick of a new bucket arrives. `extend` reduces a whole
+    `TickChunk` at once with vectorized bucketing, carrying the still-open
+    bar across chunk boundaries. Both share the same running state, and
+    `flush` emits the open bar. Buckets are aligned to the epoch in UTC.
+    """
+
+    def __init__(
+        self,
+        instrument: Instrument,
+        granularity: Granularity,
+        price: TickPrice = TickPrice.MID,
+    ):
+        self.instrument = instrument
+        self.granularity = granularity
+        self._price = price
+        self._period = MINUTES_MAP[granularity] * NANOS_PER_MINUTE
+        self._bucket: Optional[int] = None
+        self._open = self._high = self._low = self._close = 0.0
+
+    def _tick_price(self, bid: float, ask: float) -> float:
+        if self._price == TickPrice.BID:
+            return bid
+        if self._price == TickPrice.ASK:
+            return ask
+        return (bid + ask) / 2
+
+    def _candle(self) -> Candlestick:
+        return Candlestick(
+            self.instrument,
+            self.granularity,
+            self._open,
+            self._high,
+            self._low,
+            self._close,
+            pd.Timestamp(self._bucket, tz="UTC"),
+        )
+
+    def update(self, tick: TickData) -> Optional[Candlestick]:
+        """
+        Add a live tick, returning the bar it closed, if any.
+        """
+        if tick.instrument != self.instrument:
+            raise RuntimeError(
+                f"Received {tick.instrument} for aggregator[{self.instrument}]"
+            )
+        timestamp = pd.Timestamp(tick.timestamp).value
+        bucket = timestamp - timestamp % self._period
+        price = self._tick_price(tick.bid, tick.ask)
+
+        completed = None
+        if bucket != self._bucket:
+            if self._bucket is not None:
+                completed = self._candle()
+            self._bucket = bucket
+            self._open = self._high = self._low = price
+        elif price > self._high:
+            self._high = price
+        elif price < self._low:
+            self._low = price
+        self._close = price
+        return completed
+
+    def flush(self) -> Optional[Candlestick]:
+        """
+        Emit the bar still being built, e.g. at the end of a backtest.
+        """
+        if self._bucket is None:
+            return None
+        candle = self._candle()
+        self._bucket = None
+        return candle
+
+    def extend(self, chunk: TickChunk) -> CandleBatch:
+        """
+        Reduce a chunk of time-ordered ticks, returning the bars it closed.
+        Ticks for other instruments are ignored.
+        """
+        if len(chunk) and np.any(
+            chunk.instruments != INSTRUMENT_CODES[self.instrument]
+        ):
+            chunk = chunk.select(self.instrument)
+        if not len(chunk):
+            return self._batch(np.empty(0, dtype=np.int64), np.empty((4, 0)))
+
+        if self._price == TickPrice.BID:
+            prices = chunk.bid
+        elif self._price == TickPrice.ASK:
+            prices = chunk.ask
+        else:
+            prices = (chunk.bid + chunk.ask) / 2
+
+        buckets = chunk.timestamps - chunk.timestamps % self._period
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)]
+        bars = np.vstack(
+            [
+                prices[starts],
+                np.maximum.reduceat(prices, starts),
+                np.minimum.reduceat(prices, starts),
+                prices[ends - 1],
+            ]
+        )
+        bar_buckets = buckets[starts]
+
+        if self._bucket is not None:
+            if bar_buckets[0] == self._bucket:
+                bars[0, 0] = self._open
+                bars[1, 0] = max(bars[1, 0], self._high)
+                bars[2, 0] = min(bars[2, 0], self._low)
+            else:
+                bar_buckets = np.r_[self._bucket, bar_buckets]
+                bars = np.hstack(
+                    [[[self._open], [self._high], [self._low], [self._close]], bars]
+                )
+
+        # The last bar stays open until a later tick or flush closes it
+        self._bucket = int(bar_buckets[-1])
+        self._open, self._high, self._low, self._close = (float(v) for v in bars[:, -1])
+        return self._batch(bar_buckets[:-1], bars[:, :-1])
+
+    def _batch(self, buckets: np.ndarray, bars: np.ndarray) -> CandleBatch:
+        return CandleBatch(
+            self.instrument,
+            self.granularity,
+            pd.to_datetime(buckets, utc=True),
+            *bars,
+        )
+
+
+class TickCandleBuilder:
+    """
+    Pipeline stage turning ticks for many instruments into candles for
+    each of `granularities`, written straight into `data`. Live ticks go
+    through `on_tick`; historical `TickChunk`s through `consume`, which
+    stores each instrument's closed bars as one batch per chunk.
+    """
+
+    def __init__(
+        self,
+        data: CandleData,
+        granularities: Iterable[Granularity],
+        price: TickPrice = TickPrice.MID,
+    ):
+        self._data = data
+        self._granularities = tuple(granularities)
+        self._price = price
+        self._aggregators: dict[Instrument, list[TickAggregator]] = {}
+
+    def _get_aggregators(self, instrument: Instrument) -> list[TickAggregator]:
+        aggregators = self._aggregators.get(instrument)
+        if aggregators is None:
+            aggregators = [
+                TickAggregator(instrument, granularity, self._price)
+                for granularity in self._granularities
+            ]
+            self._aggregators[instrument] = aggregators
+        return aggregators
+
+    def on_tick(self, tick: TickData):
+        for aggregator in self._get_aggregators(tick.instrument):
+            candle = aggregator.update(tick)
+            if candle is not None:
+                self._data.update(candle)
+
+    def consume(self, chunks: Iterable[TickChunk]):
+        for chunk in chunks:
+            for code in np.unique(chunk.instruments):
+                instrument = INSTRUMENTS[code]
+                selected = chunk.select(instrument)
+                for aggregator in self._get_aggregators(instrument):
+                    batch = aggregator.extend(selected)
+                    if len(batch):
+                        self._data.update_many(batch)
+
+    def flush(self):
+        for aggregators in self._aggregators.values():
+            for aggregator in aggregators:
+                candle = aggregator.flush()
+                if candle is not None:
+                    self._data.update(candle)
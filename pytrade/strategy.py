@@ -1,9 +1,12 @@
-import asyncio
+import time
 from abc import abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Optional
 
+from pytrade.events.bus import Consumer, EventBus
 from pytrade.interfaces.broker import IBroker
+from pytrade.models.barrier import BarBarrier
 from pytrade.models.instruments import (
-    MINUTES_MAP,
     CandleData,
     Candlestick,
     CandleSubscription,
@@ -15,33 +18,38 @@ from pytrade.models.instruments import (
 
 class FxStrategy:
 
-    def __init__(self, broker: IBroker, data_context: CandleData):
+    def __init__(
+        self,
+        broker: IBroker,
+        data_context: CandleData,
+        bus: Optional[EventBus] = None,
+        timeout: Optional[float] = None,
+        clock: Callable[[], int] = time.time_ns,
+    ):
+        """
+        With a `bus`, candles reach the strategy through its own bus queue
+        and thread rather than on the broker feed thread.
+
+        `next` runs once all subscriptions delivered the bars of a period,
+        or `timeout` seconds after the period ended when some are late or
+        missing, see `BarBarrier`. Pass a `clock` in bar time to replay
+        history with a timeout.
+        """
         self.broker = broker
-        self._updates_complete = asyncio.Event()
+        self._bus = bus
+        self._consumer: Optional[Consumer] = None
+        self._timeout = timeout
+        self._clock = clock
+        self._barrier: Optional[BarBarrier] = None
         self._data_context = data_context
-        self._pending_updates: list[CandleSubscription] = []
+        self._batching = False
+        self._arrivals: list[Candlestick] = []
 
     def init(self) -> None:
-        self._caluclate_updates()
+        self._barrier = BarBarrier(self.subscriptions, self._timeout, self._clock)
         self._monitor_instruments()
         self._init()
 
-    def _caluclate_updates(self) -> None:
-        self._required_updates: list[CandleSubscription] = []
-        max_interval = 0
-        for subscription in self.subscriptions:
-            max_interval = max(max_interval, MINUTES_MAP[subscription.granularity])
-
-        for subscription in self.subscriptions:
-            expected_update_count = int(
-                max_interval / MINUTES_MAP[subscription.granularity]
-            )
-            self._required_updates += [
-                subscription for _ in range(expected_update_count)
-            ]
-
-        self._pending_updates = self._required_updates.copy()
-
     @property
     @abstractmethod
     def subscriptions(self) -> list[CandleSubscription]:
@@ -52,26 +60,54 @@ class FxStrategy:
         raise NotImplementedError()
 
     def _monitor_instruments(self) -> None:
-        for subscription in self.subscriptions:
+        # Derived granularities share their source feed, so subscribe once per feed
+        feeds = dict.fromkeys(
+            self._data_context.feed_for(subscription)
+            for subscription in self.subscriptions
+        )
+        if self._bus is not None:
+            self._consumer = self._bus.subscribe(
+                feeds,
+                self._update_instrument,
+                name=type(self).__name__,
+                scope=self._batch,
+            ).start()
+            self._bus.connect(self.broker, feeds)
+            return
+        for feed in feeds:
             self.broker.subscribe(
-                subscription.instrument,
-                subscription.granularity,
+                feed.instrument,
+                feed.granularity,
                 self._update_instrument,
             )
 
     def _update_instrument(self, candle: Candlestick) -> None:
-        self._data_context.update(candle)
-        self._pending_updates.remove(
-            CandleSubscription(candle.instrument, candle.granularity)
-        )
-        # Filter out update from pending
-        if not self._pending_updates:
-            self._updates_complete.set()
+        derived = self._data_context.update(candle)
+        if self._batching:
+            self._arrivals += [candle, *derived]
+            return
+        for updated in [candle, *derived]:
+            self._barrier.arrive(updated)
+
+    @contextmanager
+    def _batch(self):
+        """
+        Apply a burst of candles with one notification per series, and
+        only release `next` once the indicators have been refreshed.
+        """
+        self._batching = True
+        try:
+            with self._data_context.batch():
+                yield
+        finally:
+            self._batching = False
+            arrivals, self._arrivals = self._arrivals, []
+            for candle in arrivals:
+                self._barrier.arrive(candle)
 
     async def next(self) -> None:
-        await self._updates_complete.wait()
+        await self._barrier.wait()
         self._next()
-        self._pending_updates = self._required_updates.copy()
 
     def get_data(
         self, instrument: Instrument, granularity: Granularity
@@ -0,0 +1,60 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytrade.models.instruments import (
+    Candlestick,
+    Granularity,
+    Instrument,
+    InstrumentCandles,
+)
+
+SIZE = 1000
+
+LEGACY_COLUMNS = ["Timestamp", "Instrument", "Open", "High", "Low", "Close"]
+
+
+def get_candles(count: int) -> list[Candlestick]:
+    start_time = datetime.now()
+    return [
+        Candlestick(
+            Instrument.EURUSD,
+            Granularity.M1,
+            random.uniform(0, 10),
+            random.uniform(0, 10),
+            random.uniform(0, 10),
+            random.uniform(0, 10),
+            start_time + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_bytes_per_bar(candles: list[Candlestick]) -> float:
+    df = pd.DataFrame(
+        [[c.timestamp, c.instrument, c.open, c.high, c.low, c.close] for c in candles],
+        columns=LEGACY_COLUMNS,
+    ).set_index(LEGACY_COLUMNS[0])
+    return df.memory_usage(deep=True).sum() / len(candles)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_bytes_per_bar(benchmark, dtype):
+    candles = get_candles(SIZE)
+    history = InstrumentCandles(max_size=SIZE, dtype=dtype)
+    history.extend(candles)
+
+    def update():
+        for candle in candles:
+            history.update(candle)
+
+    benchmark(update)
+
+    bytes_per_bar = history.nbytes / SIZE
+    legacy = legacy_bytes_per_bar(candles)
+    benchmark.extra_info["bytes_per_bar"] = bytes_per_bar
+    benchmark.extra_info["legacy_bytes_per_bar"] = legacy
+    assert bytes_per_bar < legacy
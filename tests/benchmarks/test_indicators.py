@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytrade.indicators import functions
+from pytrade.indicators.streaming import (
+    AdxStream,
+    AtrStream,
+    BollingerStream,
+    DonchianStream,
+    EmaStream,
+    MacdStream,
+    RsiStream,
+    SmaStream,
+    StochasticStream,
+)
+
+SIZE = 1000
+
+
+def get_prices(count: int) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, count))
+    return pd.DataFrame(
+        {
+            "High": close + rng.uniform(0, 0.001, count),
+            "Low": close - rng.uniform(0, 0.001, count),
+            "Close": close,
+        }
+    )
+
+
+def wilder(series: pd.Series, period: int) -> pd.Series:
+    return series.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def pandas_true_range(df: pd.DataFrame) -> pd.Series:
+    previous = df.Close.shift()
+    return pd.concat(
+        [df.High - df.Low, (df.High - previous).abs(), (df.Low - previous).abs()],
+        axis=1,
+    ).max(axis=1)
+
+
+def pandas_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    delta = df.Close.diff()
+    gain, loss = wilder(delta.clip(lower=0), period), wilder(
+        -delta.clip(upper=0), period
+    )
+    return 100 * gain / (gain + loss)
+
+
+def pandas_bollinger(
+    df: pd.DataFrame, period: int = 20, k: float = 2.0
+) -> pd.DataFrame:
+    rolling = df.Close.rolling(period)
+    middle, width = rolling.mean(), k * rolling.std(ddof=0)
+    return pd.concat([middle, middle + width, middle - width], axis=1)
+
+
+def pandas_macd(df: pd.DataFrame) -> pd.DataFrame:
+    line = (
+        df.Close.ewm(span=12, adjust=False).mean()
+        - df.Close.ewm(span=26, adjust=False).mean()
+    )
+    signal = line.ewm(span=9, adjust=False).mean()
+    return pd.concat([line, signal, line - signal], axis=1)
+
+
+def pandas_stochastic(df: pd.DataFrame, k: int = 14, d: int = 3) -> pd.DataFrame:
+    lowest, highest = df.Low.rolling(k).min(), df.High.rolling(k).max()
+    percent_k = 100 * (df.Close - lowest) / (highest - lowest)
+    return pd.concat([percent_k, percent_k.rolling(d).mean()], axis=1)
+
+
+def pandas_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    up, down = df.High.diff(), -df.Low.diff()
+    plus = up.where((up > down) & (up > 0), 0.0)
+    minus = down.where((down > up) & (down > 0), 0.0)
+    tr = wilder(pandas_true_range(df), period)
+    plus_di, minus_di = (
+        100 * wilder(plus, period) / tr,
+        100 * wilder(minus, period) / tr,
+    )
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return pd.concat([wilder(dx, period), plus_di, minus_di], axis=1)
+
+
+INDICATORS = {
+    "sma": (
+        lambda df: df.Close.rolling(20).mean(),
+        lambda df: functions.sma(df.Close.to_numpy(), 20),
+        lambda: SmaStream(20),
+        ["Close"],
+    ),
+    "ema": (
+        lambda df: df.Close.ewm(span=20, adjust=False).mean(),
+        lambda df: functions.ema(df.Close.to_numpy(), 20),
+        lambda: EmaStream(20),
+        ["Close"],
+    ),
+    "rsi": (
+        pandas_rsi,
+        lambda df: functions.rsi(df.Close.to_numpy()),
+        RsiStream,
+        ["Close"],
+    ),
+    "atr": (
+        lambda df: wilder(pandas_true_range(df), 14),
+        lambda df: functions.atr(
+            df.High.to_numpy(), df.Low.to_numpy(), df.Close.to_numpy()
+        ),
+        AtrStream,
+        ["High", "Low", "Close"],
+    ),
+    "bollinger": (
+        pandas_bollinger,
+        lambda df: functions.bollinger_bands(df.Close.to_numpy()),
+        BollingerStream,
+        ["Close"],
+    ),
+    "macd": (
+        pandas_macd,
+        lambda df: functions.macd(df.Close.to_numpy()),
+        MacdStream,
+        ["Close"],
+    ),
+    "stochastic": (
+        pandas_stochastic,
+        lambda df: functions.stochastic(
+            df.High.to_numpy(), df.Low.to_numpy(), df.Close.to_numpy()
+        ),
+        StochasticStream,
+        ["High", "Low", "Close"],
+    ),
+    "donchian": (
+        lambda df: (df.High.rolling(20).max(), df.Low.rolling(20).min()),
+        lambda df: functions.donchian(df.High.to_numpy(), df.Low.to_numpy()),
+        DonchianStream,
+        ["High", "Low"],
+    ),
+    "adx": (
+        pandas_adx,
+        lambda df: functions.adx(
+            df.High.to_numpy(), df.Low.to_numpy(), df.Close.to_numpy()
+        ),
+        AdxStream,
+        ["High", "Low", "Close"],
+    ),
+}
+
+
+@pytest.mark.parametrize("name", INDICATORS)
+@pytest.mark.parametrize("method", ["pandas", "batch", "stream"])
+def test_refresh_per_bar(benchmark, name, method):
+    """
+    Cost of refreshing an indicator when one bar is appended to a
+    `SIZE` bar history: recomputing with pandas rolling/ewm, recomputing
+    with the vectorized functions, or a single O(1) streaming update.
+    """
+    naive, batch, stream, columns = INDICATORS[name]
+    df = get_prices(SIZE + 1)
+    benchmark.group = f"indicator-{name}"
+    if method == "pandas":
+        benchmark(naive, df)
+    elif method == "batch":
+        benchmark(batch, df)
+    else:
+        state = stream()
+        state.resume(*[df[c].to_numpy()[:SIZE] for c in columns])
+        bar = [df[c].iloc[SIZE] for c in columns]
+        benchmark(state.update, *bar)
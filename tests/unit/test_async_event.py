@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pytrade.events.async_event import AsyncEvent, CallbackError, blocking
+from pytrade.events.async_typed_event import AsyncTypedEvent
+
+
+@pytest.mark.asyncio
+async def test_coroutine_callbacks_run_concurrently():
+    event = AsyncTypedEvent[int]()
+    received = []
+
+    def slow():
+        async def callback(value):
+            await asyncio.sleep(0.1)
+            received.append(value)
+
+        return callback
+
+    for _ in range(5):
+        event += slow()
+
+    start = time.perf_counter()
+    errors = await event(1)
+
+    assert errors == []
+    assert received == [1] * 5
+    assert time.perf_counter() - start < 0.3
+
+
+@pytest.mark.asyncio
+async def test_blocking_callbacks_run_in_executor():
+    loop_thread = threading.get_ident()
+    threads = {}
+
+    @blocking
+    def slow(value):
+        time.sleep(0.1)
+        threads["slow"] = threading.get_ident()
+
+    def fast(value):
+        threads["fast"] = threading.get_ident()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        event = AsyncTypedEvent[int](executor)
+        event += slow
+        event.subscribe(lambda value: time.sleep(0.1), blocking=True)
+        event += fast
+
+        start = time.perf_counter()
+        await event(1)
+
+    assert time.perf_counter() - start < 0.18
+    assert threads["slow"] != loop_thread
+    assert threads["fast"] == loop_thread
+
+
+@pytest.mark.asyncio
+async def test_failures_are_reported_per_callback():
+    event = AsyncEvent()
+    received = []
+    reported = []
+
+    async def broken():
+        raise ValueError("async")
+
+    def also_broken():
+        raise KeyError("sync")
+
+    event += broken
+    event += also_broken
+    event += lambda: received.append(True)
+    event.on_error += reported.append
+
+    errors = await event()
+
+    assert received == [True]
+    assert [error.callback for error in errors] == [broken, also_broken]
+    assert isinstance(errors[0].error, ValueError)
+    assert isinstance(errors[1], CallbackError)
+    assert reported == errors
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe():
+    event = AsyncEvent()
+    calls = []
+
+    async def callback():
+        calls.append(True)
+
+    event += callback
+    event -= callback
+    await event()
+
+    assert calls == []
+    with pytest.raises(ValueError):
+        event -= callback
+
+
+@pytest.mark.asyncio
+async def test_threadsafe_dispatch_from_feed_thread():
+    event = AsyncTypedEvent[int]()
+    received = []
+
+    async def callback(value):
+        received.append(value)
+
+    event += callback
+    publish = event.threadsafe(asyncio.get_running_loop())
+    futures = []
+    thread = threading.Thread(
+        target=lambda: futures.extend(publish(i) for i in range(3))
+    )
+    thread.start()
+    thread.join()
+
+    for future in futures:
+        assert await asyncio.wrap_future(future) == []
+    assert received == [0, 1, 2]
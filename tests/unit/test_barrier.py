@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from pandas import Timestamp
+
+from pytrade.models.barrier import BarBarrier
+from pytrade.models.instruments import (
+    Candlestick,
+    CandleSubscription,
+    Granularity,
+    Instrument,
+)
+
+M5 = CandleSubscription(Instrument.EURUSD, Granularity.M5)
+M15 = CandleSubscription(Instrument.EURUSD, Granularity.M15)
+START = datetime(2024, 1, 1, 9, 0)
+
+
+def bar(subscription: CandleSubscription, minutes: int) -> Candlestick:
+    return Candlestick(
+        subscription.instrument,
+        subscription.granularity,
+        1,
+        1,
+        1,
+        1,
+        START + timedelta(minutes=minutes),
+    )
+
+
+def period(index: int) -> int:
+    return Timestamp(START + timedelta(minutes=15 * index)).value
+
+
+def test_releases_when_every_bar_arrived():
+    barrier = BarBarrier([M5, M15])
+
+    assert barrier.arrive(bar(M5, 0)) is None
+    assert barrier.arrive(bar(M5, 5)) is None
+    assert barrier.arrive(bar(M5, 10)) is None
+    assert barrier.outstanding == {period(0): 1}
+    assert barrier.arrive(bar(M15, 0)) == period(0)
+    assert barrier.outstanding == {}
+
+
+def test_revisions_and_late_bars_are_not_counted():
+    barrier = BarBarrier([M5, M15])
+
+    barrier.arrive(bar(M5, 0))
+    barrier.arrive(bar(M5, 0))
+    assert barrier.outstanding == {period(0): 3}
+
+    for minutes in (5, 10):
+        barrier.arrive(bar(M5, minutes))
+    barrier.arrive(bar(M15, 0))
+    assert barrier.arrive(bar(M15, 0)) is None
+    assert barrier.outstanding == {}
+
+
+def test_later_period_releases_stale_one():
+    barrier = BarBarrier([M5, M15])
+
+    barrier.arrive(bar(M5, 0))
+    for minutes in (15, 20, 25):
+        barrier.arrive(bar(M5, minutes))
+
+    assert barrier.arrive(bar(M15, 15)) == period(1)
+    assert barrier.missing == {period(0): {M5: 2, M15: 1}}
+    assert barrier.arrive(bar(M15, 0)) is None
+
+
+@pytest.mark.asyncio
+async def test_wait_is_woken_from_another_thread():
+    barrier = BarBarrier([M15])
+    waiter = asyncio.create_task(barrier.wait())
+    await asyncio.sleep(0.01)
+
+    thread = threading.Thread(target=barrier.arrive, args=(bar(M15, 0),))
+    thread.start()
+    thread.join()
+
+    assert await asyncio.wait_for(waiter, timeout=1) == period(0)
+
+
+@pytest.mark.asyncio
+async def test_period_expires_only_after_its_end():
+    m1 = CandleSubscription(Instrument.EURUSD, Granularity.M1)
+    m5 = CandleSubscription(Instrument.EURUSD, Granularity.M5)
+    start = Timestamp(START).value
+    minute = 60 * 10**9
+    now = [start]
+    barrier = BarBarrier([m1, m5], timeout=0.2, clock=lambda: now[0])
+    waiter = asyncio.create_task(barrier.wait())
+
+    # Bars arrive further apart than the timeout, but before the period ends
+    for minutes in range(4):
+        now[0] = start + (minutes + 1) * minute
+        barrier.arrive(bar(m1, minutes))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+
+    now[0] = start + 5 * minute
+    barrier.arrive(bar(m1, 4))
+    barrier.arrive(bar(m5, 0))
+
+    assert await asyncio.wait_for(waiter, timeout=1) == start
+    assert barrier.missing == {}
+
+    # The next period misses its last M1 bar
+    for minutes in range(5, 9):
+        barrier.arrive(bar(m1, minutes))
+    barrier.arrive(bar(m5, 5))
+    now[0] = start + 10 * minute
+    waiter = asyncio.create_task(barrier.wait())
+    await asyncio.sleep(0.1)
+    assert not waiter.done()
+
+    now[0] += 10**9 // 5
+    barrier.arrive(bar(m1, 10))
+
+    assert await asyncio.wait_for(waiter, timeout=1) == start + 5 * minute
+    assert barrier.missing == {start + 5 * minute: {m1: 1}}
+    assert barrier.arrive(bar(m1, 9)) is None
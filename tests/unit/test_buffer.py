@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from pytrade.models.buffer import CandleBuffer, MemmapCandleBuffer
+
+
+def fill(buffer: CandleBuffer, count: int):
+    for i in range(count):
+        buffer.append(i, i, i + 1, i - 1, i + 0.5)
+
+
+@pytest.mark.parametrize("count", [0, 3, 10, 11, 25])
+def test_ring_views_are_ordered(count: int):
+    max_size = 10
+    buffer = CandleBuffer(max_size=max_size)
+    fill(buffer, count)
+
+    expected = np.arange(max(0, count - max_size), count)
+    assert len(buffer) == min(count, max_size)
+    assert buffer.count == count
+    assert np.array_equal(buffer.timestamps, expected)
+    assert np.array_equal(buffer.open, expected)
+    assert np.array_equal(buffer.high, expected + 1)
+    assert np.array_equal(buffer.low, expected - 1)
+    assert np.array_equal(buffer.close, expected + 0.5)
+
+
+def test_ring_does_not_reallocate():
+    buffer = CandleBuffer(max_size=10)
+    columns = list(buffer._columns)
+    fill(buffer, 100)
+
+    assert all(a is b for a, b in zip(buffer._columns, columns))
+    assert np.shares_memory(buffer.open, columns[1])
+
+
+def test_unbounded_growth():
+    buffer = CandleBuffer()
+    fill(buffer, CandleBuffer._initial_capacity * 2 + 1)
+
+    assert len(buffer) == CandleBuffer._initial_capacity * 2 + 1
+    assert np.array_equal(buffer.timestamps, np.arange(len(buffer)))
+
+
+def test_revise():
+    buffer = CandleBuffer(max_size=3)
+    fill(buffer, 5)
+    buffer.revise(np.array([0, 1]), np.full((4, 2), 7.0))
+
+    assert np.array_equal(buffer.timestamps, [2, 3, 4])
+    assert np.array_equal(buffer.close, [7.0, 7.0, 4.5])
+    buffer.append(5, 5, 6, 4, 5.5)
+    assert np.array_equal(buffer.close, [7.0, 4.5, 5.5])
+
+
+@pytest.mark.parametrize("max_size", [None, 10])
+@pytest.mark.parametrize("initial", [0, 7])
+@pytest.mark.parametrize("count", [1, 5, 10, 23])
+def test_extend_matches_append(max_size, initial: int, count: int):
+    appended = CandleBuffer(max_size=max_size)
+    extended = CandleBuffer(max_size=max_size)
+    fill(appended, initial + count)
+    fill(extended, initial)
+
+    timestamps = np.arange(initial, initial + count)
+    prices = np.vstack(
+        [timestamps, timestamps + 1, timestamps - 1, timestamps + 0.5]
+    ).astype(float)
+    extended.extend(timestamps, prices)
+
+    assert extended.count == appended.count
+    assert np.array_equal(extended.timestamps, appended.timestamps)
+    assert np.array_equal(extended.prices, appended.prices)
+
+
+def test_replace_last():
+    buffer = CandleBuffer(max_size=3)
+    fill(buffer, 4)
+    buffer.replace_last(3, 10, 11, 9, 10.5)
+
+    assert len(buffer) == 3
+    assert buffer.last_timestamp == 3
+    assert buffer.close[-1] == 10.5
+    assert buffer.open[-2] == 2
+
+
+@pytest.mark.parametrize("max_size", [None, 10])
+def test_memmap_reopen(tmp_path, max_size):
+    path = str(tmp_path / "series")
+    buffer = MemmapCandleBuffer(path, max_size=max_size)
+    fill(buffer, 25)
+    buffer.flush()
+    expected = buffer.close.copy()
+    del buffer
+
+    reopened = MemmapCandleBuffer(path, max_size=max_size)
+    assert reopened.count == 25
+    assert np.array_equal(reopened.close, expected)
+    assert isinstance(reopened._close, np.memmap)
+
+    reopened.append(25, 25, 26, 24, 25.5)
+    assert reopened.close[-1] == 25.5
+
+
+def test_memmap_grows_file(tmp_path):
+    path = str(tmp_path / "series")
+    buffer = MemmapCandleBuffer(path)
+    fill(buffer, CandleBuffer._initial_capacity + 1)
+
+    size = (tmp_path / "series" / "timestamp.bin").stat().st_size
+    assert size == 2 * CandleBuffer._initial_capacity * 8
+    assert np.array_equal(buffer.timestamps, np.arange(len(buffer)))
+
+
+def test_memmap_reopen_with_different_size(tmp_path):
+    path = str(tmp_path / "series")
+    MemmapCandleBuffer(path, max_size=10)
+
+    with pytest.raises(RuntimeError):
+        MemmapCandleBuffer(path, max_size=20)
@@ -0,0 +1,236 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from pytrade.events.bus import EventBus, OverflowPolicy
+from pytrade.models.instruments import (
+    CandleData,
+    Candlestick,
+    CandleSubscription,
+    Granularity,
+    Instrument,
+)
+
+EURUSD = CandleSubscription(Instrument.EURUSD, Granularity.M1)
+GBPUSD = CandleSubscription(Instrument.GBPUSD, Granularity.M1)
+USDJPY = CandleSubscription(Instrument.USDJPY, Granularity.M1)
+
+
+def get_candles(
+    subscription: CandleSubscription, count: int, start: int = 0
+) -> list[Candlestick]:
+    start_time = datetime(2024, 1, 1)
+    return [
+        Candlestick(
+            subscription.instrument,
+            subscription.granularity,
+            i,
+            i,
+            i,
+            i,
+            start_time + timedelta(minutes=start + i),
+        )
+        for i in range(count)
+    ]
+
+
+def test_routes_by_topic():
+    bus = EventBus()
+    bus.subscribe([EURUSD], name="euro")
+    both = bus.subscribe([EURUSD, GBPUSD], name="both")
+
+    for candle in (
+        get_candles(EURUSD, 2) + get_candles(GBPUSD, 1) + get_candles(USDJPY, 1)
+    ):
+        bus.publish(candle)
+
+    assert bus.depths() == {"euro": 2, "both": 3}
+    assert both.depths == {EURUSD: 2, GBPUSD: 1}
+
+
+def test_topics_take_turns():
+    bus = EventBus()
+    consumer = bus.subscribe([EURUSD, GBPUSD])
+
+    for candle in get_candles(EURUSD, 5) + get_candles(GBPUSD, 2):
+        bus.publish(candle)
+
+    instruments = [consumer.get(timeout=0).instrument for _ in range(7)]
+
+    assert instruments[:4] == [Instrument.EURUSD, Instrument.GBPUSD] * 2
+    assert instruments[4:] == [Instrument.EURUSD] * 3
+    assert consumer.get(timeout=0) is None
+    assert consumer.max_depth == 7
+
+
+def test_drop_oldest():
+    bus = EventBus()
+    consumer = bus.subscribe(
+        [EURUSD, GBPUSD], max_size=3, policy=OverflowPolicy.DROP_OLDEST
+    )
+
+    for candle in get_candles(EURUSD, 5) + get_candles(GBPUSD, 1):
+        bus.publish(candle)
+
+    assert consumer.dropped == 2
+    assert consumer.depths == {EURUSD: 3, GBPUSD: 1}
+    assert [consumer.get(timeout=0).open for _ in range(4)] == [2, 0, 3, 4]
+
+
+def test_coalesce_to_latest_bar():
+    bus = EventBus()
+    consumer = bus.subscribe([EURUSD], max_size=3, policy=OverflowPolicy.COALESCE)
+    candles = get_candles(EURUSD, 5)
+
+    for candle in candles[:2]:
+        bus.publish(candle)
+    revision = get_candles(EURUSD, 2)[1]
+    revision.close = 10
+    bus.publish(revision)
+
+    assert consumer.depth == 2
+    assert consumer.coalesced == 1
+
+    for candle in candles[2:]:
+        bus.publish(candle)
+
+    assert consumer.coalesced == 4
+    assert consumer.depth == 2
+    assert [consumer.get(timeout=0).open for _ in range(2)] == [3, 4]
+
+
+def test_block_waits_for_consumer():
+    bus = EventBus()
+    consumer = bus.subscribe([EURUSD], max_size=2)
+    candles = get_candles(EURUSD, 3)
+    bus.publish(candles[0])
+    bus.publish(candles[1])
+
+    publisher = threading.Thread(target=bus.publish, args=(candles[2],))
+    publisher.start()
+    time.sleep(0.05)
+
+    assert publisher.is_alive()
+    assert consumer.get(timeout=0) is candles[0]
+    publisher.join(timeout=1)
+    assert not publisher.is_alive()
+    assert consumer.depth == 2
+
+
+def test_block_timeout():
+    bus = EventBus()
+    consumer = bus.subscribe([EURUSD], max_size=1, timeout=0.01)
+    candles = get_candles(EURUSD, 2)
+    consumer.put(EURUSD, candles[0])
+
+    with pytest.raises(RuntimeError):
+        consumer.put(EURUSD, candles[1])
+
+
+def test_block_timeout_skips_only_that_consumer():
+    bus = EventBus()
+    slow = bus.subscribe([EURUSD], max_size=1, timeout=0.01)
+    fast = bus.subscribe([EURUSD], max_size=10)
+    errors = []
+    slow.on_error += errors.append
+    for candle in get_candles(EURUSD, 5):
+        bus.publish(candle)
+
+    assert fast.depth == 5
+    assert slow.depth == 1
+    assert slow.dropped == slow.errors == 4
+    assert all(isinstance(e.error, RuntimeError) for e in errors)
+
+
+def test_consumer_thread_delivers_in_order():
+    bus = EventBus()
+    received = []
+    done = threading.Event()
+
+    def callback(candle):
+        received.append(candle)
+        if len(received) == 10:
+            done.set()
+
+    consumer = bus.subscribe([EURUSD], callback).start()
+    candles = get_candles(EURUSD, 10)
+    for candle in candles:
+        bus.publish(candle)
+
+    assert done.wait(timeout=1)
+    assert received == candles
+    bus.unsubscribe(consumer)
+    assert consumer.closed
+    bus.publish(candles[0])
+    assert consumer.depth == 0
+
+
+def test_drain():
+    bus = EventBus()
+    callback = MagicMock()
+    consumer = bus.subscribe([EURUSD], callback)
+    candles = get_candles(EURUSD, 3)
+    for candle in candles:
+        bus.publish(candle)
+
+    assert consumer.drain() == 3
+    callback.assert_has_calls([call(candle) for candle in candles])
+
+
+def test_connect_subscribes_once_per_topic():
+    bus = EventBus()
+    broker = MagicMock()
+
+    bus.connect(broker, [EURUSD, GBPUSD])
+    bus.connect(broker, [EURUSD])
+
+    broker.subscribe.assert_has_calls(
+        [
+            call(Instrument.EURUSD, Granularity.M1, bus.publish),
+            call(Instrument.GBPUSD, Granularity.M1, bus.publish),
+        ]
+    )
+    assert broker.subscribe.call_count == 2
+
+
+def test_burst_delivered_in_one_scope():
+    bus = EventBus()
+    data = CandleData()
+    notified = MagicMock()
+    consumer = bus.subscribe([EURUSD, GBPUSD], data.update, scope=data.batch)
+    for candle in get_candles(EURUSD, 3) + get_candles(GBPUSD, 3):
+        bus.publish(candle)
+    data.get(Instrument.EURUSD, Granularity.M1).on_update += notified
+
+    assert consumer.drain() == 6
+    assert notified.call_count == 1
+    assert len(data.get(Instrument.GBPUSD, Granularity.M1)) == 3
+
+
+def test_consumer_survives_failing_callback():
+    bus = EventBus()
+    received = []
+    errors = []
+    done = threading.Event()
+
+    def callback(candle):
+        if candle.open == 0:
+            raise ValueError("broken bar")
+        received.append(candle)
+        if len(received) == 4:
+            done.set()
+
+    consumer = bus.subscribe([EURUSD], callback, max_size=2)
+    consumer.on_error += errors.append
+    consumer.start()
+    for candle in get_candles(EURUSD, 5):
+        bus.publish(candle)
+
+    assert done.wait(timeout=1)
+    assert consumer.errors == 1
+    assert isinstance(errors[0].error, ValueError)
+    assert errors[0].callback is callback
+    bus.close()
@@ -0,0 +1,118 @@
+import gc
+import weakref
+from unittest.mock import Mock
+
+import pytest
+
+from pytrade.events.event import Event
+from pytrade.events.typed_event import TypedEvent
+
+
+class Listener:
+
+    def __init__(self):
+        self.received = []
+
+    def on_event(self, value):
+        self.received.append(value)
+
+
+def test_callbacks_fire_in_subscription_order():
+    event = TypedEvent[int]()
+    received = []
+    first, second = Mock(side_effect=lambda v: received.append(1)), Mock(
+        side_effect=lambda v: received.append(2)
+    )
+
+    event += first
+    event += second
+    event(7)
+
+    assert received == [1, 2]
+    first.assert_called_once_with(7)
+
+
+def test_subscribing_twice_has_no_effect():
+    event = Event()
+    callback = Mock()
+
+    event += callback
+    event += callback
+    event()
+
+    assert callback.call_count == 1
+
+
+def test_unsubscribe():
+    event = TypedEvent[int]()
+    listener = Listener()
+    callback = Mock()
+
+    event += listener.on_event
+    event += callback
+    event -= listener.on_event
+    event(1)
+
+    assert listener.received == []
+    callback.assert_called_once_with(1)
+    with pytest.raises(ValueError):
+        event -= listener.on_event
+
+
+def test_callbacks_only_rebuilt_on_change():
+    event = Event()
+    event += Mock()
+    callbacks = event._callbacks
+
+    event()
+    event()
+
+    assert event._callbacks is callbacks
+    event += Mock()
+    assert event._callbacks is not callbacks
+
+
+def test_unsubscribe_while_firing():
+    event = Event()
+    calls = []
+
+    def first():
+        event.unsubscribe(first)
+        calls.append("first")
+
+    event += first
+    event += lambda: calls.append("second")
+    event()
+    event()
+
+    assert calls == ["first", "second", "second"]
+
+
+def test_weak_subscriber_is_collected():
+    event = TypedEvent[int]()
+    listener = Listener()
+    ref = weakref.ref(listener)
+
+    event.subscribe(listener.on_event, weak=True)
+    event(1)
+    assert listener.received == [1]
+
+    del listener
+    gc.collect()
+
+    assert ref() is None
+    assert event._callbacks == ()
+    event(2)
+
+
+def test_strong_subscriber_is_kept_alive():
+    event = TypedEvent[int]()
+    listener = Listener()
+    ref = weakref.ref(listener)
+
+    event += listener.on_event
+    del listener
+    gc.collect()
+    event(1)
+
+    assert ref().received == [1]
@@ -1,9 +1,19 @@
+import gc
+import os
+import pickle
 import random
+import time
+import weakref
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
+import pytest
+import pytz
 
-from pytrade.models.indicator import Indicator
+from pytrade.indicators import BollingerBands
+from pytrade.models.cache import IndicatorCache
+from pytrade.models.indicator import Indicator, IndicatorGraph, _Array
 from pytrade.models.instruments import (
     MINUTES_MAP,
     Candlestick,
@@ -66,7 +76,7 @@ def test_update():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = BoolIndicator(data)
     for idx, candle in enumerate(candles):
         value = test_series[idx]
@@ -83,7 +93,7 @@ def test_primitive_equality():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = SquareIndicator(data)
     for idx, candle in enumerate(candles):
         value = test_series[idx]
@@ -100,7 +110,7 @@ def test_primitive_greater():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = StaticIndicator(data)
     for idx, candle in enumerate(candles):
         value = test_series[idx]
@@ -117,7 +127,7 @@ def test_primitive_less():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = StaticIndicator(data)
     for idx, candle in enumerate(candles):
         value = test_series[idx]
@@ -134,7 +144,7 @@ def test_indicator_equality():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = StaticIndicator(data)
     indicator2 = StaticIndicator(data)
     for idx, candle in enumerate(candles):
@@ -154,7 +164,7 @@ def test_indicator_greater():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = StaticIndicator(data)
     indicator2 = SubtractIndicator(data)
     for idx, candle in enumerate(candles):
@@ -174,7 +184,7 @@ def test_indicator_less():
     data = InstrumentCandles()
     candles = get_candles(
         len(test_series), Instrument.EURUSD, Granularity.M1, datetime.now()
-    )
+    )[::-1]
     indicator = StaticIndicator(data)
     indicator2 = AddIndicator(data)
     for idx, candle in enumerate(candles):
@@ -187,3 +197,528 @@ def test_indicator_less():
     assert indicator.value == test_series.iloc[-1]
     assert len(indicator2._values) == len(test_series)
     assert indicator2.value == test_series.iloc[-1] + 1
+
+
+class SteppedIndicator(Indicator):
+
+    def __init__(self, data, *args, **kwargs):
+        self.runs = 0
+        self.steps = 0
+        super().__init__(data, *args, **kwargs)
+
+    def _run(self, *args, **kwargs):
+        self.runs += 1
+        return self._data.Open * 2
+
+    def _step(self, new_bar: Candlestick):
+        self.steps += 1
+        return new_bar.open * 2
+
+
+def test_incremental_steps():
+    data = InstrumentCandles()
+    candles = get_candles(10, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    indicator = SteppedIndicator(data)
+    for candle in candles:
+        data.update(candle)
+
+    assert indicator.runs == 1
+    assert indicator.steps == len(candles)
+    assert np.array_equal(indicator.to_array, [c.open * 2 for c in candles])
+
+
+def test_incremental_bounded_by_history():
+    data = InstrumentCandles(max_size=5)
+    candles = get_candles(10, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    indicator = SteppedIndicator(data)
+    for candle in candles:
+        data.update(candle)
+
+    assert len(indicator._values) == 5
+    assert np.array_equal(indicator.to_array, data.Open * 2)
+
+
+def test_incremental_falls_back_on_revision():
+    data = InstrumentCandles()
+    candles = get_candles(3, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    indicator = SteppedIndicator(data)
+    for candle in candles:
+        data.update(candle)
+
+    candles[-1].open = 100
+    data.update(candles[-1])
+
+    assert indicator.runs == 2
+    assert indicator.value == 200
+    assert len(indicator._values) == 3
+
+
+def test_incremental_falls_back_on_revision_and_append():
+    data = InstrumentCandles()
+    candles = get_candles(5, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    indicator = SteppedIndicator(data)
+    data.extend(candles[:4])
+
+    candles[3].open = 100
+    data.extend(candles[3:])
+
+    assert indicator.runs == 3
+    assert indicator.steps == 0
+    assert np.array_equal(indicator.to_array, [c.open * 2 for c in candles])
+
+
+def test_incremental_falls_back_on_gap():
+    data = InstrumentCandles()
+    candles = get_candles(6, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    indicator = SteppedIndicator(data)
+    data.extend(candles[:3])
+    data.update(candles[3])
+
+    assert indicator.runs == 2
+    assert indicator.steps == 1
+    assert np.array_equal(indicator.to_array, [c.open * 2 for c in candles[:4]])
+
+
+class CountingIndicator(Indicator):
+
+    def __init__(self, data, *args, **kwargs):
+        self.runs = 0
+        super().__init__(data, *args, **kwargs)
+
+    def _run(self, *args, **kwargs):
+        self.runs += 1
+        return self._data.Close.copy()
+
+
+class SumIndicator(Indicator):
+
+    def _run(self, *inputs):
+        self.order = getattr(self, "order", [])
+        self.order.append([i.count for i in inputs])
+        return sum(i.to_array for i in inputs)
+
+
+def test_graph_shares_identical_nodes():
+    data = InstrumentCandles()
+    data.extend(get_candles(5, Instrument.EURUSD, Granularity.M1, datetime.now())[::-1])
+
+    first = CountingIndicator(data, 3, scale=2)
+    second = CountingIndicator(data, 3, scale=2)
+    other = CountingIndicator(data, 4, scale=2)
+
+    assert first is second
+    assert first is not other
+    assert first.runs == 1
+    assert IndicatorGraph.of(data).nodes == (first, other)
+
+
+def test_shared_node_is_not_reinitialized():
+    data = InstrumentCandles()
+    candles = get_candles(3, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:1])
+    node = SteppedIndicator(data)
+    for candle in candles[1:]:
+        data.update(candle)
+
+    assert SteppedIndicator(data, lazy=True) is node
+    assert (node.runs, node.steps) == (1, 2)
+    assert not node.lazy
+
+
+def test_graph_refreshes_shared_nodes_once_in_order():
+    data = InstrumentCandles()
+    candles = get_candles(6, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:2])
+    base = CountingIndicator(data)
+    left = SumIndicator(data, base)
+    right = SumIndicator(data, base, base)
+    top = SumIndicator(data, left, right)
+
+    for candle in candles[2:]:
+        data.update(candle)
+
+    assert base.runs == 1 + len(candles[2:])
+    assert top.order[-1] == [data.count, data.count]
+    np.testing.assert_allclose(top.to_array, 3 * data.Close)
+
+
+def test_graph_skips_unchanged_subtree():
+    data = InstrumentCandles()
+    candles = get_candles(3, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles)
+    base = CountingIndicator(data)
+    derived = DoubledIndicator(base)
+
+    candles[-1].open += 1
+    data.update(candles[-1])
+
+    assert base.runs == 2
+    assert derived.runs == 1
+
+
+def test_graph_releases_unreferenced_nodes():
+    data = InstrumentCandles()
+    candles = get_candles(4, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:2])
+    base = CountingIndicator(data)
+    derived = DoubledIndicator(base)
+    released = weakref.ref(CountingIndicator(data, 5))
+    gc.collect()
+
+    assert released() is None
+    assert IndicatorGraph.of(data).nodes == (base, derived)
+
+    del base
+    gc.collect()
+    data.update(candles[2])
+
+    assert derived.runs + derived.steps == 2
+    assert len(IndicatorGraph.of(data).nodes) == 2
+
+    kept = weakref.ref(derived._data)
+    del derived
+    gc.collect()
+    data.update(candles[3])
+
+    assert kept() is None
+    assert IndicatorGraph.of(data).nodes == ()
+
+
+def test_indicator_of_indicator_steps():
+    data = InstrumentCandles()
+    candles = get_candles(8, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:2])
+    base = SteppedIndicator(data)
+    doubled = DoubledIndicator(base)
+
+    for candle in candles[2:]:
+        data.update(candle)
+
+    assert doubled.runs == 1
+    assert doubled.steps == len(candles[2:])
+    np.testing.assert_allclose(doubled.to_array, data.Open * 4)
+
+
+class DoubledIndicator(Indicator):
+
+    def __init__(self, data, *args, **kwargs):
+        self.runs = 0
+        self.steps = 0
+        super().__init__(data, *args, **kwargs)
+
+    def _run(self, *args, **kwargs):
+        self.runs += 1
+        return self._data.to_array * 2
+
+    def _step(self, value):
+        self.steps += 1
+        return value * 2
+
+
+def test_graph_propagates_revised_steps():
+    data = InstrumentCandles()
+    candles = get_candles(4, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:3])
+    base = SteppedIndicator(data)
+    doubled = DoubledIndicator(base)
+    data.update(candles[3])
+
+    candles[3].open = 50
+    data.update(candles[3])
+
+    assert doubled.value == 200
+
+
+def test_lazy_computes_on_access():
+    data = InstrumentCandles()
+    candles = get_candles(6, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:2])
+    indicator = SteppedIndicator(data, lazy=True)
+
+    for candle in candles[2:]:
+        data.update(candle)
+
+    assert indicator.lazy
+    assert (indicator.runs, indicator.steps) == (1, 0)
+    assert indicator.skipped == 3
+    assert indicator.value == candles[-1].open * 2
+    assert (indicator.runs, indicator.steps) == (2, 0)
+    assert indicator.computed == 2
+    np.testing.assert_allclose(indicator.to_array, data.Open * 2)
+
+    data.update(
+        get_candles(
+            1, Instrument.EURUSD, Granularity.M1, datetime.now() + timedelta(minutes=10)
+        )[0]
+    )
+
+    assert bool(indicator) is True
+    assert (indicator.runs, indicator.steps) == (2, 1)
+
+
+def test_lazy_input_resolved_by_eager_dependent():
+    data = InstrumentCandles()
+    candles = get_candles(5, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:2])
+    base = SteppedIndicator(data, lazy=True)
+    doubled = DoubledIndicator(base)
+
+    for candle in candles[2:]:
+        data.update(candle)
+
+    assert base.steps == 3
+    assert doubled.steps == 3
+    np.testing.assert_allclose(doubled.to_array, data.Open * 4)
+
+
+def test_lazy_shared_with_eager_becomes_eager():
+    data = InstrumentCandles()
+    data.extend(get_candles(3, Instrument.EURUSD, Granularity.M1, datetime.now())[::-1])
+
+    lazy = CountingIndicator(data, lazy=True)
+    eager = CountingIndicator(data)
+
+    assert lazy is eager
+    assert not eager.lazy
+
+
+class WindowIndicator(Indicator):
+
+    lookback = 3
+
+    def _run(self, *args, **kwargs):
+        self.windows = getattr(self, "windows", [])
+        self.windows.append(len(self._data))
+        return self._data.Close * 2
+
+
+def test_lookback_runs_on_window():
+    data = InstrumentCandles()
+    candles = get_candles(10, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:8])
+    indicator = WindowIndicator(data)
+
+    data.update(candles[8])
+    candles[8].close = 100
+    data.update(candles[8])
+    data.update(candles[9])
+
+    assert indicator.windows == [5, 3, 5, 3]
+    assert len(indicator.to_array) == 3
+    np.testing.assert_allclose(indicator.to_array, data.Close[-3:] * 2)
+    assert indicator.max_size == 3
+
+
+def test_lookback_argument():
+    data = InstrumentCandles()
+    data.extend(
+        get_candles(10, Instrument.EURUSD, Granularity.M1, datetime.now())[::-1]
+    )
+
+    indicator = CountingIndicator(data, lookback=4)
+
+    assert indicator is not CountingIndicator(data)
+    np.testing.assert_allclose(indicator.to_array, data.Close[-4:])
+
+
+def test_lookback_requires_windowed_data():
+    data = InstrumentCandles()
+    data.extend(
+        get_candles(10, Instrument.EURUSD, Granularity.M1, datetime.now())[::-1]
+    )
+
+    with pytest.raises(RuntimeError):
+        WindowIndicator(CountingIndicator(data))
+
+
+def test_array_metadata_survives_slicing_and_pickling():
+    array = _Array(np.arange(5.0), name="x", index=np.arange(5) * 10, tz=None)
+
+    tail = array[2:]
+    restored = pickle.loads(pickle.dumps(tail))
+
+    assert tail.name == "x"
+    assert np.array_equal(tail._opts["index"], [20, 30, 40])
+    assert restored.name == "x"
+    assert np.array_equal(restored._opts["index"], [20, 30, 40])
+    assert (array * 2).name == "x"
+    assert float(array) == 4.0
+
+
+def test_array_accessors_share_memory():
+    data = InstrumentCandles()
+    candles = get_candles(6, Instrument.EURUSD, Granularity.M1, datetime.now(pytz.UTC))
+    candles.reverse()
+    data.extend(candles)
+    indicator = SquareIndicator(data)
+    array = indicator.to_array
+
+    series = array.s
+    joined = data.df.join(series)
+
+    assert array.name == "SquareIndicator()"
+    assert np.shares_memory(series.to_numpy(), indicator._values)
+    pd.testing.assert_index_equal(series.index, data.df.index)
+    np.testing.assert_allclose(joined[array.name], data.Open**2)
+    assert np.shares_memory(array.df.to_numpy(), indicator._values)
+    assert array[-3:].s.index.equals(data.df.index[-3:])
+
+
+def test_snapshot_survives_later_bars():
+    data = InstrumentCandles(max_size=10)
+    candles = get_candles(25, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles[:10])
+    indicator = SteppedIndicator(data)
+
+    view, snapshot = indicator.to_array, indicator.snapshot()
+    expected = np.array(view)
+    timestamps = np.array(view._opts["index"])
+    series = snapshot.s
+    for candle in candles[10:]:
+        data.update(candle)
+
+    assert not np.array_equal(view, expected)
+    np.testing.assert_array_equal(snapshot, expected)
+    np.testing.assert_array_equal(snapshot._opts["index"], timestamps)
+    np.testing.assert_array_equal(series.to_numpy(), expected)
+    assert series.index.asi8.tolist() == timestamps.tolist()
+
+
+def test_array_multi_line_frame():
+    data = InstrumentCandles()
+    candles = get_candles(30, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data.extend(candles)
+
+    bands = BollingerBands(data, 10).to_array
+
+    assert bands.name == "BollingerBands(10)"
+    assert list(bands.df.columns) == ["middle", "upper", "lower"]
+    assert np.shares_memory(bands.df.to_numpy(), bands)
+    with pytest.raises(RuntimeError):
+        bands.s
+
+
+def cached_data(candles: list[Candlestick]) -> InstrumentCandles:
+    data = InstrumentCandles()
+    data.extend(candles)
+    return data
+
+
+def test_cache_serves_identical_inputs(tmp_path):
+    cache = IndicatorCache(str(tmp_path))
+    candles = get_candles(20, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+
+    first = CountingIndicator(cached_data(candles), 3, cache=cache)
+    second = CountingIndicator(cached_data(candles), 3, cache=cache)
+    other = CountingIndicator(cached_data(candles), 4, cache=cache)
+
+    assert (first.runs, second.runs, other.runs) == (1, 0, 1)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert isinstance(second._values, np.memmap)
+    np.testing.assert_array_equal(second.to_array, first.to_array)
+
+
+def test_cache_keys_on_contents(tmp_path):
+    cache = IndicatorCache(str(tmp_path))
+    candles = get_candles(20, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    CountingIndicator(cached_data(candles), cache=cache)
+
+    candles[5].close += 1
+    changed = CountingIndicator(cached_data(candles), cache=cache)
+
+    assert changed.runs == 1
+    assert cache.hits == 0
+
+
+def test_cache_resumes_stepping_after_hit(tmp_path):
+    cache = IndicatorCache(str(tmp_path))
+    candles = get_candles(12, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    SteppedIndicator(cached_data(candles[:10]), cache=cache)
+    data = cached_data(candles[:10])
+    indicator = SteppedIndicator(data, cache=cache)
+
+    data.update(candles[10])
+    data.update(candles[11])
+
+    assert (indicator.runs, indicator.steps) == (1, 1)
+    np.testing.assert_allclose(indicator.to_array, data.Open * 2)
+
+
+def test_cache_only_serves_first_run(tmp_path):
+    cache = IndicatorCache(str(tmp_path))
+    candles = get_candles(12, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data = cached_data(candles[:10])
+    indicator = CountingIndicator(data, cache=cache)
+
+    data.update(candles[10])
+    data.update(candles[11])
+
+    assert indicator.runs == 3
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_cache_scans_only_over_limit(tmp_path, monkeypatch):
+    candles = get_candles(20, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data = cached_data(candles)
+    cache = IndicatorCache(str(tmp_path))
+    scans = []
+    monkeypatch.setattr(cache, "_evict", lambda: scans.append(1))
+
+    for period in range(3):
+        CountingIndicator(data, period, cache=cache)
+
+    assert not scans
+    assert cache._size == sum(f.stat().st_size for f in tmp_path.iterdir())
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    candles = get_candles(100, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    data = cached_data(candles)
+    entry = CountingIndicator(data, 0, cache=IndicatorCache(str(tmp_path / "probe")))
+    size = (tmp_path / "probe" / os.listdir(tmp_path / "probe")[0]).stat().st_size
+    cache = IndicatorCache(str(tmp_path / "cache"), max_bytes=2 * size)
+
+    for period in range(3):
+        CountingIndicator(data, period, cache=cache)
+        time.sleep(0.01)
+    CountingIndicator(cached_data(candles), 1, cache=cache)
+    CountingIndicator(cached_data(candles), 3, cache=cache)
+
+    assert entry.runs == 1
+    assert len(os.listdir(tmp_path / "cache")) == 2
+    assert CountingIndicator(cached_data(candles), 1, cache=cache).runs == 0
+    assert CountingIndicator(cached_data(candles), 0, cache=cache).runs == 1
+
+
+def test_cache_class_default(tmp_path):
+    class CachedIndicator(CountingIndicator):
+        cache = IndicatorCache(str(tmp_path))
+
+    candles = get_candles(5, Instrument.EURUSD, Granularity.M1, datetime.now())
+    candles.reverse()
+    CachedIndicator(cached_data(candles))
+
+    assert CachedIndicator(cached_data(candles)).runs == 0
@@ -0,0 +1,322 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytrade.indicators import (
+    ADX,
+    ATR,
+    EMA,
+    MACD,
+    RSI,
+    SMA,
+    BollingerBands,
+    Donchian,
+    Stochastic,
+    functions,
+)
+from pytrade.indicators.streaming import (
+    AdxStream,
+    AtrStream,
+    BollingerStream,
+    DonchianStream,
+    EmaStream,
+    MacdStream,
+    RsiStream,
+    SmaStream,
+    StochasticStream,
+)
+from pytrade.models.instruments import (
+    Candlestick,
+    Granularity,
+    Instrument,
+    InstrumentCandles,
+)
+
+
+def get_prices(count: int, seed: int = 7) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, count))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) + rng.uniform(0, 0.001, count)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.001, count)
+    return open_, high, low, close
+
+
+def get_candles(count: int) -> list[Candlestick]:
+    start = datetime(2024, 1, 1)
+    return [
+        Candlestick(
+            Instrument.EURUSD,
+            Granularity.M1,
+            o,
+            h,
+            low,
+            c,
+            start + timedelta(minutes=i),
+        )
+        for i, (o, h, low, c) in enumerate(zip(*get_prices(count)))
+    ]
+
+
+def as_columns(result) -> np.ndarray:
+    return np.column_stack(result) if isinstance(result, tuple) else np.asarray(result)
+
+
+def step(stream, *inputs) -> np.ndarray:
+    return np.array(
+        [as_columns(stream.update(*bar)).ravel() for bar in zip(*inputs)]
+    ).squeeze()
+
+
+CASES = [
+    ("sma", lambda: SmaStream(10), lambda o, h, lo, c: functions.sma(c, 10), "c"),
+    ("ema", lambda: EmaStream(10), lambda o, h, lo, c: functions.ema(c, 10), "c"),
+    ("rsi", lambda: RsiStream(14), lambda o, h, lo, c: functions.rsi(c, 14), "c"),
+    (
+        "atr",
+        lambda: AtrStream(14),
+        lambda o, h, lo, c: functions.atr(h, lo, c, 14),
+        "hlc",
+    ),
+    (
+        "bollinger",
+        lambda: BollingerStream(20, 2.0),
+        lambda o, h, lo, c: functions.bollinger_bands(c, 20, 2.0),
+        "c",
+    ),
+    (
+        "macd",
+        lambda: MacdStream(12, 26, 9),
+        lambda o, h, lo, c: functions.macd(c, 12, 26, 9),
+        "c",
+    ),
+    (
+        "stochastic",
+        lambda: StochasticStream(14, 3),
+        lambda o, h, lo, c: functions.stochastic(h, lo, c, 14, 3),
+        "hlc",
+    ),
+    (
+        "donchian",
+        lambda: DonchianStream(20),
+        lambda o, h, lo, c: functions.donchian(h, lo, 20),
+        "hl",
+    ),
+    (
+        "adx",
+        lambda: AdxStream(14),
+        lambda o, h, lo, c: functions.adx(h, lo, c, 14),
+        "hlc",
+    ),
+]
+
+
+def inputs_for(columns: str, prices) -> list[np.ndarray]:
+    _, high, low, close = prices
+    return {"c": [close], "hl": [high, low], "hlc": [high, low, close]}[columns]
+
+
+@pytest.mark.parametrize("name,stream,batch,columns", CASES, ids=[c[0] for c in CASES])
+def test_streaming_matches_batch(name, stream, batch, columns):
+    prices = get_prices(300)
+    expected = as_columns(batch(*prices))
+
+    actual = step(stream(), *inputs_for(columns, prices))
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("name,stream,batch,columns", CASES, ids=[c[0] for c in CASES])
+@pytest.mark.parametrize("split", [0, 5, 30, 299])
+def test_resume_then_step_matches_batch(name, stream, batch, columns, split):
+    prices = get_prices(300)
+    inputs = inputs_for(columns, prices)
+    expected = as_columns(batch(*prices))
+    state = stream()
+
+    head = as_columns(state.resume(*[x[:split] for x in inputs]))
+    tail = step(state, *[x[split:] for x in inputs])
+
+    np.testing.assert_allclose(
+        head.reshape(expected[:split].shape), expected[:split], rtol=1e-9, atol=1e-9
+    )
+    np.testing.assert_allclose(
+        tail.reshape(expected[split:].shape), expected[split:], rtol=1e-9, atol=1e-9
+    )
+
+
+def test_functions_match_pandas():
+    _, high, low, close = get_prices(200)
+    series = pd.Series(close)
+
+    np.testing.assert_allclose(
+        functions.sma(close, 10), series.rolling(10).mean(), equal_nan=True
+    )
+    middle, upper, lower = functions.bollinger_bands(close, 20, 2.0)
+    std = series.rolling(20).std(ddof=0)
+    np.testing.assert_allclose(
+        upper, series.rolling(20).mean() + 2 * std, equal_nan=True
+    )
+    np.testing.assert_allclose(lower, middle - 2 * std, equal_nan=True)
+    percent_k, _ = functions.stochastic(high, low, close, 14, 3)
+    highest = pd.Series(high).rolling(14).max()
+    lowest = pd.Series(low).rolling(14).min()
+    np.testing.assert_allclose(
+        percent_k, 100 * (series - lowest) / (highest - lowest), equal_nan=True
+    )
+
+    seeded = series.copy()
+    seeded.iloc[:9] = np.nan
+    seeded.iloc[9] = series.iloc[:10].mean()
+    np.testing.assert_allclose(
+        functions.ema(close, 10),
+        seeded.ewm(span=10, adjust=False).mean(),
+        equal_nan=True,
+    )
+
+
+def test_warmup_is_nan():
+    _, high, low, close = get_prices(100)
+
+    assert np.isnan(functions.sma(close, 10)[:9]).all()
+    assert not np.isnan(functions.sma(close, 10)[9:]).any()
+    assert np.isnan(functions.rsi(close, 14)[:14]).all()
+    assert not np.isnan(functions.rsi(close, 14)[14:]).any()
+    adx, plus_di, _ = functions.adx(high, low, close, 14)
+    assert np.isnan(plus_di[:14]).all() and not np.isnan(plus_di[14:]).any()
+    assert np.isnan(adx[:27]).all() and not np.isnan(adx[27:]).any()
+    line, signal, _ = functions.macd(close, 12, 26, 9)
+    assert np.isnan(line[:25]).all() and not np.isnan(line[25:]).any()
+    assert np.isnan(signal[:33]).all() and not np.isnan(signal[33:]).any()
+
+
+def test_flat_prices():
+    flat = np.full(50, 1.5)
+
+    np.testing.assert_allclose(functions.rsi(flat, 14)[14:], 50.0)
+    np.testing.assert_allclose(
+        functions.stochastic(flat, flat, flat, 14, 3)[0][13:], 50.0
+    )
+    np.testing.assert_allclose(functions.adx(flat, flat, flat, 14)[0][27:], 0.0)
+
+
+def test_functions_accept_columns():
+    first, second = get_prices(120, seed=1), get_prices(120, seed=2)
+    high, low, close = (np.column_stack([a, b]) for a, b in zip(first[1:], second[1:]))
+
+    for fn, args in [
+        (functions.ema, (close, 10)),
+        (functions.rsi, (close, 14)),
+        (functions.atr, (high, low, close, 14)),
+    ]:
+        stacked = fn(*args)
+        for column in range(2):
+            single = fn(
+                *[a[:, column] if isinstance(a, np.ndarray) else a for a in args]
+            )
+            np.testing.assert_allclose(stacked[:, column], single, equal_nan=True)
+
+    adx, _, _ = functions.adx(high, low, close, 14)
+    np.testing.assert_allclose(
+        adx[:, 1],
+        functions.adx(high[:, 1], low[:, 1], close[:, 1], 14)[0],
+        equal_nan=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "indicator,args,expected",
+    [
+        (SMA, (10,), lambda o, h, lo, c: functions.sma(c, 10)),
+        (EMA, (10,), lambda o, h, lo, c: functions.ema(c, 10)),
+        (RSI, (14,), lambda o, h, lo, c: functions.rsi(c, 14)),
+        (ATR, (14,), lambda o, h, lo, c: functions.atr(h, lo, c, 14)),
+        (
+            BollingerBands,
+            (20, 2.0),
+            lambda o, h, lo, c: functions.bollinger_bands(c, 20, 2.0),
+        ),
+        (MACD, (12, 26, 9), lambda o, h, lo, c: functions.macd(c, 12, 26, 9)),
+        (
+            Stochastic,
+            (14, 3),
+            lambda o, h, lo, c: functions.stochastic(h, lo, c, 14, 3),
+        ),
+        (ADX, (14,), lambda o, h, lo, c: functions.adx(h, lo, c, 14)),
+        (Donchian, (20,), lambda o, h, lo, c: functions.donchian(h, lo, 20)),
+    ],
+)
+def test_indicator_streams_updates(indicator, args, expected):
+    candles = get_candles(120)
+    data = InstrumentCandles(max_size=100)
+    data.extend(candles[:40])
+    instance = indicator(data, *args)
+    run_count = 0
+    original = instance._run
+
+    def counting_run(*a, **kw):
+        nonlocal run_count
+        run_count += 1
+        return original(*a, **kw)
+
+    instance._run = counting_run
+
+    for candle in candles[40:]:
+        data.update(candle)
+
+    assert run_count == 0
+    prices = get_prices(120)
+    np.testing.assert_allclose(
+        instance.to_array, as_columns(expected(*prices))[-100:], rtol=1e-9, atol=1e-9
+    )
+
+
+def test_indicator_column_and_lines():
+    data = InstrumentCandles()
+    data.extend(get_candles(60))
+
+    sma = SMA(data, 5, column="Open")
+    bands = BollingerBands(data, 20)
+    macd = MACD(data)
+
+    np.testing.assert_allclose(
+        sma.to_array, functions.sma(data.Open, 5), equal_nan=True
+    )
+    np.testing.assert_allclose(
+        bands.upper, functions.bollinger_bands(data.Close, 20)[1], equal_nan=True
+    )
+    assert bands.value[1] > bands.value[0] > bands.value[2]
+    np.testing.assert_allclose(macd.histogram, macd.macd - macd.signal, equal_nan=True)
+
+
+def test_indicator_of_indicator():
+    candles = get_candles(80)
+    data = InstrumentCandles()
+    data.extend(candles[:30])
+    smoothed = EMA(RSI(data, 14), 5)
+
+    for candle in candles[30:]:
+        data.update(candle)
+
+    assert RSI(data, 14) is smoothed._data
+    expected = functions.ema(functions.rsi(get_prices(80)[3], 14), 5)
+    np.testing.assert_allclose(smoothed.to_array, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_lookback_matches_full_history():
+    candles = get_candles(200)
+    data = InstrumentCandles(max_size=100_000)
+    data.extend(candles[:150])
+    sma = SMA(data, 10, lookback=10)
+    bands = BollingerBands(data, 20, lookback=20)
+
+    for candle in candles[150:]:
+        data.update(candle)
+
+    _, _, _, close = get_prices(200)
+    np.testing.assert_allclose(sma.to_array, functions.sma(close, 10)[-10:])
+    np.testing.assert_allclose(
+        bands.to_array, np.column_stack(functions.bollinger_bands(close, 20))[-20:]
+    )
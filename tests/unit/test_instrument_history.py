@@ -1,7 +1,10 @@
 import random
+import threading
 import time
 from datetime import datetime, timedelta
+from unittest.mock import MagicMock
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -9,6 +12,9 @@ from pytrade.models.instruments import (
     COLUMNS,
     INDEX,
     MINUTES_MAP,
+    CandleAggregator,
+    CandleBatch,
+    CandleData,
     Candlestick,
     Granularity,
     Instrument,
@@ -37,7 +43,6 @@ def candles_to_data(candles: list[Candlestick]):
     return [
         [
             candlestick.timestamp,
-            candlestick.instrument,
             candlestick.open,
             candlestick.high,
             candlestick.low,
@@ -142,3 +147,421 @@ def test_update_wrong_granularity():
 
         history.update(first_candle)
         history.update(second_candle)
+
+
+def test_update_same_timestamp_revises_bar():
+    history = InstrumentCandles(max_size=10)
+    dummy_candles = get_candles(2, Granularity.M1)
+    for candle in dummy_candles:
+        history.update(candle)
+
+    revised = dummy_candles[-1]
+    revised.close = 42.0
+    history.update(revised)
+
+    assert len(history.df) == 2
+    assert history.df.Close.iloc[-1] == 42.0
+
+
+def test_update_earlier_timestamp_revises_bar():
+    history = InstrumentCandles(max_size=3)
+    dummy_candles = get_candles(5, Granularity.M1)
+    for candle in dummy_candles:
+        history.update(candle)
+    callback = MagicMock()
+    history.on_update += callback
+
+    dummy_candles[3].close = 42.0
+    history.update(dummy_candles[3])
+    history.update(dummy_candles[0])
+
+    assert callback.call_count == 1
+    assert history.count == 5
+    assert history.df.index.is_monotonic_increasing
+    assert history.Close.tolist() == [
+        dummy_candles[2].close,
+        42.0,
+        dummy_candles[4].close,
+    ]
+
+
+def test_df_is_cached_until_update():
+    history = InstrumentCandles(max_size=10)
+    dummy_candles = get_candles(3, Granularity.M1)
+    history.update(dummy_candles[0])
+    history.update(dummy_candles[1])
+
+    df = history.df
+    assert history.df is df
+
+    history.update(dummy_candles[2])
+    assert history.df is not df
+    assert len(history.df) == 3
+
+
+def test_price_accessors_are_buffer_views():
+    history = InstrumentCandles(max_size=10)
+    dummy_candles = get_candles(12, Granularity.M1)
+    for candle in dummy_candles:
+        history.update(candle)
+
+    assert isinstance(history.Close, np.ndarray)
+    assert np.shares_memory(history.Close, history._buffer._close)
+    assert not history.Close.flags.writeable
+    assert np.array_equal(history.Close, [c.close for c in dummy_candles[2:]])
+    assert history._df is None
+
+
+def test_tail_is_a_view_of_latest_bars():
+    history = InstrumentCandles(max_size=10)
+    dummy_candles = get_candles(12, Granularity.M1)
+    history.extend(dummy_candles)
+
+    window = history.tail(4)
+    longer = history.tail(50)
+
+    assert len(window) == 4
+    assert len(longer) == 10
+    assert np.shares_memory(window.Close, history._buffer._close)
+    assert np.array_equal(window.Open, [c.open for c in dummy_candles[-4:]])
+    assert window.last.close == history.last.close
+    assert (window.count, window.version) == (history.count, history.version)
+    pd.testing.assert_frame_equal(window.df, history.df.iloc[-4:])
+    with pytest.raises(RuntimeError):
+        window.on_update = None
+
+
+@pytest.mark.parametrize("max_size", [None, 10])
+def test_extend_matches_update(max_size):
+    dummy_candles = get_candles(25, Granularity.M5)
+    updated = InstrumentCandles(max_size=max_size)
+    extended = InstrumentCandles(max_size=max_size)
+    for candle in dummy_candles:
+        updated.update(candle)
+
+    extended.update(dummy_candles[0])
+    extended.extend(dummy_candles[1:])
+
+    assert extended.df.equals(updated.df)
+
+
+def test_extend_notifies_once():
+    history = InstrumentCandles(max_size=10)
+    callback = MagicMock()
+    history.on_update += callback
+
+    history.extend(CandleBatch.from_candles(get_candles(20, Granularity.M1)))
+
+    assert callback.call_count == 1
+    assert len(history) == 10
+
+
+def test_batch_notifies_once_on_exit():
+    history = InstrumentCandles(max_size=10)
+    callback = MagicMock()
+    history.on_update += callback
+
+    with history.batch():
+        with history.batch():
+            for candle in get_candles(3, Granularity.M1):
+                history.update(candle)
+        assert callback.call_count == 0
+        assert len(history) == 3
+
+    assert callback.call_count == 1
+    with history.batch():
+        pass
+    assert callback.call_count == 1
+
+
+@pytest.mark.parametrize("max_size", [None, 12])
+def test_extend_revises_overlapping_history(max_size):
+    dummy_candles = get_candles(15, Granularity.M1)
+    history = InstrumentCandles(max_size=max_size)
+    history.extend(dummy_candles[:10])
+    overlap = dummy_candles[:15]
+    for candle in overlap[:10]:
+        candle.close = 42.0
+
+    history.extend(overlap)
+
+    assert history.count == 15
+    assert history.df.index.is_unique
+    assert history.df.index.is_monotonic_increasing
+    assert history.df.Close.iloc[-7:-5].tolist() == [42.0, 42.0]
+    np.testing.assert_array_equal(
+        history.Close[-5:], [c.close for c in dummy_candles[10:]]
+    )
+
+
+def test_extend_rejects_unsorted_batch():
+    dummy_candles = get_candles(3, Granularity.M1)
+
+    with pytest.raises(RuntimeError):
+        InstrumentCandles().extend(dummy_candles[::-1])
+
+
+def test_extend_wrong_instrument():
+    dummy_candles = get_candles(2, Granularity.M1)
+    dummy_candles[1].instrument = Instrument.GBPUSD
+
+    with pytest.raises(RuntimeError):
+        InstrumentCandles(max_size=10).extend(dummy_candles)
+
+
+def test_candle_data_update_many():
+    data = CandleData(max_size=10)
+    eurusd = get_candles(5, Granularity.M1)
+    gbpusd = get_candles(5, Granularity.M1)
+    for candle in gbpusd:
+        candle.instrument = Instrument.GBPUSD
+
+    data.update_many(eurusd + gbpusd)
+
+    assert len(data.get(Instrument.EURUSD, Granularity.M1)) == 5
+    assert len(data.get(Instrument.GBPUSD, Granularity.M1)) == 5
+    assert np.array_equal(
+        data.get(Instrument.GBPUSD, Granularity.M1).Close, [c.close for c in gbpusd]
+    )
+
+
+def test_candle_data_reopens_store(tmp_path):
+    dummy_candles = get_candles(5, Granularity.M1)
+    data = CandleData(max_size=10, path=str(tmp_path))
+    data.update_many(dummy_candles)
+    expected = data.get(Instrument.EURUSD, Granularity.M1).df.copy()
+
+    reopened = CandleData(max_size=10, path=str(tmp_path))
+    assert reopened.get(Instrument.EURUSD, Granularity.M1).df.equals(expected)
+
+
+def test_compact_dtype():
+    history = InstrumentCandles(max_size=10, dtype=np.float32)
+    for candle in get_candles(3, Granularity.M5):
+        history.update(candle)
+
+    assert history.instrument == Instrument.EURUSD
+    assert history.granularity == Granularity.M5
+    assert list(history.df.columns) == COLUMNS[1:]
+    assert (history.df.dtypes == np.float32).all()
+    assert history.Timestamp.dtype == np.int64
+
+
+def test_candle_data_instances_are_independent():
+    first = CandleData(max_size=5)
+    second = CandleData(max_size=10)
+    for candle in get_candles(12, Granularity.M1):
+        first.update(candle)
+        second.update(candle)
+
+    assert first is not second
+    assert len(first.get(Instrument.EURUSD, Granularity.M1)) == 5
+    assert len(second.get(Instrument.EURUSD, Granularity.M1)) == 10
+
+
+def test_candle_data_get_returns_same_series():
+    data = CandleData()
+    series = data.get(Instrument.EURUSD, Granularity.M1)
+
+    assert data.get(Instrument.EURUSD, Granularity.M1) is series
+
+
+def test_candle_data_concurrent_updates():
+    data = CandleData(max_size=None)
+    instruments = [Instrument.EURUSD, Instrument.GBPUSD, Instrument.USDJPY]
+    count = 500
+
+    candles = get_candles(count, Granularity.M1)
+
+    def feed(instrument: Instrument):
+        for candle in candles:
+            data.update(
+                Candlestick(
+                    instrument,
+                    candle.granularity,
+                    candle.open,
+                    candle.high,
+                    candle.low,
+                    candle.close,
+                    candle.timestamp,
+                )
+            )
+
+    # Two feeds per series, each bar appended by one and revised by the other
+    threads = [
+        threading.Thread(target=feed, args=(instrument,))
+        for instrument in instruments * 2
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for instrument in instruments:
+        series = data.get(instrument, Granularity.M1)
+        assert series.count == count
+        assert series.df.index.is_monotonic_increasing
+
+
+def aligned_candles(count: int, granularity: Granularity, start: datetime):
+    candles = get_candles(count, granularity)
+    for i, candle in enumerate(candles):
+        candle.timestamp = start + timedelta(minutes=MINUTES_MAP[granularity] * i)
+    return candles
+
+
+def test_aggregator_builds_higher_timeframe():
+    source = aligned_candles(15, Granularity.M1, datetime(2024, 1, 1, 9, 0))
+    aggregator = CandleAggregator(Instrument.EURUSD, Granularity.M5)
+
+    completed = aggregator.extend(source)
+
+    assert [c.timestamp for c in completed] == [
+        datetime(2024, 1, 1, 9, 0),
+        datetime(2024, 1, 1, 9, 5),
+        datetime(2024, 1, 1, 9, 10),
+    ]
+    for candle, bucket in zip(completed, [source[:5], source[5:10], source[10:]]):
+        assert candle.granularity == Granularity.M5
+        assert candle.open == bucket[0].open
+        assert candle.high == max(c.high for c in bucket)
+        assert candle.low == min(c.low for c in bucket)
+        assert candle.close == bucket[-1].close
+
+
+def test_aggregator_flushes_incomplete_bucket():
+    source = aligned_candles(10, Granularity.M1, datetime(2024, 1, 1, 9, 0))
+    aggregator = CandleAggregator(Instrument.EURUSD, Granularity.M5)
+
+    assert aggregator.extend(source[:3]) == []
+    completed = aggregator.update(source[7])
+
+    assert len(completed) == 1
+    assert completed[0].timestamp == datetime(2024, 1, 1, 9, 0)
+    assert completed[0].close == source[2].close
+
+
+def test_aggregator_folds_revisions_into_emitted_bucket():
+    source = aligned_candles(6, Granularity.M1, datetime(2024, 1, 1, 9, 0))
+    aggregator = CandleAggregator(Instrument.EURUSD, Granularity.M5)
+    (emitted,) = aggregator.extend(source[:5])
+
+    revision = Candlestick(
+        Instrument.EURUSD, Granularity.M1, 1.0, 20.0, -1.0, 2.0, source[4].timestamp
+    )
+    (revised,) = aggregator.update(revision)
+
+    assert revised.timestamp == emitted.timestamp
+    assert revised.open == source[0].open
+    assert revised.high == 20.0
+    assert revised.low == -1.0
+    assert revised.close == 2.0
+
+    assert aggregator.update(source[5]) == []
+    assert aggregator.update(revision) == []
+
+
+def test_candle_data_revisions_keep_derived_series_in_order():
+    data = CandleData(derive=[Granularity.M5])
+    source = aligned_candles(7, Granularity.M1, datetime(2024, 1, 1, 9, 0))
+    for candle in source[:5]:
+        data.update(candle)
+    m5 = data.get(Instrument.EURUSD, Granularity.M5)
+    expected = (source[0].open, min(c.low for c in source[:5]))
+
+    data.update(source[4])
+    assert len(m5) == 1
+    assert (m5.Open[0], m5.Low[0]) == expected
+
+    for candle in source[5:]:
+        data.update(candle)
+    late = Candlestick(
+        Instrument.EURUSD, Granularity.M1, 0.0, 0.0, -5.0, 0.0, source[4].timestamp
+    )
+    assert data.update(late) == []
+    assert len(m5) == 1
+    assert (m5.Open[0], m5.Low[0]) == expected
+
+
+def test_candle_data_derives_granularities():
+    data = CandleData(derive=[Granularity.M5, Granularity.M15])
+    source = aligned_candles(30, Granularity.M1, datetime(2024, 1, 1, 9, 0))
+
+    derived = []
+    for candle in source[:15]:
+        derived += data.update(candle)
+    derived += data.update_many(source[15:])
+
+    assert len(data.get(Instrument.EURUSD, Granularity.M1)) == 30
+    assert len(data.get(Instrument.EURUSD, Granularity.M5)) == 6
+    assert len(data.get(Instrument.EURUSD, Granularity.M15)) == 2
+    assert len(derived) == 8
+    assert data.get(Instrument.EURUSD, Granularity.M15).High[0] == max(
+        c.high for c in source[:15]
+    )
+
+
+def test_candle_data_batch_notifies_each_series_once():
+    data = CandleData(derive=[Granularity.M5, Granularity.M15])
+    eurusd = data.get(Instrument.EURUSD, Granularity.M1)
+    calls = []
+    eurusd.on_update += lambda: calls.append("EURUSD M1")
+    source = aligned_candles(15, Granularity.M1, datetime(2024, 1, 1, 9, 0))
+
+    with data.batch():
+        for candle in source:
+            data.update(candle)
+        gbpusd = data.get(Instrument.GBPUSD, Granularity.M1)
+        gbpusd.on_update += lambda: calls.append("GBPUSD M1")
+        candle = source[0]
+        gbpusd.update(
+            Candlestick(
+                Instrument.GBPUSD,
+                Granularity.M1,
+                candle.open,
+                candle.high,
+                candle.low,
+                candle.close,
+                candle.timestamp,
+            )
+        )
+        m15 = data.get(Instrument.EURUSD, Granularity.M15)
+        m15.on_update += lambda: calls.append("EURUSD M15")
+        assert calls == []
+
+    assert calls == ["EURUSD M1", "EURUSD M15", "GBPUSD M1"]
+    assert len(m15) == 1
+    data.update(source[-1])
+    assert calls[3] == "EURUSD M1"
+
+
+def test_batch_only_defers_the_current_thread():
+    data = CandleData()
+    eurusd, gbpusd = get_candles(1, Granularity.M1), get_candles(1, Granularity.M1)
+    gbpusd[0].instrument = Instrument.GBPUSD
+    calls = []
+    data.get(Instrument.EURUSD, Granularity.M1).on_update += lambda: calls.append(
+        "EURUSD"
+    )
+    data.get(Instrument.GBPUSD, Granularity.M1).on_update += lambda: calls.append(
+        "GBPUSD"
+    )
+    opened, written = threading.Event(), threading.Event()
+
+    def hold_scope():
+        with data.batch():
+            data.update(gbpusd[0])
+            opened.set()
+            written.wait(timeout=1)
+
+    holder = threading.Thread(target=hold_scope)
+    holder.start()
+    opened.wait(timeout=1)
+
+    with data.batch():
+        data.update(eurusd[0])
+    assert calls == ["EURUSD"]
+
+    written.set()
+    holder.join(timeout=1)
+    assert calls == ["EURUSD", "GBPUSD"]
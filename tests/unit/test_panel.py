@@ -0,0 +1,183 @@
+import gc
+import weakref
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from pytrade.indicators import RSI, SMA, BollingerBands
+from pytrade.models.instruments import (
+    CandleData,
+    Candlestick,
+    Granularity,
+    Instrument,
+    InstrumentCandles,
+)
+from pytrade.models.panel import CandlePanel, PanelColumn
+
+INSTRUMENTS = [Instrument.EURUSD, Instrument.GBPUSD, Instrument.USDJPY]
+
+
+def get_candles(
+    instrument: Instrument, count: int, seed: int, start: int = 0
+) -> list[Candlestick]:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, count))
+    start_time = datetime(2024, 1, 1)
+    return [
+        Candlestick(
+            instrument,
+            Granularity.M1,
+            c,
+            c + 0.0005,
+            c - 0.0005,
+            c,
+            start_time + timedelta(minutes=start + i),
+        )
+        for i, c in enumerate(close)
+    ]
+
+
+def get_members(count: int) -> list[InstrumentCandles]:
+    members = []
+    for seed, instrument in enumerate(INSTRUMENTS):
+        member = InstrumentCandles()
+        member.extend(get_candles(instrument, count, seed))
+        members.append(member)
+    return members
+
+
+def test_panel_aligns_members():
+    members = get_members(10)
+    missing = InstrumentCandles()
+    candles = get_candles(Instrument.AUDUSD, 10, 9)
+    missing.extend(candles[:4] + candles[5:])
+
+    panel = CandlePanel([*members, missing])
+
+    assert len(panel) == 9
+    assert panel.Close.shape == (9, 4)
+    assert 4 not in [
+        (t - members[0].Timestamp[0]) // 60_000_000_000 for t in panel.Timestamp
+    ]
+    np.testing.assert_array_equal(
+        panel.Close[:, 3], [c.close for c in candles[:4] + candles[5:]]
+    )
+    np.testing.assert_array_equal(
+        panel.df["Close"]["EURUSD"].to_numpy(), np.delete(members[0].Close, 4)
+    )
+
+
+def test_panel_appends_when_aligned():
+    members = get_members(5)
+    panel = CandlePanel(members, max_size=4)
+    updates = []
+    panel.on_update += lambda: updates.append(panel.count)
+    new = [get_candles(i, 1, 20 + n, start=5)[0] for n, i in enumerate(INSTRUMENTS)]
+
+    members[0].update(new[0])
+    members[1].update(new[1])
+    assert updates == []
+
+    members[2].update(new[2])
+    new[1].close = 5.0
+    members[1].update(new[1])
+
+    assert len(updates) == 2
+    assert len(panel) == 4
+    np.testing.assert_array_equal(panel.last.close, [new[0].close, 5.0, new[2].close])
+    assert panel.last.timestamp == members[0].Timestamp[-1]
+
+
+def test_panel_reloads_after_bulk_writes():
+    members = get_members(5)
+    panel = CandlePanel(members)
+
+    for seed, (member, instrument) in enumerate(zip(members, INSTRUMENTS)):
+        member.extend(get_candles(instrument, 3, 30 + seed, start=5))
+
+    assert len(panel) == 8
+    for position, member in enumerate(members):
+        np.testing.assert_array_equal(panel.Close[:, position], member.Close)
+
+
+def test_panel_reloads_after_batched_revision():
+    data = CandleData()
+    candles = {i: get_candles(i, 4, seed) for seed, i in enumerate(INSTRUMENTS)}
+    for series in candles.values():
+        data.update_many(series[:3])
+    panel = CandlePanel.from_data(data, INSTRUMENTS, Granularity.M1)
+
+    with data.batch():
+        for series in candles.values():
+            series[2].close = 50.0
+            data.update(series[2])
+            data.update(series[3])
+
+    for position, instrument in enumerate(INSTRUMENTS):
+        member = data.get(instrument, Granularity.M1)
+        assert member.Close[2] == 50.0
+        np.testing.assert_array_equal(panel.Close[:, position], member.Close)
+
+
+def test_panel_rejects_mixed_granularities():
+    first, second = InstrumentCandles(), InstrumentCandles()
+    first.extend(get_candles(Instrument.EURUSD, 2, 0))
+    second.update(
+        Candlestick(Instrument.EURUSD, Granularity.M5, 1, 1, 1, 1, datetime(2024, 1, 1))
+    )
+
+    with pytest.raises(RuntimeError):
+        CandlePanel([first, second])
+
+
+def test_panel_from_data():
+    data = CandleData()
+    for seed, instrument in enumerate(INSTRUMENTS):
+        data.update_many(get_candles(instrument, 5, seed))
+
+    panel = CandlePanel.from_data(data, INSTRUMENTS, Granularity.M1)
+
+    assert panel.instruments == INSTRUMENTS
+    assert panel.column(Instrument.USDJPY) == 2
+    assert panel.Open.shape == (5, 3)
+
+
+@pytest.mark.parametrize(
+    "indicator,args",
+    [(SMA, (5,)), (RSI, (14,)), (BollingerBands, (10, 2.0))],
+)
+def test_panel_indicator_matches_per_instrument(indicator, args):
+    members = get_members(30)
+    panel = CandlePanel(members)
+    combined = indicator(panel, *args)
+    separate = [indicator(member, *args) for member in members]
+    columns = {i: PanelColumn(combined, i) for i in INSTRUMENTS}
+
+    for n in range(5):
+        for seed, (member, instrument) in enumerate(zip(members, INSTRUMENTS)):
+            member.update(
+                get_candles(instrument, 1, 40 + 3 * n + seed, start=30 + n)[0]
+            )
+
+    assert combined.computed == 1 + 5
+    for position, (instrument, single) in enumerate(zip(INSTRUMENTS, separate)):
+        np.testing.assert_allclose(
+            combined.to_array[:, position], single.to_array, rtol=1e-9, equal_nan=True
+        )
+        np.testing.assert_allclose(
+            columns[instrument].to_array, single.to_array, rtol=1e-9, equal_nan=True
+        )
+        assert columns[instrument].computed == 1 + 5
+    np.testing.assert_allclose(
+        columns[INSTRUMENTS[0]].value, separate[0].value, rtol=1e-9
+    )
+
+
+def test_unreferenced_panel_is_released():
+    members = get_members(10)
+    panel = weakref.ref(CandlePanel(members))
+    gc.collect()
+
+    assert panel() is None
+    assert all(member.on_update._callbacks == () for member in members)
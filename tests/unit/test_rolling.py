@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from pytrade.indicators import functions
+from pytrade.indicators.rolling import (
+    RollingMax,
+    RollingMin,
+    RollingMoments,
+    RollingSum,
+)
+
+PRIMITIVES = [
+    ("sum", RollingSum, lambda x, p: functions.rolling_sum(x, p)),
+    ("max", RollingMax, lambda x, p: functions.rolling_max(x, p)),
+    ("min", RollingMin, lambda x, p: functions.rolling_min(x, p)),
+    (
+        "moments",
+        RollingMoments,
+        lambda x, p: np.stack(
+            [functions.sma(x, p), functions.rolling_var(x, p)], axis=-1
+        ),
+    ),
+]
+
+
+def get_series(count: int, columns: int = 0, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    shape = (count, columns) if columns else (count,)
+    values = 1.1 + np.cumsum(rng.normal(0, 0.001, shape), axis=0)
+    values[:3] = np.nan
+    return values
+
+
+def step(primitive, values: np.ndarray) -> np.ndarray:
+    results = [primitive.update(x) for x in values]
+    if isinstance(results[0], tuple):
+        return np.array([np.stack(r, axis=-1) for r in results])
+    return np.array(results)
+
+
+def as_array(result) -> np.ndarray:
+    return np.stack(result, axis=-1) if isinstance(result, tuple) else result
+
+
+@pytest.mark.parametrize(
+    "name,primitive,batch", PRIMITIVES, ids=[p[0] for p in PRIMITIVES]
+)
+@pytest.mark.parametrize("columns", [0, 3])
+def test_update_matches_batch(name, primitive, batch, columns):
+    values = get_series(200, columns)
+
+    np.testing.assert_allclose(
+        step(primitive(10), values), batch(values, 10), rtol=1e-9, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "name,primitive,batch", PRIMITIVES, ids=[p[0] for p in PRIMITIVES]
+)
+@pytest.mark.parametrize("split", [0, 2, 7, 50])
+def test_resume_then_update_matches_batch(name, primitive, batch, split):
+    values = get_series(120, 2)
+    expected = batch(values, 10)
+    state = primitive(10)
+
+    head = as_array(state.resume(values[:split]))
+    tail = step(state, values[split:])
+
+    np.testing.assert_allclose(head, expected[:split], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(tail, expected[split:], rtol=1e-9, atol=1e-12)
+
+
+def test_monotonic_window_expires_extremes():
+    highest, lowest = RollingMax(3), RollingMin(3)
+    values = [5.0, 4.0, 3.0, 2.0, 1.0, 6.0, 0.0, 0.0, 0.0]
+
+    maxima = [highest.update(v) for v in values]
+    minima = [lowest.update(v) for v in values]
+
+    np.testing.assert_array_equal(maxima[2:], [5, 4, 3, 6, 6, 6, 0])
+    np.testing.assert_array_equal(minima[2:], [3, 2, 1, 1, 0, 0, 0])
+    assert max(len(w) for w in highest._windows) <= 3
+
+
+def test_welford_is_stable_for_large_offsets():
+    rng = np.random.default_rng(5)
+    values = 1e6 + rng.normal(0, 1e-3, 500)
+    moments = RollingMoments(50)
+
+    for x in values:
+        _, variance = moments.update(x)
+
+    np.testing.assert_allclose(variance, np.var(values[-50:]), rtol=1e-6)
@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from multiprocessing.shared_memory import SharedMemory
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import pytz
+
+from pytrade.indicators import SMA
+from pytrade.models.buffer import SharedCandleBuffer
+from pytrade.models.instruments import Candlestick, Granularity, Instrument
+from pytrade.models.shared import SharedCandleData
+
+
+def get_candles(count: int, start: datetime) -> list[Candlestick]:
+    return [
+        Candlestick(
+            Instrument.EURUSD,
+            Granularity.M1,
+            random.uniform(0, 10),
+            random.uniform(0, 10),
+            random.uniform(0, 10),
+            random.uniform(0, 10),
+            start + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def name():
+    return f"pytrade_test_{os.getpid()}_{random.randint(0, 10**9)}"
+
+
+def write_candles(name: str, count: int):
+    writer = SharedCandleData(name, max_size=10)
+    writer.get(Instrument.EURUSD, Granularity.M1)
+    for candle in get_candles(count, datetime(2024, 1, 2, tzinfo=timezone.utc)):
+        writer.update(candle)
+    # Keep the blocks alive for the reader, the test process unlinks them
+    writer._data.clear()
+
+
+def test_shared_buffer_attach(name):
+    writer = SharedCandleBuffer(name, max_size=5, dtype=np.float32)
+    reader = SharedCandleBuffer(name, create=False)
+    try:
+        for i in range(8):
+            writer.append(i, i, i + 1, i - 1, i)
+
+        assert reader.max_size == 5
+        assert reader.dtype == np.float32
+        assert reader.sequence == 16
+        assert np.array_equal(reader.timestamps, np.arange(3, 8))
+        assert np.array_equal(reader.snapshot()[2], writer.prices)
+        with pytest.raises(RuntimeError):
+            reader.append(9, 9, 9, 9, 9)
+    finally:
+        reader.release()
+        writer.release()
+
+
+def test_shared_buffer_tz_follows_writer(name):
+    writer = SharedCandleBuffer(name, max_size=5)
+    reader = SharedCandleBuffer(name, create=False)
+    try:
+        assert reader.tz is None
+
+        writer.tz = pytz.utc
+        writer.append(0, 1, 1, 1, 1)
+
+        assert reader.tz == timezone.utc
+        with pytest.raises(RuntimeError):
+            writer.tz = pytz.timezone("Europe/London")
+    finally:
+        reader.release()
+        writer.release()
+
+
+def test_shared_candle_data_poll(name):
+    writer = SharedCandleData(name, max_size=10)
+    reader = SharedCandleData(name, max_size=10, writer=False)
+    try:
+        with pytest.raises(RuntimeError):
+            reader.get(Instrument.EURUSD, Granularity.M1)
+
+        candles = get_candles(3, datetime(2024, 1, 2, tzinfo=timezone.utc))
+        writer.update(candles[0])
+        series = reader.get(Instrument.EURUSD, Granularity.M1)
+        callback = MagicMock()
+        series.on_update += callback
+
+        assert reader.poll() == []
+        writer.update(candles[1])
+        writer.update(candles[2])
+
+        assert reader.poll() == [series]
+        assert callback.call_count == 1
+        assert series.df.equals(writer.get(Instrument.EURUSD, Granularity.M1).df)
+        with pytest.raises(RuntimeError):
+            series.update(candles[2])
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_shared_reader_sees_each_write(name):
+    writer = SharedCandleData(name, max_size=10)
+    reader = SharedCandleData(name, max_size=10, writer=False)
+    try:
+        candles = get_candles(5, datetime(2024, 1, 2, tzinfo=timezone.utc))
+        for i, candle in enumerate(candles):
+            candle.close = 1.0 + i
+        writer.update_many(candles[:4])
+        series = reader.get(Instrument.EURUSD, Granularity.M1)
+        sma = SMA(series, 3)
+        version = series.version
+
+        candles[3].close = 100.0
+        candles[4].close = 1.0
+        writer.update(candles[3])
+        writer.update(candles[4])
+        reader.poll()
+
+        assert series.version == version + 2
+        assert sma.value == pytest.approx((3.0 + 100.0 + 1.0) / 3)
+        del sma
+    finally:
+        del series
+        reader.close()
+        writer.close()
+
+
+def test_shared_candle_data_across_processes(name):
+    process = multiprocessing.get_context("spawn").Process(
+        target=write_candles, args=(name, 15)
+    )
+    process.start()
+    process.join(timeout=30)
+
+    reader = SharedCandleData(name, max_size=10, writer=False)
+    series = reader.get(Instrument.EURUSD, Granularity.M1)
+    try:
+        assert len(series) == 10
+        assert series.df.index[-1] == datetime(2024, 1, 2, 0, 14, tzinfo=timezone.utc)
+    finally:
+        del series
+        reader.close()
+        SharedMemory(name=f"{name}_EURUSD_M1").unlink()
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from pytrade.indicators import (
+    EMA,
+    SMA,
+    BarsSince,
+    Crossover,
+    Crossunder,
+    Falling,
+    Rising,
+    signals,
+)
+from pytrade.models.instruments import (
+    Candlestick,
+    Granularity,
+    Instrument,
+    InstrumentCandles,
+)
+
+
+def get_candles(count: int, seed: int = 3) -> list[Candlestick]:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, count))
+    start = datetime(2024, 1, 1)
+    return [
+        Candlestick(
+            Instrument.EURUSD, Granularity.M1, c, c, c, c, start + timedelta(minutes=i)
+        )
+        for i, c in enumerate(close)
+    ]
+
+
+def test_crossover_and_crossunder():
+    a = np.array([1.0, 2.0, 3.0, 2.0, 1.0, 2.0, np.nan, 3.0])
+    b = 2.0
+
+    assert signals.crossover(a, b).tolist() == [
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+        False,
+        False,
+    ]
+    assert signals.crossunder(a, b).tolist() == [
+        False,
+        False,
+        False,
+        False,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert signals.crossover(a, np.full_like(a, 1.5))[1]
+
+
+def test_bars_since():
+    condition = np.array([False, True, False, False, True, False])
+
+    np.testing.assert_array_equal(
+        signals.bars_since(condition), [np.nan, 0, 1, 2, 0, 1]
+    )
+    stacked = signals.bars_since(np.column_stack([condition, ~condition]))
+    np.testing.assert_array_equal(stacked[:, 1], [0, 1, 0, 0, 1, 0])
+
+
+def test_rising_and_falling():
+    x = np.array([1.0, 2.0, 3.0, 4.0, 3.0, 2.0, 1.0])
+
+    assert signals.rising(x, 2).tolist() == [
+        False,
+        False,
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert signals.falling(x, 3).tolist() == [
+        False,
+        False,
+        False,
+        False,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_indicator_methods_match_vectorized():
+    candles = get_candles(150)
+    data = InstrumentCandles()
+    data.extend(candles[:40])
+    fast, slow = SMA(data, 5), SMA(data, 20)
+    live = {"crossover": [], "crossunder": [], "rising": [], "falling": []}
+
+    for candle in candles[40:]:
+        data.update(candle)
+        live["crossover"].append(bool(fast.crossover(slow)))
+        live["crossunder"].append(bool(fast.crossunder(slow)))
+        live["rising"].append(bool(fast.rising(3)))
+        live["falling"].append(bool(fast.falling(2)))
+
+    assert (
+        live["crossover"]
+        == signals.crossover(fast.to_array, slow.to_array)[40:].tolist()
+    )
+    assert (
+        live["crossunder"]
+        == signals.crossunder(fast.to_array, slow.to_array)[40:].tolist()
+    )
+    assert live["rising"] == signals.rising(fast.to_array, 3)[40:].tolist()
+    assert live["falling"] == signals.falling(fast.to_array, 2)[40:].tolist()
+    assert any(live["crossover"]) and any(live["crossunder"])
+
+
+def test_indicator_methods_before_warmup():
+    data = InstrumentCandles()
+    data.update(get_candles(1)[0])
+
+    assert not SMA(data, 1).crossover(0)
+    assert not SMA(data, 1).rising()
+
+
+@pytest.mark.parametrize(
+    "node,vectorized",
+    [
+        (
+            lambda fast, slow: Crossover(fast, slow),
+            lambda f, s: signals.crossover(f, s),
+        ),
+        (
+            lambda fast, slow: Crossunder(fast, 1.1),
+            lambda f, s: signals.crossunder(f, 1.1),
+        ),
+        (lambda fast, slow: Rising(fast, 2), lambda f, s: signals.rising(f, 2)),
+        (lambda fast, slow: Falling(fast, n=2), lambda f, s: signals.falling(f, 2)),
+        (
+            lambda fast, slow: BarsSince(Crossover(fast, slow)),
+            lambda f, s: signals.bars_since(signals.crossover(f, s)),
+        ),
+    ],
+)
+def test_signal_nodes_step(node, vectorized):
+    candles = get_candles(150)
+    data = InstrumentCandles()
+    data.extend(candles[:30])
+    fast, slow = EMA(data, 5), EMA(data, 20)
+    signal = node(fast, slow)
+
+    for candle in candles[30:]:
+        data.update(candle)
+
+    assert signal.computed == 1 + len(candles[30:])
+    assert signal.count == len(candles)
+    np.testing.assert_array_equal(
+        signal.to_array, vectorized(fast.to_array, slow.to_array)
+    )
@@ -5,7 +5,9 @@ from typing import List
 from unittest.mock import MagicMock, call, patch
 
 import pytest
+from pandas import Timestamp
 
+from pytrade.events.bus import EventBus
 from pytrade.models.instruments import (
     MINUTES_MAP,
     CandleData,
@@ -53,29 +55,40 @@ def get_candles(
     ]
 
 
-def get_updates():
-    end_time = datetime.now()
-    update_candles: list[Candlestick] = []
+PERIOD_START = datetime(2024, 1, 1, 9, 0)
+
+
+def get_updates(period: int = 0) -> list[Candlestick]:
+    """
+    The bars of every subscription for one period, aligned to the period
+    and sorted by the time they close.
+    """
     max_interval = max(MINUTES_MAP[sub.granularity] for sub in TEST_SUBCRIPTIONS)
+    start = PERIOD_START + timedelta(minutes=max_interval * period)
+    end_time = start + timedelta(minutes=max_interval)
+    update_candles: list[Candlestick] = []
     for subscription in TEST_SUBCRIPTIONS:
-        num_candles = int(max_interval / MINUTES_MAP[subscription.granularity])
+        interval = MINUTES_MAP[subscription.granularity]
         update_candles += get_candles(
-            num_candles, subscription.instrument, subscription.granularity, end_time
+            max_interval // interval,
+            subscription.instrument,
+            subscription.granularity,
+            end_time - timedelta(minutes=interval),
         )
 
-    update_candles.sort(key=lambda c: c.timestamp)
+    update_candles.sort(
+        key=lambda c: c.timestamp + timedelta(minutes=MINUTES_MAP[c.granularity])
+    )
 
     return update_candles
 
 
-def send_strategy_updates(strategy: FxStrategy):
-    update_candles = get_updates()
-
+def send_strategy_updates(strategy: FxStrategy, period: int = 0):
     updates = TEST_UPDATES.copy()
-    for candle in update_candles:
+    for candle in get_updates(period):
         strategy._update_instrument(candle)
         updates.remove(CandleSubscription(candle.instrument, candle.granularity))
-        assert len(strategy._pending_updates) == len(updates)
+        assert sum(strategy._barrier.outstanding.values()) == len(updates)
 
 
 class _TestStrategy(FxStrategy):
@@ -111,15 +124,13 @@ def test_instrument_updates():
     data_context = CandleData()
 
     strategy = _TestStrategy(broker, data_context)
-    with patch.object(strategy, "_updates_complete", MagicMock()) as mock_updates_event:
-        strategy.init()
+    strategy.init()
 
-        assert strategy._pending_updates == strategy._required_updates
+    assert strategy._barrier.outstanding == {}
 
-        send_strategy_updates(strategy)
+    send_strategy_updates(strategy)
 
-        assert strategy._pending_updates == []
-        assert mock_updates_event.set.called
+    assert list(strategy._barrier._ready) == [Timestamp(PERIOD_START).value]
 
 
 @pytest.mark.asyncio
@@ -136,8 +147,8 @@ async def test_strategy_next():
         send_strategy_updates(strategy)
 
         await strategy.next()
-        assert len(strategy._pending_updates) == len(TEST_UPDATES)
-        assert strategy._pending_updates == strategy._required_updates
+        assert mock_next.called
+        assert not strategy._barrier._ready
 
 
 @pytest.mark.asyncio
@@ -152,14 +163,150 @@ async def test_strategy_waits_for_updates():
         for i in range(iterations):
 
             next_task = asyncio.create_task(strategy.next())
+            await asyncio.sleep(0.01)
             assert not mock_next.called
             assert not next_task.done()
 
-            send_strategy_updates(strategy)
+            send_strategy_updates(strategy, i)
 
             await asyncio.wait_for(next_task, timeout=0.2)
             assert mock_next.called
             assert next_task.done()
-            assert len(strategy._pending_updates) == len(TEST_UPDATES)
-            assert strategy._pending_updates == strategy._required_updates
+            assert strategy._barrier.outstanding == {}
             mock_next.reset_mock()
+
+
+@pytest.mark.asyncio
+async def test_strategy_does_not_mix_periods():
+    broker = MagicMock()
+    data_context = CandleData()
+
+    strategy = _TestStrategy(broker, data_context)
+    current, ahead = get_updates(0), get_updates(1)
+    with patch.object(strategy, "_next", MagicMock()) as mock_next:
+        strategy.init()
+        # EURUSD runs a full period ahead of GBPUSD
+        for candle in current + ahead:
+            if candle.instrument == Instrument.EURUSD:
+                strategy._update_instrument(candle)
+
+        next_task = asyncio.create_task(strategy.next())
+        await asyncio.sleep(0.01)
+        assert not next_task.done()
+
+        for candle in current:
+            if candle.instrument == Instrument.GBPUSD:
+                strategy._update_instrument(candle)
+
+        await asyncio.wait_for(next_task, timeout=0.2)
+        assert mock_next.call_count == 1
+        assert list(strategy._barrier.outstanding.values()) == [4]
+
+
+@pytest.mark.asyncio
+async def test_strategy_times_out_on_missing_updates():
+    broker = MagicMock()
+    data_context = CandleData()
+
+    strategy = _TestStrategy(broker, data_context, timeout=0.05)
+    with patch.object(strategy, "_next", MagicMock()) as mock_next:
+        strategy.init()
+        for candle in get_updates()[:-1]:
+            strategy._update_instrument(candle)
+
+        await asyncio.wait_for(strategy.next(), timeout=1)
+
+        assert mock_next.called
+        assert list(strategy._barrier.missing.values()) == [
+            {CandleSubscription(Instrument.GBPUSD, Granularity.M15): 1}
+        ]
+
+
+@pytest.mark.asyncio
+async def test_strategy_replays_with_clock():
+    broker = MagicMock()
+    period_end = Timestamp(PERIOD_START).value + 15 * 60 * 10**9
+    strategy = _TestStrategy(broker, CandleData(), timeout=60, clock=lambda: period_end)
+    with patch.object(strategy, "_next", MagicMock()) as mock_next:
+        strategy.init()
+        updates = get_updates()
+        for candle in updates[:-1]:
+            strategy._update_instrument(candle)
+        next_task = asyncio.create_task(strategy.next())
+        await asyncio.sleep(0.05)
+
+        assert not mock_next.called
+        strategy._update_instrument(updates[-1])
+        await asyncio.wait_for(next_task, timeout=1)
+        assert mock_next.call_count == 1
+        assert strategy._barrier.missing == {}
+
+
+def test_batch_counts_arrivals_when_scope_raises():
+    broker = MagicMock()
+    strategy = _TestStrategy(broker, CandleData())
+    strategy.init()
+
+    with pytest.raises(ValueError):
+        with strategy._batch():
+            for candle in get_updates():
+                strategy._update_instrument(candle)
+            raise ValueError("indicator failed")
+
+    assert list(strategy._barrier._ready) == [Timestamp(PERIOD_START).value]
+
+
+def test_monitor_derived_instruments():
+    broker = MagicMock()
+    data_context = CandleData(derive=[Granularity.M5, Granularity.M15])
+
+    strategy = _TestStrategy(broker, data_context)
+    strategy.init()
+
+    broker.subscribe.assert_has_calls(
+        [
+            call(Instrument.EURUSD, Granularity.M1, strategy._update_instrument),
+            call(Instrument.GBPUSD, Granularity.M1, strategy._update_instrument),
+        ]
+    )
+    assert broker.subscribe.call_count == 2
+
+
+def test_derived_instrument_updates():
+    broker = MagicMock()
+    data_context = CandleData(derive=[Granularity.M5, Granularity.M15])
+
+    strategy = _TestStrategy(broker, data_context)
+    strategy.init()
+
+    for instrument in (Instrument.EURUSD, Instrument.GBPUSD):
+        for candle in reversed(
+            get_candles(15, instrument, Granularity.M1, PERIOD_START)
+        ):
+            candle.timestamp += timedelta(minutes=14)
+            strategy._update_instrument(candle)
+
+    assert strategy._barrier.outstanding == {}
+    assert list(strategy._barrier._ready) == [Timestamp(PERIOD_START).value]
+
+
+@pytest.mark.asyncio
+async def test_strategy_updates_through_bus():
+    broker = MagicMock()
+    bus = EventBus()
+
+    strategy = _TestStrategy(broker, CandleData(), bus)
+    with patch.object(strategy, "_next", MagicMock()) as mock_next:
+        strategy.init()
+
+        assert broker.subscribe.call_count == len(TEST_SUBCRIPTIONS)
+        assert bus.consumers[0].topics == tuple(TEST_SUBCRIPTIONS)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, lambda: [bus.publish(c) for c in get_updates()]
+        )
+        await asyncio.wait_for(strategy.next(), timeout=1)
+
+        assert mock_next.called
+        bus.close()
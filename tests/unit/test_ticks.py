@@ -0,0 +1,152 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pytrade.models.instruments import (
+    MINUTES_MAP,
+    CandleData,
+    Granularity,
+    Instrument,
+    TickData,
+)
+from pytrade.models.ticks import (
+    INSTRUMENT_CODES,
+    INSTRUMENTS,
+    TICK_TIMESTAMP_FORMAT,
+    TickAggregator,
+    TickCandleBuilder,
+    TickChunk,
+    read_ticks,
+)
+
+
+def write_ticks(path, count: int) -> list[tuple[Instrument, datetime, float, float]]:
+    start = datetime(2024, 1, 2, 9, 0, tzinfo=timezone.utc)
+    ticks = []
+    for i in range(count):
+        instrument = random.choice([Instrument.EURUSD, Instrument.GBPUSD])
+        bid = round(random.uniform(1, 2), 5)
+        ticks.append(
+            (instrument, start + timedelta(milliseconds=250 * i), bid, bid + 0.0002)
+        )
+    with open(path, "w") as f:
+        for instrument, timestamp, bid, ask in ticks:
+            f.write(
+                f"{instrument.value},{timestamp.strftime(TICK_TIMESTAMP_FORMAT)[:-3]},{bid},{ask}\n"
+            )
+    return ticks
+
+
+@pytest.mark.parametrize("chunk_size", [7, 100])
+def test_read_ticks(tmp_path, chunk_size: int):
+    path = tmp_path / "ticks.csv"
+    ticks = write_ticks(path, 50)
+
+    chunks = list(read_ticks(str(path), chunk_size=chunk_size))
+
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+    timestamps = np.concatenate([c.timestamps for c in chunks])
+    bid = np.concatenate([c.bid for c in chunks])
+    ask = np.concatenate([c.ask for c in chunks])
+    instruments = np.concatenate([c.instruments for c in chunks])
+
+    assert timestamps.dtype == np.int64
+    assert list(timestamps) == [pd.Timestamp(t[1]).value for t in ticks]
+    assert np.allclose(bid, [t[2] for t in ticks])
+    assert np.allclose(ask, [t[3] for t in ticks])
+    assert [INSTRUMENTS[code] for code in instruments] == [t[0] for t in ticks]
+
+
+def test_read_ticks_for_instrument(tmp_path):
+    path = tmp_path / "ticks.csv"
+    ticks = write_ticks(path, 50)
+
+    chunks = list(read_ticks(str(path), instrument=Instrument.EURUSD))
+
+    assert sum(len(c) for c in chunks) == sum(t[0] == Instrument.EURUSD for t in ticks)
+
+
+def test_read_ticks_unknown_instrument(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text("XXX/YYY,20240102 09:00:00.000,1.0,1.1\n")
+
+    with pytest.raises(RuntimeError):
+        list(read_ticks(str(path)))
+
+
+def get_chunk(count: int, start: datetime) -> TickChunk:
+    timestamps = pd.Timestamp(start).value + np.cumsum(
+        np.random.randint(1, 20 * 10**9, count)
+    )
+    bid = np.random.uniform(1, 2, count)
+    instruments = np.full(count, INSTRUMENT_CODES[Instrument.EURUSD], dtype=np.int8)
+    return TickChunk(timestamps, bid, bid + 0.0002, instruments)
+
+
+def chunk_to_ticks(chunk: TickChunk) -> list[TickData]:
+    ticks = []
+    for timestamp, bid, ask, code in zip(
+        chunk.timestamps, chunk.bid, chunk.ask, chunk.instruments
+    ):
+        tick = TickData(INSTRUMENTS[code].value, "20240101 00:00:00.0", bid, ask)
+        tick.timestamp = pd.Timestamp(timestamp, tz="UTC")
+        ticks.append(tick)
+    return ticks
+
+
+@pytest.mark.parametrize("granularity", [Granularity.M1, Granularity.M5])
+def test_tick_aggregation_matches_resample(granularity: Granularity):
+    chunk = get_chunk(2000, datetime(2024, 1, 2, 9, 0, tzinfo=timezone.utc))
+    mid = pd.Series(
+        (chunk.bid + chunk.ask) / 2, index=pd.to_datetime(chunk.timestamps, utc=True)
+    )
+    expected = mid.resample(f"{MINUTES_MAP[granularity]}min").ohlc().dropna().iloc[:-1]
+
+    aggregator = TickAggregator(Instrument.EURUSD, granularity)
+    halves = np.array_split(np.arange(len(chunk)), 3)
+    batches = [
+        aggregator.extend(
+            TickChunk(
+                chunk.timestamps[i], chunk.bid[i], chunk.ask[i], chunk.instruments[i]
+            )
+        )
+        for i in halves
+    ]
+
+    timestamps = np.concatenate([b.timestamps.asi8 for b in batches])
+    prices = np.hstack([b.prices for b in batches])
+    assert np.array_equal(timestamps, expected.index.asi8)
+    assert np.allclose(prices, expected.to_numpy().T)
+
+
+def test_tick_aggregation_live_matches_vectorized():
+    chunk = get_chunk(500, datetime(2024, 1, 2, 9, 0, tzinfo=timezone.utc))
+    vectorized = TickAggregator(Instrument.EURUSD, Granularity.M1)
+    live = TickAggregator(Instrument.EURUSD, Granularity.M1)
+
+    batch = vectorized.extend(chunk)
+    candles = [c for c in map(live.update, chunk_to_ticks(chunk)) if c is not None]
+
+    assert [c.timestamp for c in candles] == list(batch.timestamps)
+    assert np.allclose(
+        [[c.open, c.high, c.low, c.close] for c in candles], batch.prices.T
+    )
+    assert live.flush().close == vectorized.flush().close
+
+
+def test_tick_candle_builder_feeds_candle_data():
+    data = CandleData(max_size=None)
+    builder = TickCandleBuilder(data, [Granularity.M1, Granularity.M5])
+    chunk = get_chunk(1000, datetime(2024, 1, 2, 9, 0, tzinfo=timezone.utc))
+
+    builder.consume([chunk])
+    builder.flush()
+
+    minutes = np.unique(chunk.timestamps // (60 * 10**9))
+    assert len(data.get(Instrument.EURUSD, Granularity.M1)) == len(minutes)
+    assert data.get(Instrument.EURUSD, Granularity.M5).High.max() == pytest.approx(
+        ((chunk.bid + chunk.ask) / 2).max()
+    )